@@ -0,0 +1,168 @@
+# core/agents/dispatcher.py
+"""Concurrent fan-out for agent calls.
+
+A staff view that needs fraud + CRM + travel insight should wait for the
+slowest agent, not the sum of all three. Calls run on worker threads under
+an asyncio semaphore with a per-call timeout; results are yielded in
+completion order. `run_agents` / `iter_agents` are the sync facades used
+from Streamlit scripts.
+
+The timeout counts from when the call starts on its worker thread, not
+from when it was queued. A thread cannot be interrupted, so a timed-out
+call is not cancelled: it keeps running in the background and keeps its
+concurrency slot until it returns. `concurrency` therefore bounds calls
+actually running, and no call starts while waiting for a busy worker.
+"""
+
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from core.agents.crm_agent import run_crm_agent
+from core.agents.customer_agent import run_customer_agent
+from core.agents.fraud_agent import run_fraud_agent
+from core.agents.travel_agent import run_travel_agent
+
+AGENTS = {
+    "crm": run_crm_agent,
+    "customer": run_customer_agent,
+    "fraud": run_fraud_agent,
+    "travel": run_travel_agent,
+}
+
+DEFAULT_CONCURRENCY = 4
+DEFAULT_TIMEOUT = 30.0
+
+
+class AgentResult:
+    __slots__ = ("key", "value", "error", "elapsed")
+
+    def __init__(self, key, value=None, error=None, elapsed=0.0):
+        self.key = key
+        self.value = value
+        self.error = error
+        self.elapsed = elapsed
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def __repr__(self):
+        status = "ok" if self.ok else type(self.error).__name__
+        return f"AgentResult({self.key!r}, {status}, {self.elapsed:.3f}s)"
+
+
+def _resolve(agent):
+    if callable(agent):
+        return agent
+    try:
+        return AGENTS[agent]
+    except KeyError:
+        raise ValueError(f"Unknown agent: {agent}") from None
+
+
+async def _run_one(key, fn, payload, sem, executor, timeout):
+    loop = asyncio.get_running_loop()
+    await sem.acquire()
+    running = asyncio.Event()
+
+    def call():
+        try:
+            loop.call_soon_threadsafe(running.set)
+        except RuntimeError:
+            pass        # loop already closed: nobody is waiting for this result
+        return fn(payload)
+
+    future = loop.run_in_executor(executor, call)
+    # The slot is freed when the thread finishes, not when we stop waiting for it.
+    future.add_done_callback(lambda _: sem.release())
+    await running.wait()
+    started = time.perf_counter()
+    try:
+        value = await asyncio.wait_for(asyncio.shield(future), timeout)
+        return AgentResult(key, value=value, elapsed=time.perf_counter() - started)
+    except asyncio.CancelledError:
+        raise
+    except Exception as exc:
+        return AgentResult(key, error=exc, elapsed=time.perf_counter() - started)
+
+
+async def dispatch(calls, concurrency=DEFAULT_CONCURRENCY, timeout=DEFAULT_TIMEOUT):
+    """Async generator yielding AgentResult objects as each call finishes.
+
+    `calls` maps a result key to `(agent, payload)`, where agent is a name in
+    AGENTS or any callable taking one argument. Closing the generator early
+    cancels everything still pending.
+    """
+    jobs = {key: (_resolve(agent), payload) for key, (agent, payload) in calls.items()}
+    if not jobs:
+        return
+    sem = asyncio.Semaphore(concurrency)
+    executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="agent")
+    tasks = [
+        asyncio.ensure_future(_run_one(key, fn, payload, sem, executor, timeout))
+        for key, (fn, payload) in jobs.items()
+    ]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def gather_agents(calls, concurrency=DEFAULT_CONCURRENCY, timeout=DEFAULT_TIMEOUT):
+    results = {}
+    async for result in dispatch(calls, concurrency, timeout):
+        results[result.key] = result
+    return results
+
+
+def run_agents(calls, concurrency=DEFAULT_CONCURRENCY, timeout=DEFAULT_TIMEOUT):
+    """Blocking facade: run all calls concurrently, return {key: AgentResult}."""
+    return {result.key: result for result in iter_agents(calls, concurrency, timeout)}
+
+
+def iter_agents(calls, concurrency=DEFAULT_CONCURRENCY, timeout=DEFAULT_TIMEOUT):
+    """Blocking generator yielding results in completion order.
+
+    The event loop runs on a helper thread so this works whether or not the
+    caller already has a loop running.
+    """
+    out = queue.Queue()
+    done = object()
+    stop = threading.Event()
+
+    async def pump():
+        agen = dispatch(calls, concurrency, timeout)
+        try:
+            async for result in agen:
+                out.put(result)
+                if stop.is_set():
+                    break
+        finally:
+            await agen.aclose()
+
+    def runner():
+        try:
+            asyncio.run(pump())
+        except BaseException as exc:
+            out.put(exc)
+        finally:
+            out.put(done)
+
+    thread = threading.Thread(target=runner, name="agent-dispatch", daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = out.get()
+            if item is done:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
@@ -1,4 +1,18 @@
-from core.ai_engine import ai_insights
+from core.ai_engine import ai_insights, FRAUD_TTL
+from core.security.fraud_engine import assess
+
+def _escalate(event, result):
+    return ai_insights(
+        f"Fraud Analysis Needed: {event} | Local risk signals: {result.as_dict()}",
+        ttl=FRAUD_TTL,
+    )
 
 def run_fraud_agent(event):
-    return ai_insights(f"Fraud Analysis Needed: {event}")
\ No newline at end of file
+    # Structured events are scored locally; only the ambiguous band reaches the LLM.
+    if not isinstance(event, dict):
+        return ai_insights(f"Fraud Analysis Needed: {event}", ttl=FRAUD_TTL)
+    result, verdict = assess(event, _escalate)
+    if verdict is not None:
+        return verdict
+    reasons = ", ".join(result.reasons) or "no risk signals"
+    return f"Local fraud engine: {result.decision.upper()} (score {result.score:.2f}; {reasons})"
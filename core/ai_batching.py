@@ -0,0 +1,211 @@
+# core/ai_batching.py
+"""Micro-batching and single-flight coalescing for AI prompts.
+
+Fraud and behavior checks arrive one event at a time. `PromptBatcher`
+collects events for a short window (or until `max_items` are queued),
+sends them to the model as one numbered prompt, parses the per-item JSON
+answer and resolves each caller's future. `SingleFlight` makes concurrent
+identical requests share a single in-flight call.
+
+Batches run on a small executor, so a slow model call does not hold up
+the batches behind it. Items the batch reply leaves unanswered are retried
+by their own callers, in parallel, rather than one by one on the batch
+thread; a failure only reaches the callers whose item failed.
+"""
+
+import json
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+DEFAULT_MAX_ITEMS = 16
+DEFAULT_MAX_WAIT = 0.05
+DEFAULT_CONCURRENCY = 4         # batches in flight per batcher
+
+
+class SingleFlight:
+    """Deduplicate concurrent calls by key: followers wait for the leader."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._inflight = {}
+
+    def do(self, key, fn):
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+        if not leader:
+            return future.result()
+        try:
+            result = fn()
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+
+class MicroBatcher:
+    """Queue items and hand them to `handler(items) -> results` in batches.
+
+    A batch is flushed when it reaches `max_items` or when its oldest item
+    has waited `max_wait` seconds. Up to `concurrency` batches run at once
+    on an executor; while all are busy, new items keep filling the next
+    batch. The worker thread starts on first use. A result that is an
+    exception instance fails only that item's future.
+    """
+
+    def __init__(self, handler, max_items=DEFAULT_MAX_ITEMS, max_wait=DEFAULT_MAX_WAIT, name="batcher",
+                 concurrency=DEFAULT_CONCURRENCY):
+        self.handler = handler
+        self.max_items = max_items
+        self.max_wait = max_wait
+        self.name = name
+        self._cond = threading.Condition()
+        self._pending = []
+        self._worker = None
+        self._slots = threading.BoundedSemaphore(concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix=name)
+        self._stats_lock = threading.Lock()
+        self.batches = 0
+        self.items = 0
+
+    def submit(self, item):
+        future = Future()
+        with self._cond:
+            self._pending.append((item, future))
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._worker.start()
+            self._cond.notify()
+        return future
+
+    def __call__(self, item, timeout=None):
+        return self.submit(item).result(timeout)
+
+    def _take_batch(self):
+        with self._cond:
+            while not self._pending:
+                self._cond.wait()
+            deadline = time.monotonic() + self.max_wait
+            while len(self._pending) < self.max_items:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            batch = self._pending[:self.max_items]
+            del self._pending[:self.max_items]
+            return batch
+
+    def _run(self):
+        while True:
+            self._slots.acquire()
+            batch = self._take_batch()
+            self._executor.submit(self._dispatch, batch)
+
+    def _dispatch(self, batch):
+        try:
+            futures = [f for _, f in batch]
+            try:
+                results = self.handler([item for item, _ in batch])
+                if len(results) != len(batch):
+                    raise ValueError(
+                        f"{self.name}: handler returned {len(results)} results for {len(batch)} items"
+                    )
+            except Exception as exc:
+                for future in futures:
+                    future.set_exception(exc)
+                return
+            with self._stats_lock:
+                self.batches += 1
+                self.items += len(batch)
+            for future, result in zip(futures, results):
+                if isinstance(result, BaseException):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+        finally:
+            self._slots.release()
+
+
+def build_batch_prompt(instruction, items):
+    lines = [
+        f"{instruction}. Analyze each numbered item independently.",
+        'Reply with only a JSON array, one object per item: [{"id": <number>, "result": "<analysis>"}]',
+        "",
+    ]
+    lines += [f"{i}. {item}" for i, item in enumerate(items, 1)]
+    return "\n".join(lines)
+
+
+def parse_batch_response(text, count):
+    """Map the model's JSON array back to item order; unanswered slots are None."""
+    results = [None] * count
+    start, end = text.find("["), text.rfind("]")
+    if start == -1 or end <= start:
+        return results
+    try:
+        rows = json.loads(text[start:end + 1])
+    except ValueError:
+        return results
+    for row in rows:
+        if not isinstance(row, dict):
+            continue
+        try:
+            idx = int(row.get("id")) - 1
+        except (TypeError, ValueError):
+            continue
+        if 0 <= idx < count and row.get("result") is not None:
+            results[idx] = str(row["result"])
+    return results
+
+
+class PromptBatcher:
+    """Batch `f"{instruction}: {item}"` prompts into one model call.
+
+    `complete(prompt) -> str` is the underlying model call. Items the model
+    fails to answer in the batch are retried individually by their callers,
+    so callers always get a result for their own item.
+    """
+
+    def __init__(self, instruction, complete, max_items=DEFAULT_MAX_ITEMS, max_wait=DEFAULT_MAX_WAIT,
+                 concurrency=DEFAULT_CONCURRENCY):
+        self.instruction = instruction
+        self.complete = complete
+        self._flight = SingleFlight()
+        self._batcher = MicroBatcher(
+            self._handle, max_items=max_items, max_wait=max_wait,
+            name=f"batch:{instruction[:24]}", concurrency=concurrency,
+        )
+
+    def single_prompt(self, item):
+        return f"{self.instruction}: {item}"
+
+    def _handle(self, items):
+        if len(items) == 1:
+            return [self.complete(self.single_prompt(items[0]))]
+        text = self.complete(build_batch_prompt(self.instruction, items))
+        # None: unanswered, retried by the item's caller.
+        return parse_batch_response(text, len(items))
+
+    def _analyze(self, item):
+        result = self._batcher(item)
+        if result is None:
+            result = self.complete(self.single_prompt(item))
+        return result
+
+    def analyze(self, item):
+        item = str(item)
+        return self._flight.do(item, lambda: self._analyze(item))
+
+    __call__ = analyze
+
+    @property
+    def stats(self):
+        return {"batches": self._batcher.batches, "items": self._batcher.items}
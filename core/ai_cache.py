@@ -0,0 +1,316 @@
+# core/ai_cache.py
+"""Content-addressed response cache for AI calls.
+
+Responses are keyed on a hash of (model, normalized prompt). The default
+cache is two-tiered: an in-process LRU in front of an on-disk SQLite table,
+so identical prompts across Streamlit reruns (and restarts) skip the model.
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from core.ai_batching import SingleFlight
+
+CACHE_DB = "data/ai_cache.db"
+EVICT_EVERY = 100       # disk writes between row-count checks
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_prompt(prompt):
+    """Collapse whitespace so cosmetic differences share one cache entry."""
+    return _WHITESPACE.sub(" ", str(prompt)).strip()
+
+
+def cache_key(model, prompt):
+    raw = f"{model}\x00{normalize_prompt(prompt)}".encode("utf-8")
+    return hashlib.sha256(raw).hexdigest()
+
+
+class CacheStats:
+    """Hit/miss counters shared by every tier of a cache."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}
+
+    def incr(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def snapshot(self):
+        with self._lock:
+            data = dict(self.counters)
+        lookups = data.get("hits", 0) + data.get("misses", 0)
+        data["hit_rate"] = data.get("hits", 0) / lookups if lookups else 0.0
+        return data
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+
+
+class MemoryCache:
+    """Thread-safe LRU with per-entry expiry, bounded by entry count."""
+
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = CacheStats()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.stats.incr("misses")
+                return None
+            value, expires_at = item
+            if expires_at is not None and expires_at <= now:
+                del self._data[key]
+                self.stats.incr("expired")
+                self.stats.incr("misses")
+                return None
+            self._data.move_to_end(key)
+        self.stats.incr("hits")
+        return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.time() + ttl if ttl is not None else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.stats.incr("evictions")
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SQLiteCache:
+    """Persistent cache tier, bounded by row count (least recently used out).
+
+    The row count is checked every `evict_every` writes rather than on each
+    one, so the table can run up to that many rows over `max_entries`.
+    """
+
+    def __init__(self, path=CACHE_DB, max_entries=10000, evict_every=EVICT_EVERY):
+        self.path = path
+        self.max_entries = max_entries
+        self.evict_every = evict_every
+        self._writes = 0
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS ai_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT,
+                expires_at REAL,
+                accessed_at REAL
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_ai_cache_accessed ON ai_cache (accessed_at)"
+        )
+        self._conn.commit()
+
+    def get(self, key):
+        entry = self.get_entry(key)
+        return entry[0] if entry else None
+
+    def get_entry(self, key):
+        """Return (value, expires_at) so callers can carry the expiry forward."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM ai_cache WHERE key=?", (key,)
+            ).fetchone()
+            if row is None:
+                self.stats.incr("misses")
+                return None
+            value, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                self._conn.execute("DELETE FROM ai_cache WHERE key=?", (key,))
+                self._conn.commit()
+                self.stats.incr("expired")
+                self.stats.incr("misses")
+                return None
+            self._conn.execute(
+                "UPDATE ai_cache SET accessed_at=? WHERE key=?", (now, key)
+            )
+            self._conn.commit()
+        self.stats.incr("hits")
+        return value, expires_at
+
+    def set(self, key, value, ttl=None):
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO ai_cache (key, value, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, value, expires_at, now),
+            )
+            self._writes += 1
+            overflow = 0
+            if self._writes % self.evict_every == 0:
+                count = self._conn.execute("SELECT COUNT(*) FROM ai_cache").fetchone()[0]
+                overflow = count - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM ai_cache WHERE key IN ("
+                    "SELECT key FROM ai_cache ORDER BY accessed_at LIMIT ?)",
+                    (overflow,),
+                )
+                self.stats.incr("evictions", overflow)
+            self._conn.commit()
+
+    def delete(self, key):
+        with self._lock:
+            self._conn.execute("DELETE FROM ai_cache WHERE key=?", (key,))
+            self._conn.commit()
+
+    def purge_expired(self):
+        with self._lock:
+            cur = self._conn.execute(
+                "DELETE FROM ai_cache WHERE expires_at IS NOT NULL AND expires_at <= ?",
+                (time.time(),),
+            )
+            self._conn.commit()
+            return cur.rowcount
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM ai_cache")
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM ai_cache").fetchone()[0]
+
+
+class TieredCache:
+    """Memory LRU in front of a persistent tier; disk hits are promoted."""
+
+    def __init__(self, memory=None, disk=None):
+        self.memory = memory if memory is not None else MemoryCache()
+        self.disk = disk
+        self.stats = CacheStats()
+
+    def get(self, key):
+        value = self.memory.get(key)
+        if value is not None:
+            self.stats.incr("hits")
+            self.stats.incr("memory_hits")
+            return value
+        if self.disk is not None:
+            entry = self.disk.get_entry(key)
+            if entry is not None:
+                value, expires_at = entry
+                ttl = expires_at - time.time() if expires_at is not None else None
+                if ttl is None or ttl > 0:      # don't promote an entry expiring right now
+                    self.memory.set(key, value, ttl)
+                self.stats.incr("hits")
+                self.stats.incr("disk_hits")
+                return value
+        self.stats.incr("misses")
+        return None
+
+    def set(self, key, value, ttl=None):
+        self.memory.set(key, value, ttl)
+        if self.disk is not None:
+            self.disk.set(key, value, ttl)
+
+    def delete(self, key):
+        self.memory.delete(key)
+        if self.disk is not None:
+            self.disk.delete(key)
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+
+class _NullCache:
+    stats = CacheStats()
+
+    def get(self, key):
+        return None
+
+    def set(self, key, value, ttl=None):
+        pass
+
+    def delete(self, key):
+        pass
+
+    def clear(self):
+        pass
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """Process-wide cache, created on first use (memory + SQLite)."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                try:
+                    disk = SQLiteCache()
+                except sqlite3.Error:
+                    disk = None
+                _cache = TieredCache(MemoryCache(), disk)
+    return _cache
+
+
+def set_response_cache(cache):
+    """Swap the cache backend; pass None to disable caching entirely."""
+    global _cache
+    with _cache_lock:
+        _cache = cache if cache is not None else _NullCache()
+
+
+_inflight = SingleFlight()
+
+
+def cached_call(model, prompt, compute, ttl=None):
+    """Return the cached response for (model, prompt) or compute and store it.
+
+    Concurrent misses for the same key share one `compute()` call.
+    """
+    cache = get_response_cache()
+    key = cache_key(model, prompt)
+    value = cache.get(key)
+    if value is not None:
+        return value
+
+    def fill():
+        value = compute()
+        if value is not None:
+            cache.set(key, value, ttl)
+        return value
+
+    return _inflight.do(key, fill)
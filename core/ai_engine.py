@@ -1,21 +1,49 @@
-from openai import OpenAI
-client = OpenAI()
+from core import ai_gateway
+from core.ai_batching import PromptBatcher
+from core.ai_cache import cached_call
+from core.ai_streaming import cached_stream, aiter_in_thread
 
-def ai_insights(prompt):
-    response = client.chat.completions.create(
-        model="gpt-5.1",
-        messages=[{"role": "user", "content": prompt}],
-    )
-    return response.choices[0].message["content"]
+MODEL = "gpt-5.1"
+
+# Per-call-site cache lifetimes (seconds). Fraud verdicts go stale quickly,
+# personas and summaries are stable for much longer.
+DEFAULT_TTL = 15 * 60
+FRAUD_TTL = 60
+PROFILE_TTL = 6 * 60 * 60
+SUMMARY_TTL = 30 * 60
+
+def _complete(prompt):
+    return ai_gateway.complete(prompt, model=MODEL)
+
+def _complete_stream(prompt):
+    return ai_gateway.stream(prompt, model=MODEL)
+
+def ai_insights(prompt, ttl=DEFAULT_TTL, use_cache=True):
+    if not use_cache:
+        return _complete(prompt)
+    return cached_call(ai_gateway.model_id(MODEL), prompt, lambda: _complete(prompt), ttl=ttl)
+
+def ai_insights_stream(prompt, ttl=DEFAULT_TTL):
+    """Yield the response text incrementally; a cache hit arrives as one chunk."""
+    return cached_stream(ai_gateway.model_id(MODEL), prompt, lambda: _complete_stream(prompt), ttl=ttl)
+
+def ai_insights_astream(prompt, ttl=DEFAULT_TTL):
+    return aiter_in_thread(lambda: ai_insights_stream(prompt, ttl=ttl))
+
+_fraud_batch = PromptBatcher("Analyze this activity for fraud", _complete)
 
 def ai_detect_fraud(activity):
-    prompt = f"Analyze this activity for fraud: {activity}"
-    return ai_insights(prompt)
+    prompt = _fraud_batch.single_prompt(activity)
+    return cached_call(ai_gateway.model_id(MODEL), prompt, lambda: _fraud_batch(activity), ttl=FRAUD_TTL)
 
 def ai_customer_profile(data):
     prompt = f"Generate a customer behavioral profile: {data}"
-    return ai_insights(prompt)
+    return ai_insights(prompt, ttl=PROFILE_TTL)
+
+def ai_customer_profile_stream(data):
+    prompt = f"Generate a customer behavioral profile: {data}"
+    return ai_insights_stream(prompt, ttl=PROFILE_TTL)
 
 def ai_daily_summary(logs):
     prompt = f"Summarize today's system logs: {logs}"
-    return ai_insights(prompt)
\ No newline at end of file
+    return ai_insights(prompt, ttl=SUMMARY_TTL)
@@ -0,0 +1,165 @@
+# core/ai_gateway.py
+"""Single entry point for model calls.
+
+Every AI helper in the app goes through `complete` / `stream` here. The
+OpenAI client is created on first use (not at import time) and shared by
+the whole process over one keep-alive HTTP connection pool. Backends are
+looked up in a small registry; the "stub" backend answers deterministically
+without network access for tests, demos and benchmarks.
+
+Select the backend with the HUMAIN_AI_BACKEND environment variable or
+`set_default_backend()`.
+"""
+
+import hashlib
+import os
+import threading
+import time
+
+DEFAULT_BACKEND = os.environ.get("HUMAIN_AI_BACKEND", "openai")
+DEFAULT_MODEL = "gpt-4o-mini"
+
+# Connection pool shared by every request made through the OpenAI client.
+HTTP_TIMEOUT = 60.0
+HTTP_MAX_CONNECTIONS = 20
+HTTP_MAX_KEEPALIVE = 10
+HTTP_KEEPALIVE_EXPIRY = 120.0
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Process-wide OpenAI client, constructed lazily on the first call."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                import httpx
+                from openai import OpenAI
+
+                http_client = httpx.Client(
+                    timeout=HTTP_TIMEOUT,
+                    limits=httpx.Limits(
+                        max_connections=HTTP_MAX_CONNECTIONS,
+                        max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+                        keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+                    ),
+                )
+                _client = OpenAI(http_client=http_client)
+    return _client
+
+
+def close_client():
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+
+
+class OpenAIBackend:
+    """Chat Completions over the shared client."""
+
+    name = "openai"
+
+    def complete(self, prompt, model):
+        response = get_client().chat.completions.create(
+            model=model,
+            messages=[{"role": "user", "content": prompt}],
+        )
+        return response.choices[0].message.content or ""
+
+    def stream(self, prompt, model):
+        chunks = get_client().chat.completions.create(
+            model=model,
+            messages=[{"role": "user", "content": prompt}],
+            stream=True,
+        )
+        for chunk in chunks:
+            if chunk.choices:
+                yield chunk.choices[0].delta.content or ""
+
+
+class StubBackend:
+    """Offline backend: the same prompt always yields the same text.
+
+    `latency` (seconds) simulates model time so benchmarks of caching,
+    batching and concurrency have something to measure.
+    """
+
+    name = "stub"
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _text(self, prompt, model):
+        digest = hashlib.sha1(f"{model}:{prompt}".encode("utf-8")).hexdigest()[:12]
+        return f"[stub:{model}:{digest}] {prompt[:120]}"
+
+    def complete(self, prompt, model):
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return self._text(prompt, model)
+
+    def stream(self, prompt, model):
+        with self._lock:
+            self.calls += 1
+        words = self._text(prompt, model).split(" ")
+        delay = self.latency / len(words) if self.latency else 0
+        for i, word in enumerate(words):
+            if delay:
+                time.sleep(delay)
+            yield word if i == 0 else " " + word
+
+
+_factories = {
+    "openai": OpenAIBackend,
+    "stub": StubBackend,
+}
+_backends = {}
+_registry_lock = threading.Lock()
+
+
+def register_backend(name, factory):
+    """Register a backend factory (a zero-argument callable) under `name`."""
+    with _registry_lock:
+        _factories[name] = factory
+        _backends.pop(name, None)
+
+
+def set_default_backend(name):
+    global DEFAULT_BACKEND
+    if name not in _factories:
+        raise ValueError(f"Unknown AI backend: {name}")
+    DEFAULT_BACKEND = name
+
+
+def get_backend(name=None):
+    name = name or DEFAULT_BACKEND
+    backend = _backends.get(name)
+    if backend is None:
+        with _registry_lock:
+            backend = _backends.get(name)
+            if backend is None:
+                if name not in _factories:
+                    raise ValueError(f"Unknown AI backend: {name}")
+                backend = _backends[name] = _factories[name]()
+    return backend
+
+
+def model_id(model=None, backend=None):
+    """Namespace used for cache keys, so stub and live answers never mix."""
+    return f"{backend or DEFAULT_BACKEND}:{model or DEFAULT_MODEL}"
+
+
+def complete(prompt, model=None, backend=None):
+    return get_backend(backend).complete(prompt, model or DEFAULT_MODEL)
+
+
+def stream(prompt, model=None, backend=None):
+    return get_backend(backend).stream(prompt, model or DEFAULT_MODEL)
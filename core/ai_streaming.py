@@ -0,0 +1,69 @@
+# core/ai_streaming.py
+"""Helpers for streaming AI responses chunk by chunk.
+
+`cached_stream` replays a cached response in one chunk, or relays a live
+stream and stores the joined text once it has been fully consumed.
+`aiter_in_thread` turns any blocking chunk generator into an async one.
+"""
+
+import asyncio
+import threading
+
+from core.ai_cache import cache_key, get_response_cache
+
+
+def cached_stream(model, prompt, open_stream, ttl=None):
+    """Yield text chunks for (model, prompt), filling the response cache."""
+    cache = get_response_cache()
+    key = cache_key(model, prompt)
+    value = cache.get(key)
+    if value is not None:
+        yield value
+        return
+    parts = []
+    for chunk in open_stream():
+        if chunk:
+            parts.append(chunk)
+            yield chunk
+    # Only reached when the consumer read the whole stream; partial
+    # responses from an abandoned stream never land in the cache.
+    text = "".join(parts)
+    if text:
+        cache.set(key, text, ttl)
+
+
+async def aiter_in_thread(make_iter):
+    """Drive a blocking iterator on a helper thread, yielding its items async."""
+    loop = asyncio.get_running_loop()
+    q = asyncio.Queue()
+    done = object()
+    stop = threading.Event()
+
+    def put(item):
+        try:
+            loop.call_soon_threadsafe(q.put_nowait, item)
+        except RuntimeError:
+            stop.set()  # consumer's loop already closed
+
+    def produce():
+        try:
+            for item in make_iter():
+                if stop.is_set():
+                    break
+                put(item)
+        except BaseException as exc:
+            put(exc)
+        finally:
+            put(done)
+
+    threading.Thread(target=produce, name="ai-stream", daemon=True).start()
+    try:
+        while True:
+            item = await q.get()
+            if item is done:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
@@ -4,13 +4,26 @@
 # Unified System File — Ready for Copilot Commit
 # ============================================================
 
-from openai import OpenAI
-client = OpenAI()
+from core import ai_gateway
+from core.ai_batching import PromptBatcher
+from core.ai_cache import cached_call
+from core.security.fraud_engine import assess
+from core.security.ip_intel import get_ip_intel
+from core.pipelines.context_builder import build_behavior_context
+from core.pipelines import behavior_tracker
+from core.pipelines.sessionizer import describe_user
+from core.ai_streaming import cached_stream, aiter_in_thread
+from core.finance.transfers import (
+    BANK_DB as TRANSFER_DB, init_bank_schema, import_ledger, adjust_balance, post_entry, post_entries,
+    transfer, transfers
+)
+from core.finance.ledger import create_ledger_indexes, query_ledger, iter_ledger
+from core.travel_ndc import offer_builder
+from database.connection import get_db
 
 import time
 import random
 import uuid
-import sqlite3
 import streamlit as st
 
 
@@ -18,19 +31,44 @@ import streamlit as st
 # 1) AI ENGINE — Unified Enterprise AI Layer
 # ============================================================
 
+AI_MODEL = "gpt-4o-mini"
+AI_TTL = 15 * 60
+
+def _respond(prompt):
+    return ai_gateway.complete(prompt, model=AI_MODEL)
+
+def _respond_stream(prompt):
+    return ai_gateway.stream(prompt, model=AI_MODEL)
+
 def ai(prompt):
-    """Universal AI helper using new OpenAI Responses API"""
-    response = client.responses.create(
-        model="gpt-4o-mini",
-        input=prompt
-    )
-    return response.output_text
+    """Universal AI helper (routed through core.ai_gateway)"""
+    return cached_call(ai_gateway.model_id(AI_MODEL), prompt, lambda: _respond(prompt), ttl=AI_TTL)
+
+def ai_stream(prompt):
+    """Streaming variant of ai(): yields text deltas as they arrive."""
+    return cached_stream(ai_gateway.model_id(AI_MODEL), prompt, lambda: _respond_stream(prompt), ttl=AI_TTL)
+
+def ai_astream(prompt):
+    return aiter_in_thread(lambda: ai_stream(prompt))
+
+# Per-event checks are micro-batched into one model call per window.
+_fraud_batch = PromptBatcher("Fraud analysis required", _respond)
+_behavior_batch = PromptBatcher("Analyze this user behavior", _respond)
+_login_batch = PromptBatcher("Detect if login is suspicious", _respond)
+
+def _batched(batcher, item):
+    prompt = batcher.single_prompt(item)
+    return cached_call(ai_gateway.model_id(AI_MODEL), prompt, lambda: batcher(item), ttl=AI_TTL)
 
 def ai_fraud(prompt):
-    return ai(f"Fraud analysis required: {prompt}")
+    # Structured events ({user, amount, ip, device}) are scored locally first.
+    if isinstance(prompt, dict):
+        result, verdict = assess(prompt, lambda e, r: _batched(_fraud_batch, f"{e} | signals={r.as_dict()}"))
+        return verdict if verdict is not None else f"{result.decision.upper()} (score {result.score:.2f})"
+    return _batched(_fraud_batch, prompt)
 
 def ai_behavior(prompt):
-    return ai(f"Analyze this user behavior: {prompt}")
+    return _batched(_behavior_batch, prompt)
 
 def ai_crm(prompt):
     return ai(f"CRM optimization: {prompt}")
@@ -54,14 +92,16 @@ def device_fingerprint():
     return st.session_state.device_id
 
 def ip_risk(ip):
-    if ip.startswith("41."):
-        return "Low Risk"
-    if ip.startswith("102."):
-        return "Medium Risk"
-    return "Unknown / High Risk"
+    return get_ip_intel().risk(ip, default="Unknown / High Risk")
 
 def suspicious_login(email, ip):
-    return ai(f"Detect if login is suspicious: Email={email}, IP={ip}")
+    event = {"user": f"login:{email}", "ip": ip, "device": device_fingerprint()}
+    result, verdict = assess(
+        event, lambda e, r: _batched(_login_batch, f"Email={email}, IP={ip}, signals={r.as_dict()}")
+    )
+    if verdict is not None:
+        return verdict
+    return "Suspicious login" if result.decision == "block" else "Login looks normal"
 
 # ============================================================
 # 3) REALTIME ENGINE — Non-blocking Stream
@@ -81,44 +121,27 @@ def generate_realtime_event():
 # 4) BANK CORE — Enterprise Banking Engine
 # ============================================================
 
-BANK_DB = "data/bank_core.db"
+BANK_DB = TRANSFER_DB
 
 def init_bank():
-    conn = sqlite3.connect(BANK_DB)
-    c = conn.cursor()
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS accounts (
-            user TEXT PRIMARY KEY,
-            balance REAL DEFAULT 0
-        )
-    """)
-    conn.commit()
-    conn.close()
+    init_bank_schema(BANK_DB)
 
 def get_balance(user):
-    conn = sqlite3.connect(BANK_DB)
-    c = conn.cursor()
-    c.execute("SELECT balance FROM accounts WHERE user=?", (user,))
-    data = c.fetchone()
-    conn.close()
+    data = get_db(BANK_DB).query_one("SELECT balance FROM accounts WHERE user=?", (user,))
     return data[0] if data else 0
 
 def update_balance(user, amount):
-    conn = sqlite3.connect(BANK_DB)
-    c = conn.cursor()
-    bal = get_balance(user)
-    new_bal = bal + amount
-    c.execute("INSERT OR REPLACE INTO accounts (user, balance) VALUES (?, ?)",
-              (user, new_bal))
-    conn.commit()
-    conn.close()
-    return new_bal
+    return adjust_balance(user, amount, path=BANK_DB)
 
 def make_transfer(sender, receiver, amount):
-    update_balance(sender, -amount)
-    update_balance(receiver, +amount)
+    transfer(sender, receiver, amount, path=BANK_DB)
     return f"Transfer successful: {sender} → {receiver} | Amount = {amount}"
 
+def make_transfers(batch):
+    """Apply [(sender, receiver, amount), ...] in a single commit."""
+    count = transfers(batch, path=BANK_DB)
+    return f"{count} transfers committed"
+
 # ============================================================
 # 5) PAYMENTS HUB — Universal Payment Processor
 # ============================================================
@@ -143,51 +166,45 @@ def process_payment(method, amount):
 # 6) FINANCIAL LEDGER — Enterprise Ledger
 # ============================================================
 
-LEDGER_DB = "data/ledger.db"
+# Shares the bank file so transfer legs land in the same ledger table,
+# written in the same transaction as the balance updates.
+LEDGER_DB = BANK_DB
+LEGACY_LEDGER_DB = "data/ledger.db"     # the ledger's own file before it moved to the bank
 
 def init_ledger():
-    conn = sqlite3.connect(LEDGER_DB)
-    c = conn.cursor()
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS ledger (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user TEXT,
-            amount REAL,
-            type TEXT,
-            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-    conn.commit()
-    conn.close()
+    init_bank_schema(LEDGER_DB)
+    create_ledger_indexes(LEDGER_DB)
+    # One-time: bring entries written to the old file across.
+    import_ledger(LEGACY_LEDGER_DB, path=LEDGER_DB)
 
 def add_ledger_entry(user, amount, type):
-    conn = sqlite3.connect(LEDGER_DB)
-    c = conn.cursor()
-    c.execute("INSERT INTO ledger (user, amount, type) VALUES (?, ?, ?)",
-              (user, amount, type))
-    conn.commit()
-    conn.close()
+    # Keeps the accounts projection in step with the ledger.
+    post_entry(user, amount, type, path=LEDGER_DB)
+
+def add_ledger_entries(rows):
+    """Bulk variant of add_ledger_entry for [(user, amount, type), ...]."""
+    return post_entries(rows, path=LEDGER_DB)
 
 def get_ledger():
-    conn = sqlite3.connect(LEDGER_DB)
-    c = conn.cursor()
-    c.execute("SELECT * FROM ledger ORDER BY timestamp DESC")
-    data = c.fetchall()
-    conn.close()
-    return data
+    return get_db(LEDGER_DB).query("SELECT * FROM ledger ORDER BY timestamp DESC")
+
+def get_ledger_page(limit=50, cursor=None, **filters):
+    """Keyset-paginated ledger: returns (rows, next_cursor)."""
+    return query_ledger(LEDGER_DB, limit=limit, cursor=cursor, **filters)
+
+def iter_ledger_entries(**filters):
+    return iter_ledger(LEDGER_DB, **filters)
 
 # ============================================================
 # 7) BEHAVIOR ENGINE — Tracking Layer
 # ============================================================
 
 def track(event, details=""):
-    if "behavior_log" not in st.session_state:
-        st.session_state.behavior_log = []
-    st.session_state.behavior_log.append({"event": event, "details": details})
+    behavior_tracker.track(event, details)
 
 def analyze_behavior():
     logs = st.session_state.get("behavior_log", [])
-    return ai_behavior(str(logs))
+    return ai_behavior(build_behavior_context(logs))
 
 # ============================================================
 # 8) SMART CRM ENGINE — AI-Driven CRM
@@ -195,23 +212,15 @@ def analyze_behavior():
 
 def crm_user_profile(email):
     logs = st.session_state.get("behavior_log", [])
-    return ai_crm(f"Email: {email}, Logs: {logs}")
+    return ai_crm(f"Email: {email}, Behavior: {describe_user(email)}, "
+                  f"Recent activity:\n{build_behavior_context(logs)}")
 
 # ============================================================
 # 9) TRAVEL ENGINE — Mock NDC Offers
 # ============================================================
 
-def generate_flight_offers(frm="KRT", to="DXB"):
-    return [
-        {
-            "from": frm,
-            "to": to,
-            "airline": random.choice(["SA", "HN", "NX", "GL"]),
-            "fare": random.choice(["Basic", "Flex", "Premium"]),
-            "price": random.randint(150, 900)
-        }
-        for _ in range(5)
-    ]
+def generate_flight_offers(frm="KRT", to="DXB", **query):
+    return offer_builder.generate_flight_offers({"from": frm, "to": to, **query})
 
 # ============================================================
 # END OF MASTER PATCH
@@ -0,0 +1,218 @@
+# core/finance/analytics.py
+"""Columnar, NumPy-backed ledger analytics.
+
+Ledger rows are loaded once into compact column arrays — ids and epoch
+seconds as int64, amounts as fixed-point int64 cents, users and types as
+interned integer codes — and every aggregate is a vectorized pass over
+those arrays. The ledger is append-only, so `get_ledger_columns` keeps a
+per-database copy and only fetches rows newer than the last id it saw.
+
+Columns can be saved as a directory of .npy files and reloaded memory-mapped,
+so large snapshots open instantly and share pages between processes.
+"""
+
+import json
+import os
+import threading
+
+import numpy as np
+
+from core.finance.ledger import DB
+from database.connection import get_db
+
+AMOUNT_SCALE = 100          # fixed-point: cents
+FETCH_BATCH = 50_000
+
+_COLUMNS = ("ids", "user_codes", "type_codes", "amounts", "timestamps")
+
+
+class LedgerColumns:
+    def __init__(self, ids=None, user_codes=None, type_codes=None, amounts=None,
+                 timestamps=None, users=None, types=None):
+        self.ids = ids if ids is not None else np.zeros(0, np.int64)
+        self.user_codes = user_codes if user_codes is not None else np.zeros(0, np.int32)
+        self.type_codes = type_codes if type_codes is not None else np.zeros(0, np.int16)
+        self.amounts = amounts if amounts is not None else np.zeros(0, np.int64)
+        self.timestamps = timestamps if timestamps is not None else np.zeros(0, np.int64)
+        self.users = list(users or [])
+        self.types = list(types or [])
+        self._user_index = {u: i for i, u in enumerate(self.users)}
+        self._type_index = {t: i for i, t in enumerate(self.types)}
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def last_id(self):
+        return int(self.ids[-1]) if len(self.ids) else 0
+
+    # -- loading ------------------------------------------------------
+
+    def _intern(self, value, table, index):
+        code = index.get(value)
+        if code is None:
+            code = index[value] = len(table)
+            table.append(value)
+        return code
+
+    def append_rows(self, rows):
+        """Append (id, user, amount_cents, type, epoch_seconds) rows."""
+        if not rows:
+            return
+        n = len(rows)
+        ids = np.empty(n, np.int64)
+        users = np.empty(n, np.int32)
+        types = np.empty(n, np.int16)
+        amounts = np.empty(n, np.int64)
+        stamps = np.empty(n, np.int64)
+        ui, ut, ti, tt = self._user_index, self.users, self._type_index, self.types
+        for i, (rid, user, cents, type, ts) in enumerate(rows):
+            ids[i] = rid
+            code = ui.get(user)
+            users[i] = code if code is not None else self._intern(user, ut, ui)
+            code = ti.get(type)
+            types[i] = code if code is not None else self._intern(type, tt, ti)
+            amounts[i] = cents or 0
+            stamps[i] = ts or 0
+        self.ids = np.concatenate([self.ids, ids])
+        self.user_codes = np.concatenate([self.user_codes, users])
+        self.type_codes = np.concatenate([self.type_codes, types])
+        self.amounts = np.concatenate([self.amounts, amounts])
+        self.timestamps = np.concatenate([self.timestamps, stamps])
+
+    def refresh(self, path=DB):
+        """Pull rows with id greater than the last loaded one; returns how many."""
+        cur = get_db(path).execute(
+            "SELECT id, user, CAST(round(amount * ?) AS INTEGER), type, "
+            "CAST(strftime('%s', timestamp) AS INTEGER) FROM ledger WHERE id > ? ORDER BY id",
+            (AMOUNT_SCALE, self.last_id),
+        )
+        added = 0
+        while True:
+            rows = cur.fetchmany(FETCH_BATCH)
+            if not rows:
+                return added
+            self.append_rows(rows)
+            added += len(rows)
+
+    # -- selection ----------------------------------------------------
+
+    def mask(self, user=None, type=None, start=None, end=None):
+        """Boolean row mask; start/end are epoch seconds (inclusive/exclusive)."""
+        m = np.ones(len(self), bool)
+        if user is not None:
+            code = self._user_index.get(user)
+            if code is None:
+                return np.zeros(len(self), bool)
+            m &= self.user_codes == code
+        if type is not None:
+            code = self._type_index.get(type)
+            if code is None:
+                return np.zeros(len(self), bool)
+            m &= self.type_codes == code
+        if start is not None:
+            m &= self.timestamps >= start
+        if end is not None:
+            m &= self.timestamps < end
+        return m
+
+    def signed_amounts(self):
+        """Cents with credits positive and debits negative (see ledger.signed_amount)."""
+        signed = self.amounts.copy()
+        credit = self._type_index.get("credit")
+        debit = self._type_index.get("debit")
+        if credit is not None:
+            sel = self.type_codes == credit
+            signed[sel] = np.abs(signed[sel])
+        if debit is not None:
+            sel = self.type_codes == debit
+            signed[sel] = -np.abs(signed[sel])
+        return signed
+
+    # -- aggregates ---------------------------------------------------
+
+    def _group(self, codes, names, values, mask):
+        if mask is not None:
+            codes, values = codes[mask], values[mask]
+        sums = np.bincount(codes, weights=values, minlength=len(names))
+        counts = np.bincount(codes, minlength=len(names))
+        return {
+            names[i]: (round(float(sums[i])) / AMOUNT_SCALE, int(counts[i]))
+            for i in np.flatnonzero(counts)
+        }
+
+    def sum_by_user(self, signed=True, mask=None):
+        """{user: (total, count)}; balances when `signed`."""
+        values = self.signed_amounts() if signed else self.amounts
+        return self._group(self.user_codes, self.users, values, mask)
+
+    def sum_by_type(self, mask=None):
+        return self._group(self.type_codes, self.types, self.amounts, mask)
+
+    def top_users(self, k=10, signed=True, mask=None):
+        values = self.signed_amounts() if signed else self.amounts
+        codes = self.user_codes
+        if mask is not None:
+            codes, values = codes[mask], values[mask]
+        sums = np.bincount(codes, weights=values, minlength=len(self.users))
+        k = min(k, len(sums))
+        if k == 0:
+            return []
+        top = np.argpartition(-sums, k - 1)[:k]
+        top = top[np.argsort(-sums[top])]
+        return [(self.users[i], float(sums[i]) / AMOUNT_SCALE) for i in top]
+
+    def percentiles(self, q=(50, 90, 99), mask=None):
+        values = self.amounts if mask is None else self.amounts[mask]
+        if not len(values):
+            return {p: None for p in q}
+        result = np.percentile(np.abs(values), q) / AMOUNT_SCALE
+        return dict(zip(q, (float(v) for v in result)))
+
+    def time_buckets(self, interval=86400, signed=False, mask=None):
+        """(bucket_start_epochs, sums, counts) for fixed-width time buckets."""
+        stamps = self.timestamps
+        values = self.signed_amounts() if signed else self.amounts
+        if mask is not None:
+            stamps, values = stamps[mask], values[mask]
+        if not len(stamps):
+            return np.zeros(0, np.int64), np.zeros(0), np.zeros(0, np.int64)
+        buckets = stamps // interval
+        keys, inverse = np.unique(buckets, return_inverse=True)
+        sums = np.bincount(inverse, weights=values) / AMOUNT_SCALE
+        counts = np.bincount(inverse)
+        return keys * interval, sums, counts
+
+    # -- snapshots ----------------------------------------------------
+
+    def save(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        for name in _COLUMNS:
+            np.save(os.path.join(directory, f"{name}.npy"), getattr(self, name))
+        with open(os.path.join(directory, "meta.json"), "w", encoding="utf-8") as fh:
+            json.dump({"users": self.users, "types": self.types,
+                       "amount_scale": AMOUNT_SCALE, "rows": len(self)}, fh)
+
+    @classmethod
+    def load(cls, directory, mmap=True):
+        """Reload a snapshot; columns are memory-mapped read-only when `mmap`."""
+        with open(os.path.join(directory, "meta.json"), encoding="utf-8") as fh:
+            meta = json.load(fh)
+        mode = "r" if mmap else None
+        arrays = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mode)
+                  for name in _COLUMNS}
+        return cls(users=meta["users"], types=meta["types"], **arrays)
+
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def get_ledger_columns(path=DB):
+    """Process-wide columns for `path`, topped up with any new ledger rows."""
+    with _cache_lock:
+        cols = _cache.get(path)
+        if cols is None:
+            cols = _cache[path] = LedgerColumns()
+        cols.refresh(path)
+        return cols
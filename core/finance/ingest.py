@@ -0,0 +1,240 @@
+# core/finance/ingest.py
+"""Bulk ledger ingestion and settlement-file import.
+
+`add_transactions` writes rows with `executemany` in large transactions and
+folds them into the balance/daily projections per chunk (one upsert per
+touched user/day, not per row). `import_file` streams CSV or JSONL
+settlement batches through validation into the same path, committing every
+`chunk_size` rows so a bad line late in a file never loses earlier work.
+"""
+
+import csv
+import json
+import math
+import re
+import time
+from datetime import datetime, timezone
+
+from core.finance.ledger import (
+    DB, LEDGER_INDEXES, create_ledger_indexes, init_ledger,
+    BALANCE_UPSERT, DAILY_UPSERT,
+)
+from core.realtime.event_bus import publish
+from database.connection import get_db
+
+CHUNK_SIZE = 50_000
+MAX_ERRORS = 1000
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+_LEDGER_TS = re.compile(r"\d{4}-(0[1-9]|1[0-2])-(0[1-9]|[12]\d|3[01]) ([01]\d|2[0-3]):[0-5]\d:[0-5]\d$")
+_EPOCH = re.compile(r"[+-]?\d+(\.\d*)?$")
+
+_INSERT = "INSERT INTO ledger (user, amount, type, timestamp) VALUES (?, ?, ?, ?)"
+
+
+class ImportReport:
+    __slots__ = ("inserted", "rejected", "errors", "elapsed")
+
+    def __init__(self):
+        self.inserted = 0
+        self.rejected = 0
+        self.errors = []
+        self.elapsed = 0.0
+
+    @property
+    def rows_per_sec(self):
+        return self.inserted / self.elapsed if self.elapsed else 0.0
+
+    def as_dict(self):
+        return {
+            "inserted": self.inserted,
+            "rejected": self.rejected,
+            "errors": self.errors[:20],
+            "elapsed": round(self.elapsed, 3),
+            "rows_per_sec": round(self.rows_per_sec),
+        }
+
+
+def _now():
+    return datetime.now(timezone.utc).strftime(TIMESTAMP_FORMAT)
+
+
+def _from_epoch(seconds):
+    try:
+        return datetime.fromtimestamp(float(seconds), timezone.utc).strftime(TIMESTAMP_FORMAT)
+    except (OverflowError, OSError):
+        raise ValueError(f"epoch seconds out of range: {seconds!r}") from None
+
+
+def normalize_timestamp(value):
+    """Accept 'YYYY-MM-DD HH:MM:SS', ISO-8601 or epoch seconds; return the ledger format."""
+    if value is None or value == "":
+        return _now()
+    if isinstance(value, (int, float)):
+        return _from_epoch(value)
+    text = str(value).strip()
+    if _LEDGER_TS.match(text):
+        return text
+    if _EPOCH.match(text):      # e.g. '1704067200' from a CSV column
+        return _from_epoch(text)
+    parsed = datetime.fromisoformat(text.replace("Z", "+00:00"))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc)
+    return parsed.strftime(TIMESTAMP_FORMAT)
+
+
+def validate_row(row):
+    """Return (user, amount, type, timestamp) or raise ValueError."""
+    user = str(row.get("user") or "").strip()
+    if not user:
+        raise ValueError("missing user")
+    try:
+        amount = float(row.get("amount"))
+    except (TypeError, ValueError):
+        raise ValueError(f"bad amount {row.get('amount')!r}") from None
+    if not math.isfinite(amount):
+        raise ValueError(f"bad amount {row.get('amount')!r}")
+    type = str(row.get("type") or "").strip().lower()
+    if not type:
+        raise ValueError("missing type")
+    return user, amount, type, normalize_timestamp(row.get("timestamp"))
+
+
+def _apply_projections(conn, rows):
+    # Hot loop: signed_amount() is inlined.
+    balances, daily = {}, {}
+    for user, amount, type, ts in rows:
+        if type == "credit":
+            delta = abs(amount)
+        elif type == "debit":
+            delta = -abs(amount)
+        else:
+            delta = amount
+        b = balances.get(user)
+        if b is None:
+            b = balances[user] = [0.0, 0.0, 0.0, 0]
+        b[0] += delta
+        if delta > 0:
+            b[1] += delta
+        else:
+            b[2] -= delta
+        b[3] += 1
+        key = (user, ts[:10], type)
+        d = daily.get(key)
+        if d is None:
+            d = daily[key] = [0.0, 0]
+        d[0] += amount
+        d[1] += 1
+    conn.executemany(BALANCE_UPSERT, ((u, *b) for u, b in balances.items()))
+    conn.executemany(DAILY_UPSERT, ((*k, *d) for k, d in daily.items()))
+
+
+def _write_chunk(db, rows):
+    with db.transaction() as conn:
+        conn.executemany(_INSERT, rows)
+        _apply_projections(conn, rows)
+    publish("ledger.batch", entries=len(rows))
+
+
+def _drop_indexes(db):
+    for sql in LEDGER_INDEXES:
+        name = sql.split(" ON ")[0].rsplit(" ", 1)[-1]
+        db.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+def add_transactions(rows, path=DB, chunk_size=CHUNK_SIZE, defer_indexes=False):
+    """Bulk insert (user, amount, type[, timestamp]) tuples; returns the row count.
+
+    With `defer_indexes=True` the ledger indexes are dropped for the load and
+    rebuilt once at the end — faster for very large backfills, but readers
+    lose the indexes meanwhile.
+    """
+    db = get_db(path)
+    init_ledger(path)
+    if defer_indexes:
+        _drop_indexes(db)
+    count = 0
+    chunk = []
+    try:
+        now = _now()
+        for row in rows:
+            ts = row[3] if len(row) > 3 else None
+            if ts is None:
+                ts = now
+            elif ts.__class__ is not str or len(ts) != 19 or not _LEDGER_TS.match(ts):
+                ts = normalize_timestamp(ts)
+            chunk.append((row[0], float(row[1]), row[2], ts))
+            if len(chunk) >= chunk_size:
+                _write_chunk(db, chunk)
+                count += len(chunk)
+                chunk = []
+        if chunk:
+            _write_chunk(db, chunk)
+            count += len(chunk)
+    finally:
+        if defer_indexes:
+            create_ledger_indexes(path)
+    return count
+
+
+def _read_records(file_path, format):
+    if format == "jsonl":
+        with open(file_path, encoding="utf-8") as fh:
+            for line_no, line in enumerate(fh, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield line_no, json.loads(line)
+                except ValueError as exc:
+                    yield line_no, exc
+    else:
+        with open(file_path, newline="", encoding="utf-8") as fh:
+            # Header is line 1, so the first record is line 2.
+            for line_no, record in enumerate(csv.DictReader(fh), 2):
+                yield line_no, record
+
+
+def import_file(file_path, format=None, path=DB, chunk_size=CHUNK_SIZE,
+                max_errors=MAX_ERRORS, defer_indexes=False):
+    """Stream a CSV/JSONL settlement file (columns user, amount, type[, timestamp]).
+
+    Invalid rows are skipped and reported; the import aborts with ValueError
+    once more than `max_errors` rows have been rejected (already committed
+    chunks stay committed). Returns an ImportReport.
+    """
+    format = format or ("jsonl" if str(file_path).endswith((".jsonl", ".ndjson")) else "csv")
+    report = ImportReport()
+    started = time.perf_counter()
+    db = get_db(path)
+    init_ledger(path)
+    if defer_indexes:
+        _drop_indexes(db)
+    chunk = []
+    try:
+        for line_no, record in _read_records(file_path, format):
+            try:
+                if isinstance(record, Exception) or not isinstance(record, dict):
+                    raise ValueError(f"unparseable record: {record}")
+                chunk.append(validate_row(record))
+            except ValueError as exc:
+                report.rejected += 1
+                if len(report.errors) < max_errors:
+                    report.errors.append((line_no, str(exc)))
+                if report.rejected > max_errors:
+                    raise ValueError(
+                        f"{file_path}: aborting after {report.rejected} rejected rows"
+                    ) from exc
+                continue
+            if len(chunk) >= chunk_size:
+                _write_chunk(db, chunk)
+                report.inserted += len(chunk)
+                chunk = []
+        if chunk:
+            _write_chunk(db, chunk)
+            report.inserted += len(chunk)
+    finally:
+        if defer_indexes:
+            create_ledger_indexes(path)
+        report.elapsed = time.perf_counter() - started
+    return report
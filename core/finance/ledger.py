@@ -1,12 +1,38 @@
 # core/finance/ledger.py
-import sqlite3
+from core.realtime.event_bus import publish
+from database.connection import get_db
 
 DB = "finance.db"
 
-def init_ledger():
-    conn = sqlite3.connect(DB)
-    c = conn.cursor()
-    c.execute("""
+PAGE_SIZE = 50
+STREAM_BATCH = 1000
+
+LEDGER_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_ledger_ts ON ledger (timestamp, id)",
+    "CREATE INDEX IF NOT EXISTS idx_ledger_user_ts ON ledger (user, timestamp, id)",
+)
+
+def create_ledger_indexes(path=DB):
+    db = get_db(path)
+    for sql in LEDGER_INDEXES:
+        db.execute(sql)
+
+# Credits and debits are entered as positive amounts; any other type
+# (transfer legs, adjustments) already carries its sign.
+SIGNED_AMOUNT_SQL = (
+    "CASE type WHEN 'credit' THEN abs(amount) WHEN 'debit' THEN -abs(amount) ELSE amount END"
+)
+
+def signed_amount(amount, type):
+    if type == "credit":
+        return abs(amount)
+    if type == "debit":
+        return -abs(amount)
+    return amount
+
+def init_ledger(path=None):
+    path = path or DB
+    get_db(path).execute("""
         CREATE TABLE IF NOT EXISTS ledger (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             user TEXT,
@@ -15,21 +41,213 @@ def init_ledger():
             timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
         )
     """)
-    conn.commit()
-    conn.close()
+    create_ledger_indexes(path)
+    init_projections(path)
 
 def add_transaction(user, amount, type):
-    conn = sqlite3.connect(DB)
-    c = conn.cursor()
-    c.execute("INSERT INTO ledger (user, amount, type) VALUES (?, ?, ?)",
-              (user, amount, type))
-    conn.commit()
-    conn.close()
+    with get_db(DB).transaction() as conn:
+        entry_id = record_transaction(conn, user, amount, type)
+    publish("ledger.entry", id=entry_id, user=user, amount=amount, type=type)
+
+# ------------------------------------------------------------------
+# Projections: per-user balance/totals and daily rollups, maintained in
+# the same transaction as every ledger insert so lookups are O(1).
+# ------------------------------------------------------------------
+
+PROJECTION_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS ledger_balances (
+        user TEXT PRIMARY KEY,
+        balance REAL NOT NULL DEFAULT 0,
+        credits REAL NOT NULL DEFAULT 0,
+        debits REAL NOT NULL DEFAULT 0,
+        entries INTEGER NOT NULL DEFAULT 0
+    );
+    CREATE TABLE IF NOT EXISTS ledger_daily (
+        user TEXT,
+        day TEXT,
+        type TEXT,
+        total REAL NOT NULL DEFAULT 0,
+        entries INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (user, day, type)
+    );
+"""
+
+BALANCE_UPSERT = """
+    INSERT INTO ledger_balances (user, balance, credits, debits, entries)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(user) DO UPDATE SET
+        balance = balance + excluded.balance,
+        credits = credits + excluded.credits,
+        debits = debits + excluded.debits,
+        entries = entries + excluded.entries
+"""
+
+DAILY_UPSERT = """
+    INSERT INTO ledger_daily (user, day, type, total, entries)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(user, day, type) DO UPDATE SET
+        total = total + excluded.total,
+        entries = entries + excluded.entries
+"""
+
+def init_projections(path=DB):
+    db = get_db(path)
+    db.executescript(PROJECTION_SCHEMA)
+    # First run against an existing ledger: backfill once.
+    if db.query_one("SELECT 1 FROM ledger LIMIT 1") and \
+            not db.query_one("SELECT 1 FROM ledger_balances LIMIT 1"):
+        rebuild_projections(path)
+
+def record_transaction(conn, user, amount, type):
+    """Insert a ledger row and update projections on `conn`'s open transaction."""
+    cur = conn.execute("INSERT INTO ledger (user, amount, type) VALUES (?, ?, ?)",
+                       (user, amount, type))
+    day = conn.execute("SELECT substr(timestamp, 1, 10) FROM ledger WHERE id=?",
+                       (cur.lastrowid,)).fetchone()[0]
+    delta = signed_amount(amount, type)
+    conn.execute(BALANCE_UPSERT, (user, delta, max(delta, 0), max(-delta, 0), 1))
+    conn.execute(DAILY_UPSERT, (user, day, type, amount, 1))
+    return cur.lastrowid
+
+def get_balance(user, path=DB):
+    row = get_db(path).query_one("SELECT balance FROM ledger_balances WHERE user=?", (user,))
+    return row[0] if row else 0
+
+def get_user_totals(user, path=DB):
+    row = get_db(path).query_one(
+        "SELECT balance, credits, debits, entries FROM ledger_balances WHERE user=?", (user,)
+    )
+    if not row:
+        return {"balance": 0, "credits": 0, "debits": 0, "entries": 0}
+    return dict(zip(("balance", "credits", "debits", "entries"), row))
+
+def get_daily_totals(user, start=None, end=None, path=DB):
+    """[(day, type, total, entries)] for `user`, optionally bounded by day strings."""
+    sql = "SELECT day, type, total, entries FROM ledger_daily WHERE user=?"
+    params = [user]
+    if start:
+        sql += " AND day >= ?"
+        params.append(str(start))
+    if end:
+        sql += " AND day <= ?"
+        params.append(str(end))
+    return get_db(path).query(sql + " ORDER BY day, type", params)
+
+def compute_projections(path=DB):
+    """Recompute both projections from the raw ledger in one streaming pass."""
+    balances, daily = {}, {}
+    cur = get_db(path).execute("SELECT user, amount, type, timestamp FROM ledger")
+    while True:
+        rows = cur.fetchmany(STREAM_BATCH)
+        if not rows:
+            break
+        for user, amount, type, ts in rows:
+            amount = amount or 0
+            delta = signed_amount(amount, type)
+            b = balances.get(user)
+            if b is None:
+                b = balances[user] = [0.0, 0.0, 0.0, 0]
+            b[0] += delta
+            if delta > 0:
+                b[1] += delta
+            else:
+                b[2] -= delta
+            b[3] += 1
+            key = (user, str(ts)[:10], type)
+            d = daily.get(key)
+            if d is None:
+                d = daily[key] = [0.0, 0]
+            d[0] += amount
+            d[1] += 1
+    return balances, daily
+
+def rebuild_projections(path=DB):
+    # Recompute inside the write transaction so no insert can slip in
+    # between the scan and the swap.
+    with get_db(path).transaction() as conn:
+        balances, daily = compute_projections(path)
+        conn.execute("DELETE FROM ledger_balances")
+        conn.execute("DELETE FROM ledger_daily")
+        conn.executemany(
+            "INSERT INTO ledger_balances (user, balance, credits, debits, entries) VALUES (?, ?, ?, ?, ?)",
+            ((user, *b) for user, b in balances.items()),
+        )
+        conn.executemany(
+            "INSERT INTO ledger_daily (user, day, type, total, entries) VALUES (?, ?, ?, ?, ?)",
+            ((*key, *d) for key, d in daily.items()),
+        )
+    return len(balances), len(daily)
+
+def verify_projections(path=DB, tolerance=1e-6):
+    """Compare stored projections with a fresh recompute; returns mismatches."""
+    balances, daily = compute_projections(path)
+    db = get_db(path)
+    problems = []
+    stored = {row[0]: list(row[1:]) for row in db.query(
+        "SELECT user, balance, credits, debits, entries FROM ledger_balances")}
+    for user in set(stored) | set(balances):
+        want, have = balances.get(user), stored.get(user)
+        if want is None or have is None or any(abs(a - b) > tolerance for a, b in zip(want, have)):
+            problems.append(("balance", user, want, have))
+    stored = {tuple(row[:3]): list(row[3:]) for row in db.query(
+        "SELECT user, day, type, total, entries FROM ledger_daily")}
+    for key in set(stored) | set(daily):
+        want, have = daily.get(key), stored.get(key)
+        if want is None or have is None or any(abs(a - b) > tolerance for a, b in zip(want, have)):
+            problems.append(("daily", key, want, have))
+    return problems
 
 def get_transactions():
-    conn = sqlite3.connect(DB)
-    c = conn.cursor()
-    c.execute("SELECT * FROM ledger ORDER BY timestamp DESC")
-    data = c.fetchall()
-    conn.close()
-    return data
\ No newline at end of file
+    return get_db(DB).query("SELECT * FROM ledger ORDER BY timestamp DESC")
+
+def query_ledger(path=DB, limit=PAGE_SIZE, cursor=None, user=None, type=None,
+                 start=None, end=None):
+    """One page of ledger rows, newest first, using keyset pagination.
+
+    `cursor` is the (timestamp, id) of the last row of the previous page;
+    `start`/`end` bound the timestamp (inclusive/exclusive). Returns
+    (rows, next_cursor), with next_cursor None on the last page. Each page
+    is an index range scan, so cost does not grow with table size or depth.
+    """
+    where, params = [], []
+    if user:
+        where.append("user = ?")
+        params.append(user)
+    if type:
+        where.append("type = ?")
+        params.append(type)
+    if start is not None:
+        where.append("timestamp >= ?")
+        params.append(str(start))
+    if end is not None:
+        where.append("timestamp < ?")
+        params.append(str(end))
+    if cursor is not None:
+        where.append("(timestamp, id) < (?, ?)")
+        params.extend(cursor)
+    sql = "SELECT id, user, amount, type, timestamp FROM ledger"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY timestamp DESC, id DESC LIMIT ?"
+    params.append(limit + 1)
+    rows = get_db(path).query(sql, params)
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        return rows, (last[4], last[0])
+    return rows, None
+
+def get_transactions_page(limit=PAGE_SIZE, cursor=None, **filters):
+    return query_ledger(DB, limit=limit, cursor=cursor, **filters)
+
+def iter_ledger(path=DB, batch_size=STREAM_BATCH, **filters):
+    """Stream every matching row, newest first, without materializing the table."""
+    cursor = None
+    while True:
+        rows, cursor = query_ledger(path, limit=batch_size, cursor=cursor, **filters)
+        yield from rows
+        if cursor is None:
+            return
+
+def iter_transactions(batch_size=STREAM_BATCH, **filters):
+    return iter_ledger(DB, batch_size=batch_size, **filters)
@@ -0,0 +1,244 @@
+# core/finance/transfers.py
+"""Atomic transfer engine for the bank core.
+
+A transfer debits the sender, credits the receiver and writes both ledger
+legs inside one BEGIN IMMEDIATE transaction, using in-place
+`balance = balance + ?` upserts instead of read-then-write. Accounts and
+ledger live in the same database file so the whole transfer commits (or
+rolls back) as a unit.
+
+`accounts` is a projection of the bank ledger: every balance change writes
+a ledger row in the same transaction, and `verify_accounts` /
+`rebuild_accounts` check or recompute it from the ledger. Balances set
+before the ledger existed are written to it as opening-balance rows (at
+schema init and before a rebuild), so a rebuild keeps them.
+
+`import_ledger` copies a legacy ledger file (rows that never moved an
+account) into the bank ledger once, with an offsetting opening row per
+user so balances and rebuilds are unchanged.
+"""
+
+import os
+import time
+
+from core.finance.ledger import SIGNED_AMOUNT_SQL, signed_amount
+from core.realtime.event_bus import publish
+from database.connection import get_db
+
+BANK_DB = "data/bank_core.db"
+
+TRANSFER_OUT = "transfer_out"
+TRANSFER_IN = "transfer_in"
+ADJUSTMENT = "adjustment"
+OPENING_BALANCE = "opening_balance"
+
+_UPSERT = (
+    "INSERT INTO accounts (user, balance) VALUES (?, ?) "
+    "ON CONFLICT(user) DO UPDATE SET balance = balance + excluded.balance"
+)
+_LEDGER_INSERT = "INSERT INTO ledger (user, amount, type) VALUES (?, ?, ?)"
+
+
+class InsufficientFunds(ValueError):
+    pass
+
+
+def init_bank_schema(path=BANK_DB):
+    get_db(path).executescript("""
+        CREATE TABLE IF NOT EXISTS accounts (
+            user TEXT PRIMARY KEY,
+            balance REAL DEFAULT 0
+        );
+        CREATE TABLE IF NOT EXISTS ledger (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user TEXT,
+            amount REAL,
+            type TEXT,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+        );
+    """)
+    # Accounts from before the ledger get their opening row before they transact.
+    seed_opening_balances(path)
+
+
+def _validate(sender, receiver, amount):
+    if not sender or not receiver:
+        raise ValueError("Transfer requires a sender and a receiver")
+    if sender == receiver:
+        raise ValueError("Cannot transfer to the same account")
+    if amount is None or amount <= 0:
+        raise ValueError(f"Transfer amount must be positive, got {amount}")
+
+
+def _balance(conn, user):
+    row = conn.execute("SELECT balance FROM accounts WHERE user=?", (user,)).fetchone()
+    return row[0] if row else 0
+
+
+def post_entry(user, amount, type, path=BANK_DB):
+    """Write one ledger row and apply it to the account; returns the new balance."""
+    db = get_db(path)
+    with db.transaction() as conn:
+        conn.execute(_LEDGER_INSERT, (user, amount, type))
+        conn.execute(_UPSERT, (user, signed_amount(amount, type)))
+        balance = _balance(conn, user)
+    publish("ledger.entry", user=user, amount=amount, type=type)
+    return balance
+
+
+def post_entries(rows, path=BANK_DB):
+    """Bulk post (user, amount, type) rows in one transaction; returns the count."""
+    rows = list(rows)
+    net = {}
+    for user, amount, type in rows:
+        net[user] = net.get(user, 0) + signed_amount(amount, type)
+    db = get_db(path)
+    with db.transaction() as conn:
+        conn.executemany(_LEDGER_INSERT, rows)
+        conn.executemany(_UPSERT, net.items())
+    publish("ledger.batch", entries=len(rows))
+    return len(rows)
+
+
+def adjust_balance(user, amount, path=BANK_DB):
+    """Add `amount` (may be negative) to one account in place; returns the new balance."""
+    return post_entry(user, amount, ADJUSTMENT, path=path)
+
+
+def transfer(sender, receiver, amount, allow_overdraft=True, path=BANK_DB):
+    """Move `amount` between accounts atomically; returns (sender_bal, receiver_bal)."""
+    _validate(sender, receiver, amount)
+    db = get_db(path)
+    with db.transaction() as conn:
+        conn.execute(_UPSERT, (sender, -amount))
+        sender_balance = _balance(conn, sender)
+        if not allow_overdraft and sender_balance < 0:
+            raise InsufficientFunds(f"{sender} has insufficient funds for {amount}")
+        conn.execute(_UPSERT, (receiver, amount))
+        conn.executemany(_LEDGER_INSERT, (
+            (sender, -amount, TRANSFER_OUT),
+            (receiver, amount, TRANSFER_IN),
+        ))
+        receiver_balance = _balance(conn, receiver)
+    publish("ledger.transfer", sender=sender, receiver=receiver, amount=amount)
+    return sender_balance, receiver_balance
+
+
+def transfers(batch, allow_overdraft=True, path=BANK_DB):
+    """Apply many (sender, receiver, amount) transfers in one transaction.
+
+    Balance updates are netted per account so each account is touched once;
+    every transfer still gets its two ledger rows. With
+    `allow_overdraft=False`, the batch is rejected as a whole if any account
+    whose balance it lowers would end negative; an already-negative account
+    that only gains money is fine. Returns the number of transfers applied.
+    """
+    net = {}
+    legs = []
+    for sender, receiver, amount in batch:
+        _validate(sender, receiver, amount)
+        net[sender] = net.get(sender, 0) - amount
+        net[receiver] = net.get(receiver, 0) + amount
+        legs.append((sender, -amount, TRANSFER_OUT))
+        legs.append((receiver, amount, TRANSFER_IN))
+    if not legs:
+        return 0
+
+    db = get_db(path)
+    with db.transaction() as conn:
+        conn.executemany(_UPSERT, net.items())
+        if not allow_overdraft:
+            users = [user for user, delta in net.items() if delta < 0]
+            for i in range(0, len(users), 500):
+                chunk = users[i:i + 500]
+                marks = ",".join("?" * len(chunk))
+                row = conn.execute(
+                    f"SELECT user FROM accounts WHERE user IN ({marks}) AND balance < 0 LIMIT 1",
+                    chunk,
+                ).fetchone()
+                if row:
+                    raise InsufficientFunds(f"{row[0]} would be overdrawn by this batch")
+        conn.executemany(_LEDGER_INSERT, legs)
+    publish("ledger.batch", entries=len(legs))
+    return len(legs) // 2
+
+
+_LEDGER_BALANCES = f"SELECT user, SUM({SIGNED_AMOUNT_SQL}) FROM ledger GROUP BY user"
+
+
+def verify_accounts(path=BANK_DB, tolerance=1e-6):
+    """[(user, ledger_balance, account_balance)] wherever the two disagree."""
+    db = get_db(path)
+    expected = dict(db.query(_LEDGER_BALANCES))
+    stored = dict(db.query("SELECT user, balance FROM accounts"))
+    problems = []
+    for user in set(expected) | set(stored):
+        want, have = expected.get(user, 0) or 0, stored.get(user, 0) or 0
+        if abs(want - have) > tolerance:
+            problems.append((user, want, have))
+    return problems
+
+
+def seed_opening_balances(path=BANK_DB):
+    """Write an opening-balance ledger row for each non-zero account with no ledger
+    history; returns how many."""
+    with get_db(path).transaction() as conn:
+        return conn.execute(
+            "INSERT INTO ledger (user, amount, type) SELECT user, balance, ? FROM accounts "
+            "WHERE balance != 0 AND user NOT IN (SELECT DISTINCT user FROM ledger WHERE user IS NOT NULL)",
+            (OPENING_BALANCE,),
+        ).rowcount
+
+
+def import_ledger(source, path=BANK_DB):
+    """Copy the ledger rows of database file `source` into this ledger, once per source.
+
+    The copied rows were never applied to `accounts`, so each touched user
+    also gets an opening-balance row that brings their ledger sum back to
+    their current balance. Returns the number of rows copied (0 when the
+    source is missing or already imported).
+    """
+    source = os.path.abspath(source)
+    if not os.path.exists(source) or source == os.path.abspath(path):
+        return 0
+    db = get_db(path)
+    db.execute("CREATE TABLE IF NOT EXISTS ledger_imports (source TEXT PRIMARY KEY, rows INTEGER, "
+               "imported_at REAL)")
+    if db.query_one("SELECT 1 FROM ledger_imports WHERE source=?", (source,)):
+        return 0
+    db.execute("ATTACH DATABASE ? AS legacy", (source,))     # not allowed inside a transaction
+    try:
+        with db.transaction() as conn:
+            if conn.execute("SELECT 1 FROM ledger_imports WHERE source=?", (source,)).fetchone():
+                return 0
+            has_ledger = conn.execute(
+                "SELECT 1 FROM legacy.sqlite_master WHERE type='table' AND name='ledger'").fetchone()
+            copied = 0
+            if has_ledger:
+                copied = conn.execute(
+                    "INSERT INTO ledger (user, amount, type, timestamp) "
+                    "SELECT user, amount, type, timestamp FROM legacy.ledger ORDER BY id"
+                ).rowcount
+                conn.execute(
+                    f"INSERT INTO ledger (user, amount, type) "
+                    f"SELECT l.user, COALESCE(a.balance, 0) - l.total, ? FROM ("
+                    f"  SELECT user, SUM({SIGNED_AMOUNT_SQL}) AS total FROM ledger"
+                    f"  WHERE user IN (SELECT DISTINCT user FROM legacy.ledger) GROUP BY user"
+                    f") l LEFT JOIN accounts a ON a.user = l.user "
+                    f"WHERE abs(COALESCE(a.balance, 0) - l.total) > 1e-9",
+                    (OPENING_BALANCE,),
+                )
+            conn.execute("INSERT INTO ledger_imports VALUES (?, ?, ?)", (source, copied, time.time()))
+    finally:
+        db.execute("DETACH DATABASE legacy")
+    return copied
+
+
+def rebuild_accounts(path=BANK_DB):
+    """Recompute every account balance from the ledger in one pass, after seeding
+    opening balances for accounts the ledger has never seen."""
+    with get_db(path).transaction() as conn:
+        seed_opening_balances(path)
+        conn.execute("DELETE FROM accounts")
+        conn.execute(f"INSERT INTO accounts (user, balance) {_LEDGER_BALANCES}")
+        return conn.execute("SELECT COUNT(*) FROM accounts").fetchone()[0]
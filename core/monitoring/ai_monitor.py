@@ -1,8 +1,14 @@
 # core/monitoring/ai_monitor.py
-from core.ai_engine import ai_insights
+from core.ai_engine import ai_insights, SUMMARY_TTL
+from core.ai_cache import get_response_cache
+
+HEALTHCHECK_TTL = 60
 
 def ai_healthcheck():
-    return ai_insights("Provide a brief health status for the AI system.")
+    return ai_insights("Provide a brief health status for the AI system.", ttl=HEALTHCHECK_TTL)
 
 def ai_usage_summary(logs):
-    return ai_insights(f"Summarize AI usage logs: {logs}")
\ No newline at end of file
+    return ai_insights(f"Summarize AI usage logs: {logs}", ttl=SUMMARY_TTL)
+
+def ai_cache_stats():
+    return get_response_cache().stats.snapshot()
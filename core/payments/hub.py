@@ -1,16 +1,23 @@
 # core/payments/hub.py
-def process_payment(method, amount):
+from core.payments.processor import (
+    SUPPORTED_METHODS, init_payments, submit_payment, process_payment_now, get_payment
+)
+
+def process_payment(method, amount, user=None, idempotency_key=None):
+    # Retrying with the same idempotency_key returns the original payment.
+    payment, _ = submit_payment(method, amount, user=user, idempotency_key=idempotency_key)
+    payment = process_payment_now(payment)
     return {
-        "method": method,
-        "amount": amount,
-        "status": "APPROVED",
-        "reference": "TXN-" + str(hash(method + str(amount)))[:10]
+        "method": payment["method"],
+        "amount": payment["amount"],
+        "status": payment["status"],
+        "reference": payment["reference"]
     }
 
-SUPPORTED_METHODS = [
-    "Card",
-    "Bank Transfer",
-    "Mobile Money",
-    "eWallet",
-    "Internal Transfer"
-]
\ No newline at end of file
+def enqueue_payment(method, amount, user=None, idempotency_key=None):
+    """Queue the payment for the background workers; returns its reference."""
+    from core.payments.queue import get_payment_queue
+    return get_payment_queue().enqueue(method, amount, user=user, idempotency_key=idempotency_key)
+
+def payment_status(reference):
+    return get_payment(reference)
@@ -0,0 +1,268 @@
+# core/payments/processor.py
+"""Idempotent, persisted payment processing.
+
+Every payment carries an idempotency key; the reference is derived from it
+(stable across processes and retries), and a UNIQUE index on the key turns
+a retried submit into a lookup of the original payment. Status changes are
+recorded in `payment_events`, and an approved payment is posted to the
+finance ledger in the same transaction as its final status.
+
+Payments live in the ledger's database file so that post is atomic.
+Pending payments can be drained in batches through a worker pool with
+`process_pending`.
+"""
+
+import hashlib
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from core.finance.ledger import DB as LEDGER_DB, init_ledger, record_transaction
+from core.realtime.event_bus import publish
+from core.security.fraud_engine import score_event
+from database.connection import get_db
+
+PAYMENTS_DB = LEDGER_DB
+
+SUPPORTED_METHODS = [
+    "Card",
+    "Bank Transfer",
+    "Mobile Money",
+    "eWallet",
+    "Internal Transfer"
+]
+
+PENDING = "PENDING"
+PROCESSING = "PROCESSING"
+APPROVED = "APPROVED"
+DECLINED = "DECLINED"
+FAILED = "FAILED"
+FINAL_STATES = (APPROVED, DECLINED, FAILED)
+
+BATCH_SIZE = 100
+WORKERS = 4
+
+_COLUMNS = ("reference", "idempotency_key", "user", "method", "amount", "status",
+            "created_at", "updated_at", "detail", "attempts", "next_attempt_at")
+
+
+class TransientPaymentError(Exception):
+    """A downstream failure worth retrying (timeouts, PSP unavailable)."""
+
+
+def init_payments(path=PAYMENTS_DB):
+    init_ledger(path)
+    get_db(path).executescript("""
+        CREATE TABLE IF NOT EXISTS payments (
+            reference TEXT PRIMARY KEY,
+            idempotency_key TEXT NOT NULL UNIQUE,
+            user TEXT,
+            method TEXT,
+            amount REAL,
+            status TEXT,
+            created_at REAL,
+            updated_at REAL,
+            detail TEXT,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at REAL NOT NULL DEFAULT 0
+        );
+        CREATE INDEX IF NOT EXISTS idx_payments_status ON payments (status, created_at);
+        CREATE TABLE IF NOT EXISTS payment_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            reference TEXT,
+            status TEXT,
+            at REAL,
+            detail TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_payment_events_ref ON payment_events (reference, id);
+    """)
+    _add_missing_columns(path)
+
+
+def _add_missing_columns(path):
+    # Databases created before retry scheduling lack these columns.
+    db = get_db(path)
+    existing = {row[1] for row in db.query("PRAGMA table_info(payments)")}
+    for name, ddl in (("attempts", "INTEGER NOT NULL DEFAULT 0"),
+                      ("next_attempt_at", "REAL NOT NULL DEFAULT 0")):
+        if name not in existing:
+            db.execute(f"ALTER TABLE payments ADD COLUMN {name} {ddl}")
+
+
+def payment_reference(idempotency_key):
+    return "TXN-" + hashlib.sha256(idempotency_key.encode("utf-8")).hexdigest()[:16].upper()
+
+
+def _row_to_dict(row):
+    return dict(zip(_COLUMNS, row)) if row else None
+
+
+def log_payment_event(conn, reference, status, detail=None, at=None):
+    conn.execute(
+        "INSERT INTO payment_events (reference, status, at, detail) VALUES (?, ?, ?, ?)",
+        (reference, status, at or time.time(), detail),
+    )
+
+
+def get_payment(reference, path=PAYMENTS_DB):
+    return _row_to_dict(get_db(path).query_one(
+        f"SELECT {', '.join(_COLUMNS)} FROM payments WHERE reference=?", (reference,)))
+
+
+def get_payment_history(reference, path=PAYMENTS_DB):
+    return get_db(path).query(
+        "SELECT status, at, detail FROM payment_events WHERE reference=? ORDER BY id", (reference,))
+
+
+def submit_payment(method, amount, user=None, idempotency_key=None, path=PAYMENTS_DB, admit=None):
+    """Record a PENDING payment, or return the existing one for a repeated key.
+
+    `admit(conn)`, if given, runs inside the same BEGIN IMMEDIATE transaction
+    before a new payment is inserted and may raise to refuse it (the queue's
+    depth limit). Returns (payment_dict, created).
+    """
+    if method not in SUPPORTED_METHODS:
+        raise ValueError(f"Unsupported payment method: {method}")
+    if amount is None or amount <= 0:
+        raise ValueError(f"Payment amount must be positive, got {amount}")
+    key = idempotency_key or uuid.uuid4().hex
+    reference = payment_reference(key)
+    now = time.time()
+    db = get_db(path)
+    with db.transaction() as conn:
+        if admit is not None and not conn.execute(
+                "SELECT 1 FROM payments WHERE idempotency_key=?", (key,)).fetchone():
+            admit(conn)
+        cur = conn.execute(
+            "INSERT OR IGNORE INTO payments "
+            "(reference, idempotency_key, user, method, amount, status, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (reference, key, user, method, float(amount), PENDING, now, now),
+        )
+        created = cur.rowcount == 1
+        if created:
+            log_payment_event(conn, reference, PENDING, at=now)
+        row = conn.execute(
+            f"SELECT {', '.join(_COLUMNS)} FROM payments WHERE idempotency_key=?", (key,)
+        ).fetchone()
+    payment = _row_to_dict(row)
+    if created:
+        publish("payments.submitted", reference=reference, method=method, amount=float(amount))
+    if not created and (payment["method"], payment["amount"]) != (method, float(amount)):
+        raise ValueError(f"Idempotency key {key!r} was already used for a different payment")
+    return payment, created
+
+
+def authorize(payment):
+    """Default decision step: local fraud scoring. Returns (status, detail)."""
+    result = score_event({"user": payment["user"], "amount": payment["amount"]})
+    if result.decision == "block":
+        return DECLINED, "fraud:" + ",".join(result.reasons)
+    return APPROVED, None
+
+
+def finalize_payment(conn, payment, status, detail):
+    """Final status + event + ledger post, on the caller's open transaction."""
+    now = time.time()
+    cur = conn.execute(
+        "UPDATE payments SET status=?, updated_at=?, detail=? "
+        "WHERE reference=? AND status NOT IN (?, ?, ?)",
+        (status, now, detail, payment["reference"], *FINAL_STATES),
+    )
+    if cur.rowcount != 1:
+        return False  # already finalized elsewhere
+    log_payment_event(conn, payment["reference"], status, detail, at=now)
+    if status == APPROVED:
+        record_transaction(conn, payment["user"] or "guest", payment["amount"], "debit")
+    return True
+
+
+def publish_outcome(payment, status, detail=None):
+    """Announce a committed final status on the event bus."""
+    publish("payments." + status.lower(), reference=payment["reference"], user=payment["user"],
+            method=payment["method"], amount=payment["amount"], detail=detail)
+
+
+def claim_payments(conn, limit):
+    """Move up to `limit` due PENDING payments to PROCESSING and return them."""
+    now = time.time()
+    rows = conn.execute(
+        f"SELECT {', '.join(_COLUMNS)} FROM payments "
+        "WHERE status=? AND next_attempt_at <= ? ORDER BY created_at LIMIT ?",
+        (PENDING, now, limit),
+    ).fetchall()
+    if rows:
+        conn.executemany(
+            "UPDATE payments SET status=?, updated_at=?, attempts=attempts + 1 WHERE reference=?",
+            [(PROCESSING, now, r[0]) for r in rows],
+        )
+        conn.executemany(
+            "INSERT INTO payment_events (reference, status, at) VALUES (?, ?, ?)",
+            [(r[0], PROCESSING, now) for r in rows],
+        )
+    claimed = [_row_to_dict(r) for r in rows]
+    for payment in claimed:
+        payment["status"] = PROCESSING
+        payment["attempts"] += 1
+    return claimed
+
+
+def _decide(payment, authorizer):
+    try:
+        return authorizer(payment)
+    except Exception as exc:
+        return FAILED, f"{type(exc).__name__}: {exc}"
+
+
+def process_payment_now(payment, authorizer=authorize, path=PAYMENTS_DB):
+    """Authorize and finalize one already-submitted payment."""
+    if payment["status"] in FINAL_STATES:
+        return payment
+    status, detail = _decide(payment, authorizer)
+    with get_db(path).transaction() as conn:
+        done = finalize_payment(conn, payment, status, detail)
+    if done:
+        publish_outcome(payment, status, detail)
+    return get_payment(payment["reference"], path)
+
+
+def process_pending(batch_size=BATCH_SIZE, workers=WORKERS, authorizer=authorize,
+                    path=PAYMENTS_DB, executor=None):
+    """Drain one batch of PENDING payments; returns the number finalized.
+
+    The batch is claimed in one transaction, authorized concurrently on the
+    worker pool, and all results (status, events, ledger rows) are
+    committed together in a second transaction.
+    """
+    db = get_db(path)
+    with db.transaction() as conn:
+        batch = claim_payments(conn, batch_size)
+    if not batch:
+        return 0
+    if executor is None:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="payment") as pool:
+            decisions = list(pool.map(lambda p: _decide(p, authorizer), batch))
+    else:
+        decisions = list(executor.map(lambda p: _decide(p, authorizer), batch))
+    finalized = []
+    with db.transaction() as conn:
+        for payment, (status, detail) in zip(batch, decisions):
+            if finalize_payment(conn, payment, status, detail):
+                finalized.append((payment, status, detail))
+    for outcome in finalized:
+        publish_outcome(*outcome)
+    return len(finalized)
+
+
+def requeue_stuck(older_than=300, path=PAYMENTS_DB):
+    """Return PROCESSING payments abandoned by a crashed worker to PENDING."""
+    cutoff = time.time() - older_than
+    with get_db(path).transaction() as conn:
+        refs = [r[0] for r in conn.execute(
+            "SELECT reference FROM payments WHERE status=? AND updated_at < ?",
+            (PROCESSING, cutoff)).fetchall()]
+        for ref in refs:
+            conn.execute("UPDATE payments SET status=?, updated_at=? WHERE reference=?",
+                         (PENDING, time.time(), ref))
+            log_payment_event(conn, ref, PENDING, "requeued")
+    return len(refs)
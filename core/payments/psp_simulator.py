@@ -0,0 +1,67 @@
+# core/payments/psp_simulator.py
+"""Local stand-in for a payment service provider, for demos and load tests.
+
+Each charge sleeps for a configurable latency and then approves, declines,
+or fails with a retryable error at configurable rates. The defaults can be
+set with the HUMAIN_PSP_* environment variables.
+"""
+
+import os
+import random
+import threading
+import time
+
+from core.payments.processor import APPROVED, DECLINED, TransientPaymentError, authorize
+
+LATENCY = float(os.environ.get("HUMAIN_PSP_LATENCY", "0.2"))
+JITTER = float(os.environ.get("HUMAIN_PSP_JITTER", "0.1"))
+FAILURE_RATE = float(os.environ.get("HUMAIN_PSP_FAILURE_RATE", "0.05"))
+DECLINE_RATE = float(os.environ.get("HUMAIN_PSP_DECLINE_RATE", "0.02"))
+
+
+class PSPUnavailable(TransientPaymentError):
+    pass
+
+
+class PSPSimulator:
+    def __init__(self, latency=LATENCY, jitter=JITTER, failure_rate=FAILURE_RATE,
+                 decline_rate=DECLINE_RATE, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.decline_rate = decline_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.failures = 0
+        self.declines = 0
+
+    def _roll(self):
+        with self._lock:
+            self.calls += 1
+            return self._random.random(), self._random.uniform(-self.jitter, self.jitter)
+
+    def charge(self, payment):
+        """Returns (status, detail); raises PSPUnavailable on simulated outages."""
+        roll, jitter = self._roll()
+        time.sleep(max(0.0, self.latency + jitter))
+        if roll < self.failure_rate:
+            with self._lock:
+                self.failures += 1
+            raise PSPUnavailable(f"PSP unavailable for {payment['reference']}")
+        if roll < self.failure_rate + self.decline_rate:
+            with self._lock:
+                self.declines += 1
+            return DECLINED, "psp:declined"
+        return APPROVED, None
+
+    def authorizer(self, payment):
+        """Fraud check first, then the PSP charge (usable as a queue authorizer)."""
+        status, detail = authorize(payment)
+        if status != APPROVED:
+            return status, detail
+        return self.charge(payment)
+
+    def stats(self):
+        with self._lock:
+            return {"calls": self.calls, "failures": self.failures, "declines": self.declines}
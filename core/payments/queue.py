@@ -0,0 +1,221 @@
+# core/payments/queue.py
+"""Durable payment queue drained by a background worker pool.
+
+The `payments` table is the queue itself. A PENDING row is a job waiting to
+run, and enqueueing is `submit_payment`, so it survives restarts and stays
+idempotent. Each worker claims one due payment at a time with BEGIN
+IMMEDIATE, so concurrent workers (in this process or others) never take
+the same job.
+
+A TransientPaymentError (PSP timeout or outage) puts the payment back to
+PENDING with an exponential backoff delay until `max_attempts` is reached;
+after that the payment is FAILED. The queue is bounded: once `max_depth`
+payments are waiting or running, `enqueue` raises QueueFull, or waits for
+space when `block=True`. Callers poll `status(reference)` for the outcome.
+
+Set HUMAIN_PSP=simulator to run the shared queue against the local PSP
+simulator instead of fraud scoring alone.
+"""
+
+import os
+import random
+import threading
+import time
+
+from core.payments.processor import (
+    PAYMENTS_DB, PENDING, PROCESSING, FAILED, TransientPaymentError,
+    init_payments, submit_payment, get_payment, payment_reference, authorize, requeue_stuck,
+    claim_payments, finalize_payment, log_payment_event, publish_outcome,
+)
+from database.connection import get_db
+
+WORKERS = 4
+MAX_DEPTH = 1000
+MAX_ATTEMPTS = 5
+BASE_DELAY = 0.5        # seconds before the first retry
+MAX_DELAY = 30.0
+POLL_INTERVAL = 0.25    # idle workers re-check for due retries this often
+LEASE_TIMEOUT = 300     # PROCESSING rows older than this are requeued on start
+
+
+class QueueFull(Exception):
+    pass
+
+
+def backoff_delay(attempts, base=BASE_DELAY, cap=MAX_DELAY):
+    """Exponential backoff with jitter: about base * 2**(attempts-1), capped."""
+    delay = min(cap, base * 2 ** max(attempts - 1, 0))
+    return delay * random.uniform(0.5, 1.0)
+
+
+class PaymentQueue:
+    def __init__(self, path=PAYMENTS_DB, workers=WORKERS, max_depth=MAX_DEPTH,
+                 max_attempts=MAX_ATTEMPTS, authorizer=authorize,
+                 base_delay=BASE_DELAY, max_delay=MAX_DELAY, poll_interval=POLL_INTERVAL):
+        self.path = path
+        self.workers = workers
+        self.max_depth = max_depth
+        self.max_attempts = max_attempts
+        self.authorizer = authorizer
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.poll_interval = poll_interval
+        self._wakeup = threading.Condition()
+        self._stop = threading.Event()
+        self._threads = []
+        init_payments(path)
+
+    # -- producer side --------------------------------------------------
+
+    def depth(self, conn=None):
+        return (conn or get_db(self.path).conn).execute(
+            "SELECT COUNT(*) FROM payments WHERE status IN (?, ?)", (PENDING, PROCESSING)).fetchone()[0]
+
+    def _admit(self, conn):
+        if self.depth(conn) >= self.max_depth:
+            raise QueueFull(f"payment queue is full ({self.max_depth} in flight)")
+
+    def enqueue(self, method, amount, user=None, idempotency_key=None, block=False, timeout=None):
+        """Queue a payment and return its reference without waiting for the result."""
+        if idempotency_key is not None:
+            # A retried submit is a lookup, even while the queue is full.
+            existing = get_payment(payment_reference(idempotency_key), self.path)
+            if existing is not None:
+                return submit_payment(method, amount, user=user, idempotency_key=idempotency_key,
+                                      path=self.path)[0]["reference"]
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            try:
+                # Depth check and insert share one BEGIN IMMEDIATE transaction, so
+                # concurrent producers cannot overshoot max_depth.
+                payment, created = submit_payment(method, amount, user=user,
+                                                  idempotency_key=idempotency_key, path=self.path,
+                                                  admit=self._admit)
+                break
+            except QueueFull:
+                if not block or (deadline is not None and time.monotonic() >= deadline):
+                    raise
+            time.sleep(self.poll_interval)
+        if created:
+            with self._wakeup:
+                self._wakeup.notify()
+        return payment["reference"]
+
+    def stats(self):
+        """{status: count} over all payments, plus the number of retries scheduled."""
+        db = get_db(self.path)
+        counts = dict(db.query("SELECT status, COUNT(*) FROM payments GROUP BY status"))
+        counts["retries"] = db.query_one(
+            "SELECT COUNT(*) FROM payment_events WHERE detail LIKE 'retry:%'")[0]
+        return counts
+
+    def status(self, reference):
+        return get_payment(reference, self.path)
+
+    def wait(self, reference, timeout=None):
+        """Poll until the payment is final; returns it (possibly still pending on timeout)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            payment = self.status(reference)
+            if payment is None or payment["status"] not in (PENDING, PROCESSING):
+                return payment
+            if deadline is not None and time.monotonic() >= deadline:
+                return payment
+            time.sleep(min(self.poll_interval, 0.05))
+
+    # -- worker side ----------------------------------------------------
+
+    def _retry_or_fail(self, conn, payment, detail):
+        if payment["attempts"] >= self.max_attempts:
+            return finalize_payment(conn, payment, FAILED, f"gave up after {payment['attempts']} attempts: {detail}")
+        now = time.time()
+        conn.execute(
+            "UPDATE payments SET status=?, updated_at=?, next_attempt_at=?, detail=? "
+            "WHERE reference=? AND status=?",
+            (PENDING, now, now + backoff_delay(payment["attempts"], self.base_delay, self.max_delay),
+             detail, payment["reference"], PROCESSING),
+        )
+        log_payment_event(conn, payment["reference"], PENDING, f"retry: {detail}", at=now)
+        return False
+
+    def _attempt(self, payment):
+        try:
+            status, detail = self.authorizer(payment)
+        except TransientPaymentError as exc:
+            with get_db(self.path).transaction() as conn:
+                failed = self._retry_or_fail(conn, payment, f"{type(exc).__name__}: {exc}")
+            if failed:
+                publish_outcome(payment, FAILED, str(exc))
+            return
+        except Exception as exc:
+            status, detail = FAILED, f"{type(exc).__name__}: {exc}"
+        with get_db(self.path).transaction() as conn:
+            done = finalize_payment(conn, payment, status, detail)
+        if done:
+            publish_outcome(payment, status, detail)
+
+    def run_once(self):
+        """Claim and process one due payment; returns False when none was due."""
+        with get_db(self.path).transaction() as conn:
+            claimed = claim_payments(conn, 1)
+        if not claimed:
+            return False
+        self._attempt(claimed[0])
+        return True
+
+    def _work(self):
+        while not self._stop.is_set():
+            try:
+                if self.run_once():
+                    continue
+            except Exception:
+                time.sleep(self.poll_interval)   # e.g. a locked database; try again
+                continue
+            with self._wakeup:
+                self._wakeup.wait(self.poll_interval)
+
+    def start(self):
+        if self._threads:
+            return self
+        requeue_stuck(LEASE_TIMEOUT, self.path)
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._work, name=f"payment-worker-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for t in self._threads:
+            t.start()
+        return self
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        with self._wakeup:
+            self._wakeup.notify_all()
+        for t in self._threads:
+            t.join(timeout)
+        self._threads = []
+
+    @property
+    def running(self):
+        return any(t.is_alive() for t in self._threads)
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def _default_authorizer():
+    if os.environ.get("HUMAIN_PSP") == "simulator":
+        from core.payments.psp_simulator import PSPSimulator
+        return PSPSimulator().authorizer
+    return authorize
+
+
+def get_payment_queue():
+    """Process-wide queue, started on first use."""
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = PaymentQueue(authorizer=_default_authorizer()).start()
+    return _queue
@@ -1,5 +1,6 @@
 # core/pipelines/ai_enricher.py
 from core.ai_engine import ai_insights
+from core.pipelines.context_builder import build_behavior_context
 
 def enrich_behavior_log(logs):
-    return ai_insights(f"Analyze full user behavior log: {logs}")
\ No newline at end of file
+    return ai_insights(f"Analyze user behavior log summary:\n{build_behavior_context(logs)}")
\ No newline at end of file
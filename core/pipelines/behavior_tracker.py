@@ -1,10 +1,32 @@
 # core/pipelines/behavior_tracker.py
+import uuid
 import streamlit as st
+from core.pipelines.event_store import get_event_store
+
+# Only the newest events stay in session_state; full history is in the event store.
+SESSION_TAIL = 200
+
+def _session_id():
+    if "behavior_session" not in st.session_state:
+        st.session_state.behavior_session = uuid.uuid4().hex
+    return st.session_state.behavior_session
+
+def current_user():
+    """The user events are recorded under."""
+    return st.session_state.get("email") or "anonymous"
 
 def track(event_name, details=""):
+    user = current_user()
+    record = get_event_store().append(user, event_name, details, session=_session_id())
+
     if "behavior_log" not in st.session_state:
         st.session_state.behavior_log = []
+    log = st.session_state.behavior_log
+    log.append(record.as_dict())
+    if len(log) > SESSION_TAIL:
+        del log[:len(log) - SESSION_TAIL]
 
-    st.session_state.behavior_log.append(
-        {"event": event_name, "details": details}
-    )
\ No newline at end of file
+def user_history(user, event=None, start=None, end=None, limit=1000):
+    """Persisted events for `user` as behavior_log-style dicts, oldest first."""
+    return [e.as_dict() for e in get_event_store().query(user=user, event=event,
+                                                         start=start, end=end, limit=limit)]
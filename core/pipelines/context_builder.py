@@ -0,0 +1,97 @@
+# core/pipelines/context_builder.py
+"""Compact behavior logs into a bounded prompt context.
+
+Raw `behavior_log` lists grow for as long as a session lives. Instead of
+stringifying them, the AI helpers send aggregated event counts plus the
+most recent events with consecutive repeats collapsed, trimmed to fit a
+token budget — so prompt size stays flat however long the user stays.
+"""
+
+from collections import Counter
+
+DEFAULT_TOKEN_BUDGET = 400
+DEFAULT_RECENT = 25
+MAX_DETAIL_CHARS = 80
+TOP_EVENTS = 15
+
+try:  # exact counts when tiktoken is available, heuristic otherwise
+    import tiktoken
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except Exception:
+    _encoding = None
+
+
+def estimate_tokens(text):
+    """Token count for `text` (tiktoken if installed, else ~4 chars/token)."""
+    if _encoding is not None:
+        return len(_encoding.encode(text))
+    return (len(text) + 3) // 4
+
+
+def _event_of(entry):
+    if isinstance(entry, dict):
+        return str(entry.get("event", "")), str(entry.get("details", "") or "")
+    return str(entry), ""
+
+
+def collapse_runs(logs):
+    """[(event, details, repeat_count)] with consecutive duplicates merged."""
+    runs = []
+    for entry in logs:
+        event, details = _event_of(entry)
+        if runs and runs[-1][0] == event and runs[-1][1] == details:
+            runs[-1][2] += 1
+        else:
+            runs.append([event, details, 1])
+    return [tuple(r) for r in runs]
+
+
+def _format_run(event, details, count):
+    line = f"- {event}"
+    if details:
+        if len(details) > MAX_DETAIL_CHARS:
+            details = details[:MAX_DETAIL_CHARS - 1] + "…"
+        line += f" ({details})"
+    if count > 1:
+        line += f" x{count}"
+    return line
+
+
+def build_behavior_context(logs, budget=DEFAULT_TOKEN_BUDGET, recent=DEFAULT_RECENT):
+    """Summarize `logs` as counts + recent runs, within `budget` tokens."""
+    logs = logs or []
+    if not logs:
+        return "no tracked events"
+
+    counts = Counter(_event_of(e)[0] for e in logs)
+    header = f"events={len(logs)} distinct={len(counts)}"
+    top = counts.most_common(TOP_EVENTS)
+    counts_line = "counts: " + ", ".join(f"{name}={n}" for name, n in top)
+    if len(counts) > TOP_EVENTS:
+        counts_line += f", +{len(counts) - TOP_EVENTS} more"
+
+    # Only the last `recent` events are listed individually; newest are
+    # kept first when the budget runs out.
+    tail_runs = collapse_runs(logs[-recent:]) if recent else []
+
+    lines = [header, counts_line]
+    used = estimate_tokens("\n".join(lines))
+    while used > budget and len(top) > 1:
+        top = top[:len(top) // 2]
+        lines[1] = "counts: " + ", ".join(f"{name}={n}" for name, n in top) + ", …"
+        used = estimate_tokens("\n".join(lines))
+
+    recent_lines = []
+    title = "recent:"
+    used += estimate_tokens(title) + 1
+    for run in reversed(tail_runs):
+        line = _format_run(*run)
+        cost = estimate_tokens(line) + 1
+        if used + cost > budget:
+            break
+        recent_lines.append(line)
+        used += cost
+    if recent_lines:
+        lines.append(title)
+        lines.extend(reversed(recent_lines))
+    return "\n".join(lines)
@@ -0,0 +1,203 @@
+# core/pipelines/event_store.py
+"""Append-only, persisted store for behavior events.
+
+`track` used to keep every event in session_state, where the list grew
+without bound and was lost on logout or restart. Events now go to an
+in-memory write buffer. The buffer is flushed to SQLite in one
+`executemany` transaction when it reaches `flush_size`, or every
+`flush_interval` seconds from a background thread, and once more at
+interpreter exit. Queries read the table through the (user, ts) and
+(event, ts) indexes, plus any still-buffered events, so a caller always
+sees its own writes.
+"""
+
+import atexit
+import os
+import threading
+import time
+
+from database.connection import get_db
+
+EVENTS_DB = "data/behavior.db"
+
+FLUSH_SIZE = 500
+FLUSH_INTERVAL = 2.0    # seconds
+QUERY_LIMIT = 1000
+
+_COLUMNS = "user, session, event, details, ts"
+
+
+class BehaviorEvent:
+    __slots__ = ("user", "session", "event", "details", "ts")
+
+    def __init__(self, user, session, event, details, ts):
+        self.user = user
+        self.session = session
+        self.event = event
+        self.details = details
+        self.ts = ts
+
+    def as_row(self):
+        return (self.user, self.session, self.event, self.details, self.ts)
+
+    def as_dict(self):
+        return {"event": self.event, "details": self.details, "ts": self.ts}
+
+
+def init_event_store(path=EVENTS_DB):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    get_db(path).executescript("""
+        CREATE TABLE IF NOT EXISTS behavior_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user TEXT,
+            session TEXT,
+            event TEXT,
+            details TEXT,
+            ts REAL
+        );
+        CREATE INDEX IF NOT EXISTS idx_behavior_user_ts ON behavior_events (user, ts);
+        CREATE INDEX IF NOT EXISTS idx_behavior_event_ts ON behavior_events (event, ts);
+        CREATE INDEX IF NOT EXISTS idx_behavior_ts ON behavior_events (ts);
+    """)
+
+
+class EventStore:
+    def __init__(self, path=EVENTS_DB, flush_size=FLUSH_SIZE, flush_interval=FLUSH_INTERVAL):
+        self.path = path
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self._buffer = []
+        self._lock = threading.Lock()        # guards the buffer
+        self._flush_lock = threading.Lock()  # serializes writers to the table
+        self._stop = threading.Event()
+        self._thread = None
+        init_event_store(path)
+
+    def append(self, user, event, details="", session=None, ts=None):
+        record = BehaviorEvent(user, session, event, str(details or ""),
+                               time.time() if ts is None else ts)
+        with self._lock:
+            self._buffer.append(record)
+            full = len(self._buffer) >= self.flush_size
+        if full:
+            self.flush()
+        return record
+
+    def flush(self):
+        """Write buffered events in one transaction; returns how many were written."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._buffer = self._buffer, []
+            if not batch:
+                return 0
+            try:
+                with get_db(self.path).transaction() as conn:
+                    conn.executemany(
+                        f"INSERT INTO behavior_events ({_COLUMNS}) VALUES (?, ?, ?, ?, ?)",
+                        [e.as_row() for e in batch],
+                    )
+            except Exception:
+                with self._lock:
+                    self._buffer[:0] = batch         # keep them for the next attempt
+                raise
+            return len(batch)
+
+    def pending(self):
+        with self._lock:
+            return len(self._buffer)
+
+    def query(self, user=None, event=None, start=None, end=None, limit=QUERY_LIMIT):
+        """Most recent `limit` matching events, oldest first; start/end are epoch seconds."""
+        where, params = [], []
+        if user is not None:
+            where.append("user = ?")
+            params.append(user)
+        if event is not None:
+            where.append("event = ?")
+            params.append(event)
+        if start is not None:
+            where.append("ts >= ?")
+            params.append(start)
+        if end is not None:
+            where.append("ts < ?")
+            params.append(end)
+        sql = f"SELECT {_COLUMNS} FROM behavior_events"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY ts DESC LIMIT ?"
+        rows = get_db(self.path).query(sql, params + [limit])
+        stored = [BehaviorEvent(*row) for row in reversed(rows)]
+
+        with self._lock:
+            buffered = [
+                e for e in self._buffer
+                if (user is None or e.user == user) and (event is None or e.event == event)
+                and (start is None or e.ts >= start) and (end is None or e.ts < end)
+            ]
+        return (stored + buffered)[-limit:]
+
+    def read_after(self, last_id=0, limit=QUERY_LIMIT, flush=True):
+        """[(id, BehaviorEvent)] persisted after `last_id`, in insert order.
+
+        With `flush`, buffered events are flushed first, so incremental
+        consumers see everything appended so far. Without it, they see
+        events up to the background flusher's last run.
+        """
+        if flush:
+            self.flush()
+        rows = get_db(self.path).query(
+            f"SELECT id, {_COLUMNS} FROM behavior_events WHERE id > ? ORDER BY id LIMIT ?",
+            (last_id, limit),
+        )
+        return [(row[0], BehaviorEvent(*row[1:])) for row in rows]
+
+    def count(self, user=None, event=None):
+        where, params = [], []
+        if user is not None:
+            where.append("user = ?")
+            params.append(user)
+        if event is not None:
+            where.append("event = ?")
+            params.append(event)
+        sql = "SELECT COUNT(*) FROM behavior_events"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        with self._lock:
+            buffered = sum(1 for e in self._buffer
+                           if (user is None or e.user == user) and (event is None or e.event == event))
+        return get_db(self.path).query_one(sql, params)[0] + buffered
+
+    # -- background flushing ------------------------------------------
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception:
+                pass    # database busy; the events stay buffered for the next tick
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="event-store-flush", daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+        return self
+
+    def close(self):
+        self._stop.set()
+        self.flush()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_event_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = EventStore().start()
+    return _store
@@ -0,0 +1,153 @@
+# core/pipelines/profile_store.py
+"""Persisted AI profiles with change detection.
+
+A profile is stored together with a fingerprint of the inputs it was built
+from and the number of behavior events seen at the time. It is rebuilt only
+when the base inputs change or enough new events have accumulated;
+otherwise the stored copy is served. Stale profiles can be refreshed on a
+background worker so a page load never waits on the model.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+PROFILE_DB = "data/profiles.db"
+
+EVENT_DELTA_THRESHOLD = 10      # new events before a rebuild
+MAX_PROFILE_AGE = 24 * 60 * 60  # seconds
+
+
+def fingerprint(value):
+    raw = json.dumps(value, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(raw).hexdigest()
+
+
+class StoredProfile:
+    __slots__ = ("user", "profile", "input_hash", "event_count", "updated_at")
+
+    def __init__(self, user, profile, input_hash, event_count, updated_at):
+        self.user = user
+        self.profile = profile
+        self.input_hash = input_hash
+        self.event_count = event_count
+        self.updated_at = updated_at
+
+
+class ProfileStore:
+    def __init__(self, path=PROFILE_DB, delta_threshold=EVENT_DELTA_THRESHOLD,
+                 max_age=MAX_PROFILE_AGE, workers=2):
+        self.path = path
+        self.delta_threshold = delta_threshold
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="profile")
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS ai_profiles (
+                user TEXT PRIMARY KEY,
+                profile TEXT,
+                input_hash TEXT,
+                event_count INTEGER,
+                updated_at REAL
+            )
+        """)
+        self._conn.commit()
+
+    def get(self, user):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT user, profile, input_hash, event_count, updated_at "
+                "FROM ai_profiles WHERE user=?", (user,)
+            ).fetchone()
+        return StoredProfile(*row) if row else None
+
+    def put(self, user, profile, input_hash, event_count):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO ai_profiles VALUES (?, ?, ?, ?, ?)",
+                (user, profile, input_hash, event_count, time.time()),
+            )
+            self._conn.commit()
+
+    def needs_rebuild(self, stored, input_hash, event_count):
+        if stored is None or stored.input_hash != input_hash:
+            return True
+        if event_count - stored.event_count >= self.delta_threshold:
+            return True
+        return time.time() - stored.updated_at > self.max_age
+
+    def get_or_build(self, user, base_input, event_count, build, background=True):
+        """Return the profile for `user`, rebuilding only on meaningful change.
+
+        `base_input` is fingerprinted (anything that should force a rebuild
+        when it changes); `event_count` is the user's persisted event total,
+        whose growth is measured against the delta threshold (not the length
+        of a capped session log). `build()` produces the text.
+        With `background=True`, a stale profile is served immediately and
+        refreshed on a worker; only a missing profile blocks.
+        """
+        if background:
+            profile = self.lookup(user, base_input, event_count, build)
+            if profile is not None:
+                return profile
+        return self._rebuild(user, fingerprint(base_input), event_count, build)
+
+    def lookup(self, user, base_input, event_count, build):
+        """Serve the stored profile (scheduling a refresh if stale), or None."""
+        input_hash = fingerprint(base_input)
+        stored = self.get(user)
+        if stored is None:
+            return None
+        if self.needs_rebuild(stored, input_hash, event_count):
+            self.refresh_async(user, input_hash, event_count, build)
+        return stored.profile
+
+    def save(self, user, base_input, event_count, profile):
+        self.put(user, profile, fingerprint(base_input), event_count)
+
+    def _rebuild(self, user, input_hash, event_count, build):
+        profile = build()
+        self.put(user, profile, input_hash, event_count)
+        return profile
+
+    def refresh_async(self, user, input_hash, event_count, build):
+        with self._lock:
+            if user in self._refreshing:
+                return None
+            self._refreshing.add(user)
+
+        def run():
+            try:
+                return self._rebuild(user, input_hash, event_count, build)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(user)
+
+        return self._executor.submit(run)
+
+    def invalidate(self, user):
+        with self._lock:
+            self._conn.execute("DELETE FROM ai_profiles WHERE user=?", (user,))
+            self._conn.commit()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_profile_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ProfileStore()
+    return _store
@@ -0,0 +1,233 @@
+# core/pipelines/sessionizer.py
+"""Streaming sessions, funnels, dwell times and user features over behavior events.
+
+Events are consumed once, in store order. Per user, the sessionizer keeps
+only the open session and running totals. An event more than `gap` seconds
+after the previous one starts a new session. The time until the next event
+in the same session counts as dwell for the earlier event. Each session
+tracks how far it progressed through every funnel, where a funnel is an
+ordered tuple of event names.
+
+`refresh()` pulls only events newer than the last store id it saw, so
+repeated calls cost O(new events). `describe_user()` turns the features
+into a one-line summary for the CRM and profile prompts. The summary uses
+coarse buckets (counts by range, last seen as "today"/"this week"), so it
+stays the same between most events and the prompt cache keeps hitting.
+"""
+
+import bisect
+import sqlite3
+import threading
+import time
+from collections import Counter
+
+from core.pipelines.event_store import get_event_store
+
+SESSION_GAP = 30 * 60       # seconds of inactivity that end a session
+MAX_DWELL = 10 * 60         # cap a single dwell so an idle tab does not dominate
+REFRESH_BATCH = 5000
+
+FUNNELS = {
+    "profile": ("open_home", "open_ai_profile"),
+    "booking": ("open_home", "search_flights", "process_payment"),
+}
+
+FEATURE_NAMES = (
+    "sessions", "events", "events_per_session", "avg_session_seconds",
+    "avg_dwell_seconds", "distinct_events", "days_active", "seconds_since_last",
+)
+
+
+class _UserState:
+    __slots__ = ("sessions", "events", "session_seconds", "dwell_seconds", "dwell_count",
+                 "counts", "days", "last_ts", "last_event", "session_start",
+                 "funnel_steps", "funnels_done")
+
+    def __init__(self):
+        self.sessions = 0
+        self.events = 0
+        self.session_seconds = 0.0    # closed sessions only
+        self.dwell_seconds = 0.0
+        self.dwell_count = 0
+        self.counts = Counter()
+        self.days = set()
+        self.last_ts = None
+        self.last_event = None
+        self.session_start = None
+        self.funnel_steps = {}        # funnel -> steps reached in the open session
+        self.funnels_done = Counter()
+
+
+class Sessionizer:
+    def __init__(self, gap=SESSION_GAP, funnels=FUNNELS, max_dwell=MAX_DWELL):
+        self.gap = gap
+        self.funnels = dict(funnels)
+        self.max_dwell = max_dwell
+        self.users = {}
+        self.last_id = 0
+        self.dwell = Counter()        # event -> total seconds
+        self.dwell_count = Counter()
+        # funnel -> [sessions reaching step 1, step 2, ...], closed sessions only
+        self.funnel_totals = {name: [0] * len(steps) for name, steps in self.funnels.items()}
+        self._lock = threading.RLock()
+
+    # -- ingestion ----------------------------------------------------
+
+    def _close_session(self, state):
+        state.session_seconds += state.last_ts - state.session_start
+        for name, reached in state.funnel_steps.items():
+            totals = self.funnel_totals[name]
+            for i in range(reached):
+                totals[i] += 1
+            if reached == len(self.funnels[name]):
+                state.funnels_done[name] += 1
+
+    def add(self, user, event, ts):
+        state = self.users.get(user)
+        if state is None:
+            state = self.users[user] = _UserState()
+        if state.last_ts is not None and ts - state.last_ts <= self.gap:
+            dwell = min(max(ts - state.last_ts, 0.0), self.max_dwell)
+            self.dwell[state.last_event] += dwell
+            self.dwell_count[state.last_event] += 1
+            state.dwell_seconds += dwell
+            state.dwell_count += 1
+        else:
+            if state.last_ts is not None:
+                self._close_session(state)
+            state.sessions += 1
+            state.session_start = ts
+            state.funnel_steps = dict.fromkeys(self.funnels, 0)
+        for name, steps in self.funnels.items():
+            reached = state.funnel_steps[name]
+            if reached < len(steps) and steps[reached] == event:
+                state.funnel_steps[name] = reached + 1
+        state.events += 1
+        state.counts[event] += 1
+        state.days.add(int(ts // 86400))
+        state.last_ts = ts
+        state.last_event = event
+
+    def refresh(self, store=None, batch=REFRESH_BATCH, flush=True):
+        """Consume events appended since the last call; returns how many.
+        With flush=False, still-buffered events wait for the background flusher."""
+        store = store or get_event_store()
+        added = 0
+        with self._lock:
+            while True:
+                rows = store.read_after(self.last_id, batch, flush=flush)
+                for row_id, e in rows:
+                    self.add(e.user, e.event, e.ts)
+                if rows:
+                    self.last_id = rows[-1][0]
+                    added += len(rows)
+                if len(rows) < batch:
+                    return added
+
+    # -- results ------------------------------------------------------
+
+    def features(self, user, now=None):
+        with self._lock:
+            state = self.users.get(user)
+            if state is None:
+                return None
+            now = time.time() if now is None else now
+            # Count the open session as if it ended at its last event.
+            session_seconds = state.session_seconds + (state.last_ts - state.session_start)
+            return {
+                "sessions": state.sessions,
+                "events": state.events,
+                "events_per_session": state.events / state.sessions,
+                "avg_session_seconds": session_seconds / state.sessions,
+                "avg_dwell_seconds": state.dwell_seconds / state.dwell_count if state.dwell_count else 0.0,
+                "distinct_events": len(state.counts),
+                "days_active": len(state.days),
+                "seconds_since_last": max(now - state.last_ts, 0.0),
+                "top_events": state.counts.most_common(5),
+                "funnels_completed": dict(state.funnels_done),
+            }
+
+    def feature_vector(self, user, now=None):
+        """Numeric features in FEATURE_NAMES order (zeros for unknown users)."""
+        f = self.features(user, now)
+        return [float(f[name]) if f else 0.0 for name in FEATURE_NAMES]
+
+    def funnel_report(self, include_open=True):
+        """{funnel: [(step, sessions_reaching, conversion_from_first)]}."""
+        with self._lock:
+            report = {}
+            for name, steps in self.funnels.items():
+                totals = list(self.funnel_totals[name])
+                if include_open:
+                    for state in self.users.values():
+                        for i in range(state.funnel_steps.get(name, 0)):
+                            totals[i] += 1
+                first = totals[0] or 1
+                report[name] = [(step, n, n / first) for step, n in zip(steps, totals)]
+            return report
+
+    def dwell_report(self):
+        """[(event, avg_dwell_seconds, samples)], longest first."""
+        with self._lock:
+            rows = [(e, self.dwell[e] / n, n) for e, n in self.dwell_count.items() if n]
+            return sorted(rows, key=lambda r: -r[1])
+
+    def summary(self):
+        with self._lock:
+            sessions = sum(s.sessions for s in self.users.values())
+            events = sum(s.events for s in self.users.values())
+            return {"users": len(self.users), "sessions": sessions, "events": events,
+                    "events_per_session": events / sessions if sessions else 0.0}
+
+
+COUNT_BUCKETS = ((1, 2, 5, 10, 25, 50, 100, 250, 1000), ("0", "1", "2-4", "5-9", "10-24", "25-49",
+                                                          "50-99", "100-249", "250-999", "1000+"))
+SESSION_BUCKETS = ((60, 300, 900, 1800), ("<1m", "1-5m", "5-15m", "15-30m", "30m+"))
+DWELL_BUCKETS = ((10, 30, 120), ("<10s", "10-30s", "30s-2m", "2m+"))
+LAST_SEEN_BUCKETS = ((86400, 7 * 86400, 30 * 86400), ("today", "this week", "this month", "over a month ago"))
+
+
+def _bucket(value, buckets):
+    edges, labels = buckets
+    return labels[bisect.bisect_right(edges, value)]
+
+
+def describe_features(f):
+    """Compact one-line summary of `features()` output for prompts, in coarse buckets."""
+    if not f:
+        return "no behavior history"
+    top = ", ".join(e for e, _ in f["top_events"])
+    done = ", ".join(f"{k}={_bucket(v, COUNT_BUCKETS)}" for k, v in f["funnels_completed"].items()) or "none"
+    return (f"sessions={_bucket(f['sessions'], COUNT_BUCKETS)} events={_bucket(f['events'], COUNT_BUCKETS)} "
+            f"avg_session={_bucket(f['avg_session_seconds'], SESSION_BUCKETS)} "
+            f"avg_dwell={_bucket(f['avg_dwell_seconds'], DWELL_BUCKETS)} "
+            f"days_active={_bucket(f['days_active'], COUNT_BUCKETS)} "
+            f"last_seen={_bucket(f['seconds_since_last'], LAST_SEEN_BUCKETS)}; "
+            f"top: {top}; funnels completed: {done}")
+
+
+_sessionizer = None
+_sessionizer_lock = threading.Lock()
+
+
+def get_sessionizer():
+    """Process-wide sessionizer, caught up with events the store has persisted.
+
+    Page renders call this, so it never flushes the store's buffer itself
+    (the background flusher does) and a database error only means serving
+    the features from the last successful refresh.
+    """
+    global _sessionizer
+    if _sessionizer is None:
+        with _sessionizer_lock:
+            if _sessionizer is None:
+                _sessionizer = Sessionizer()
+    try:
+        _sessionizer.refresh(flush=False)
+    except sqlite3.Error:
+        pass
+    return _sessionizer
+
+
+def describe_user(user):
+    return describe_features(get_sessionizer().features(user))
@@ -1,5 +1,42 @@
 # core/pipelines/user_profile_pipeline.py
-from core.ai_engine import ai_customer_profile
+from core.ai_engine import ai_customer_profile, ai_customer_profile_stream
+from core.pipelines.context_builder import build_behavior_context
+from core.pipelines.event_store import get_event_store
+from core.pipelines.profile_store import get_profile_store
+from core.pipelines.sessionizer import describe_user
 
 def generate_ai_profile(user_data):
-    return ai_customer_profile(f"Generate deep AI persona for user: {user_data}")
\ No newline at end of file
+    return ai_customer_profile(f"Generate deep AI persona for user: {user_data}")
+
+def stream_ai_profile(user_data):
+    return ai_customer_profile_stream(f"Generate deep AI persona for user: {user_data}")
+
+def profile_input(user_email, events):
+    return (f"User email: {user_email}\nBehavior: {describe_user(user_email)}\n"
+            f"Recent activity:\n{build_behavior_context(events)}")
+
+def _event_count(user_email):
+    # The persisted total: the session log is capped at SESSION_TAIL, so its length stops growing.
+    return get_event_store().count(user=user_email)
+
+def stored_ai_profile(user_email, events):
+    """Stored profile for the user, refreshed in the background when stale.
+
+    Returns None when no profile has been built yet. The rebuild runs on a
+    worker, so it gets a copy of `events` taken now, not the caller's list.
+    """
+    events = list(events or ())
+    return get_profile_store().lookup(
+        user_email, {"email": user_email}, _event_count(user_email),
+        lambda: generate_ai_profile(profile_input(user_email, events)),
+    )
+
+def save_ai_profile(user_email, events, profile):
+    get_profile_store().save(user_email, {"email": user_email}, _event_count(user_email), profile)
+
+def get_ai_profile(user_email, events):
+    events = list(events or ())
+    return get_profile_store().get_or_build(
+        user_email, {"email": user_email}, _event_count(user_email),
+        lambda: generate_ai_profile(profile_input(user_email, events)),
+    )
@@ -0,0 +1,207 @@
+# core/realtime/event_bus.py
+"""In-process publish/subscribe bus for real application events.
+
+Topics are dotted names such as "payments.approved" or "auth.login". A
+subscription takes an exact topic, a prefix pattern ("payments.*") or "*".
+Topic routing is resolved once per topic and cached until the set of
+subscriptions changes.
+
+Every subscriber has its own bounded queue. When a slow consumer falls
+behind, its oldest events are dropped and counted, so `publish` never
+blocks and never grows memory. Consumers read with `get()` / `drain()`
+from threads, or `async for` from asyncio code. `subscribe(handler=...)`
+runs the handler on a dedicated daemon thread.
+
+The module-level `publish()` is what business code calls. It never raises,
+because losing an analytics event must not fail a payment or a login.
+"""
+
+import asyncio
+import collections
+import itertools
+import threading
+import time
+
+MAX_QUEUE = 1000
+
+
+class Event:
+    __slots__ = ("topic", "payload", "ts", "seq")
+
+    def __init__(self, topic, payload, ts, seq):
+        self.topic = topic
+        self.payload = payload
+        self.ts = ts
+        self.seq = seq
+
+    def as_dict(self):
+        return {"topic": self.topic, "ts": self.ts, "seq": self.seq, **self.payload}
+
+
+def _matches(pattern, topic):
+    if pattern == "*" or pattern == topic:
+        return True
+    return pattern.endswith(".*") and topic.startswith(pattern[:-1])
+
+
+class Subscription:
+    def __init__(self, bus, pattern, maxsize=MAX_QUEUE):
+        self.bus = bus
+        self.pattern = pattern
+        self._queue = collections.deque(maxlen=maxsize)
+        self._cond = threading.Condition()
+        self._waiters = []        # (loop, asyncio.Event) of async consumers
+        self.delivered = 0
+        self.dropped = 0
+        self.closed = False
+
+    def _put(self, event):
+        with self._cond:
+            queued = len(self._queue)
+            if queued == self._queue.maxlen:
+                self.dropped += 1         # deque(maxlen) evicts the oldest
+            self._queue.append(event)
+            self.delivered += 1
+            if queued:
+                return                    # consumers were already woken for this backlog
+            self._cond.notify()
+            waiters = self._waiters
+        for loop, flag in waiters:
+            try:
+                loop.call_soon_threadsafe(flag.set)
+            except RuntimeError:
+                pass                      # loop already closed
+
+    def get(self, timeout=None):
+        """Next event, or None on timeout / close."""
+        with self._cond:
+            if not self._queue and not self.closed:
+                self._cond.wait(timeout)
+            return self._queue.popleft() if self._queue else None
+
+    def drain(self, max_items=None):
+        with self._cond:
+            n = len(self._queue) if max_items is None else min(max_items, len(self._queue))
+            return [self._queue.popleft() for _ in range(n)]
+
+    def __len__(self):
+        return len(self._queue)
+
+    def __aiter__(self):
+        return self._aiter()
+
+    async def _aiter(self):
+        loop = asyncio.get_running_loop()
+        flag = asyncio.Event()
+        with self._cond:
+            self._waiters = self._waiters + [(loop, flag)]
+        try:
+            while True:
+                flag.clear()
+                batch = self.drain()
+                for event in batch:
+                    yield event
+                if self.closed:
+                    return
+                if not batch:
+                    await flag.wait()
+        finally:
+            with self._cond:
+                self._waiters = [w for w in self._waiters if w[1] is not flag]
+
+    def close(self):
+        self.bus.unsubscribe(self)
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+            waiters = self._waiters
+        for loop, flag in waiters:
+            try:
+                loop.call_soon_threadsafe(flag.set)
+            except RuntimeError:
+                pass
+
+
+class EventBus:
+    def __init__(self):
+        self._subs = []
+        self._routes = {}
+        self._lock = threading.Lock()
+        self._seq = itertools.count(1)
+        self.published = 0
+
+    def subscribe(self, pattern="*", maxsize=MAX_QUEUE, handler=None):
+        """Subscribe to `pattern`; with `handler`, events are consumed on a daemon thread."""
+        sub = Subscription(self, pattern, maxsize)
+        with self._lock:
+            self._subs.append(sub)
+            self._routes = {}
+        if handler is not None:
+            threading.Thread(target=self._consume, args=(sub, handler),
+                             name=f"bus-{pattern}", daemon=True).start()
+        return sub
+
+    def _consume(self, sub, handler):
+        while not sub.closed:
+            event = sub.get(timeout=1.0)
+            if event is None:
+                continue
+            try:
+                handler(event)
+            except Exception:
+                pass                      # one bad event must not kill the consumer
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            if sub in self._subs:
+                self._subs.remove(sub)
+                self._routes = {}
+
+    def _route(self, topic):
+        routes = self._routes
+        subs = routes.get(topic)
+        if subs is None:
+            with self._lock:
+                subs = tuple(s for s in self._subs if _matches(s.pattern, topic))
+                self._routes[topic] = subs
+        return subs
+
+    def publish(self, topic, payload=None, ts=None):
+        """Fan the event out to every matching subscriber; returns the number reached."""
+        event = Event(topic, payload or {}, time.time() if ts is None else ts, next(self._seq))
+        subs = self._route(topic)
+        for sub in subs:
+            sub._put(event)
+        self.published += 1
+        return len(subs)
+
+    def stats(self):
+        with self._lock:
+            subs = list(self._subs)
+        return {
+            "published": self.published,
+            "subscribers": [
+                {"pattern": s.pattern, "queued": len(s), "delivered": s.delivered, "dropped": s.dropped}
+                for s in subs
+            ],
+        }
+
+
+_bus = None
+_bus_lock = threading.Lock()
+
+
+def get_event_bus():
+    global _bus
+    if _bus is None:
+        with _bus_lock:
+            if _bus is None:
+                _bus = EventBus()
+    return _bus
+
+
+def publish(topic, **payload):
+    try:
+        return get_event_bus().publish(topic, payload)
+    except Exception:
+        return 0
@@ -0,0 +1,183 @@
+# core/realtime/metrics.py
+"""Shared real-time metrics: one producer, fixed-size ring buffer, polled snapshots.
+
+Events are numeric dicts. They are written into preallocated NumPy arrays
+used as a ring buffer, so memory stays constant however long the app runs.
+Each window (1s, 1m, 5m by default) keeps running sums and counts. An
+append adds the new event and subtracts the events that fell out of the
+window, so aggregates cost O(fields) per event and not O(window).
+Percentiles are computed at snapshot time from the window's slice.
+
+A single background producer feeds the buffer. Every viewer reads through
+`snapshot()`, which only takes the lock long enough to copy a few small
+arrays, so N open dashboards cost one producer instead of N sleeping loops.
+"""
+
+import threading
+import time
+
+import numpy as np
+
+CAPACITY = 4096
+WINDOWS = (1, 60, 300)          # seconds
+PERCENTILES = (50, 95, 99)
+INTERVAL = 1.0                  # producer period, seconds
+
+
+class _Window:
+    __slots__ = ("seconds", "tail", "sums", "count")
+
+    def __init__(self, seconds, fields):
+        self.seconds = seconds
+        self.tail = 0                     # sequence number of the oldest event inside
+        self.sums = np.zeros(fields)
+        self.count = 0
+
+
+class RingMetrics:
+    def __init__(self, fields, capacity=CAPACITY, windows=WINDOWS):
+        self.fields = tuple(fields)
+        self.capacity = capacity
+        self.times = np.zeros(capacity)
+        self.values = np.zeros((capacity, len(self.fields)))
+        self.seq = 0                      # events ever written
+        self.latest = None
+        self._windows = [_Window(w, len(self.fields)) for w in windows]
+        self._lock = threading.Lock()
+
+    def _evict(self, window, now, incoming=0):
+        # Drop events that left the time window, or are about to be overwritten
+        # by `incoming` new ones.
+        oldest_kept = max(self.seq + incoming - self.capacity, 0)
+        while window.tail < self.seq and (
+                window.tail < oldest_kept or self.times[window.tail % self.capacity] <= now - window.seconds):
+            window.sums -= self.values[window.tail % self.capacity]
+            window.count -= 1
+            window.tail += 1
+
+    def record(self, event, now=None):
+        """Append one event (missing fields count as 0)."""
+        now = event.get("timestamp", time.time()) if now is None else now
+        row = np.fromiter((float(event.get(f, 0) or 0) for f in self.fields), float, len(self.fields))
+        with self._lock:
+            for window in self._windows:
+                self._evict(window, now, incoming=1)
+            slot = self.seq % self.capacity
+            self.times[slot] = now
+            self.values[slot] = row
+            self.seq += 1
+            for window in self._windows:
+                window.sums += row
+                window.count += 1
+            self.latest = dict(event, timestamp=now)
+
+    def _slice(self, start_seq):
+        idx = np.arange(start_seq, self.seq) % self.capacity
+        return self.times[idx], self.values[idx]
+
+    def snapshot(self, now=None, percentiles=PERCENTILES):
+        """Latest event plus per-window aggregates:
+        {"latest": {...}, "windows": {seconds: {field: {sum, rate, mean, pXX}}}, "count": n}.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            for window in self._windows:
+                self._evict(window, now)
+            latest = dict(self.latest) if self.latest else None
+            states = [(w.seconds, w.sums.copy(), w.count, w.tail) for w in self._windows]
+            slices = {seconds: self._slice(tail)[1] for seconds, _, _, tail in states}
+            total = self.seq
+        windows = {}
+        for seconds, sums, count, _ in states:
+            values = slices[seconds]
+            pct = np.percentile(values, percentiles, axis=0) if count else None
+            stats = {}
+            for i, field in enumerate(self.fields):
+                stats[field] = {
+                    "sum": float(sums[i]),
+                    "rate": float(sums[i]) / seconds,
+                    "mean": float(sums[i]) / count if count else 0.0,
+                    "count": count,
+                }
+                for j, p in enumerate(percentiles):
+                    stats[field][f"p{p}"] = float(pct[j, i]) if pct is not None else 0.0
+            windows[seconds] = stats
+        return {"latest": latest, "windows": windows, "count": total}
+
+    def series(self, seconds=300, now=None):
+        """(timestamps, {field: values}) for the last `seconds`, oldest first."""
+        now = time.time() if now is None else now
+        with self._lock:
+            start = max(self.seq - self.capacity, 0)
+            times, values = self._slice(start)
+        keep = times > now - seconds
+        return times[keep], {f: values[keep, i] for i, f in enumerate(self.fields)}
+
+
+class MetricsProducer:
+    """Background thread that samples `source()` every `interval` seconds."""
+
+    def __init__(self, metrics, source, interval=INTERVAL):
+        self.metrics = metrics
+        self.source = source
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        next_at = time.monotonic()
+        while not self._stop.is_set():
+            try:
+                self.metrics.record(self.source())
+            except Exception:
+                pass    # a bad sample must not kill the shared producer
+            next_at += self.interval
+            self._stop.wait(max(0.0, next_at - time.monotonic()))
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="metrics-producer", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=2):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+_metrics = None
+_producer = None
+_metrics_lock = threading.Lock()
+
+
+def get_live_metrics():
+    """Process-wide live metrics, with the event producer running."""
+    global _metrics, _producer
+    if _metrics is None:
+        with _metrics_lock:
+            if _metrics is None:
+                from core.realtime.stream_engine import EVENT_FIELDS, BusSampler
+                metrics = RingMetrics(EVENT_FIELDS)
+                _producer = MetricsProducer(metrics, BusSampler()).start()
+                _metrics = metrics
+    return _metrics
+
+
+# Payload keys safe to show on a dashboard: no emails, user ids, references or amounts.
+SUMMARY_FIELDS = ("status", "decision", "score", "success", "type", "method", "entries",
+                  "offers", "cached", "origin", "destination")
+
+
+def recent_events():
+    """Most recent real bus events seen by the live metrics producer, newest first."""
+    get_live_metrics()
+    return list(reversed(_producer.source.recent))
+
+
+def summarize_event(event):
+    """{"time", "topic", "summary"} for display, built from SUMMARY_FIELDS only."""
+    summary = " ".join(f"{k}={event.payload[k]}" for k in SUMMARY_FIELDS if k in event.payload)
+    return {"time": time.strftime("%H:%M:%S", time.localtime(event.ts)), "topic": event.topic,
+            "summary": summary}
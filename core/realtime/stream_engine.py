@@ -1,14 +1,59 @@
 # core/realtime/stream_engine.py
+import collections
 import time
 import random
 
-def generate_realtime_events():
+from core.realtime.event_bus import get_event_bus
+
+SIMULATED_FIELDS = ("users_online", "ai_events", "fraud_alerts", "bookings_simulated")
+
+# Real events from the bus, counted per sample: topic prefix -> field.
+BUS_FIELDS = {
+    "payments": "payments",
+    "ledger": "ledger_entries",
+    "auth": "logins",
+    "travel": "flight_searches",
+    "fraud": "fraud_events",
+}
+
+EVENT_FIELDS = SIMULATED_FIELDS + tuple(BUS_FIELDS.values())
+
+def sample_event():
+    return {
+        "timestamp": time.time(),
+        "users_online": random.randint(10, 120),
+        "ai_events": random.randint(1, 10),
+        "fraud_alerts": random.randint(0, 2),
+        "bookings_simulated": random.randint(0, 5),
+    }
+
+def generate_realtime_events(interval=1.0):
+    # Blocks the caller between events; pages should poll
+    # core.realtime.metrics.get_live_metrics() instead.
     while True:
-        yield {
-            "timestamp": time.time(),
-            "users_online": random.randint(10, 120),
-            "ai_events": random.randint(1, 10),
-            "fraud_alerts": random.randint(0, 2),
-            "bookings_simulated": random.randint(0, 5),
-        }
-        time.sleep(1)
\ No newline at end of file
+        yield sample_event()
+        time.sleep(interval)
+
+class BusSampler:
+    """Metrics source: a simulated sample plus counts of real bus events since the last call."""
+
+    def __init__(self, bus=None, recent=50):
+        self._sub = (bus or get_event_bus()).subscribe("*", maxsize=100_000)
+        self.recent = collections.deque(maxlen=recent)
+
+    def __call__(self):
+        event = sample_event()
+        counts = dict.fromkeys(BUS_FIELDS.values(), 0)
+        for e in self._sub.drain():
+            prefix, _, name = e.topic.partition(".")
+            field = BUS_FIELDS.get(prefix)
+            if field is None or (prefix == "payments" and name == "submitted"):
+                continue
+            counts[field] += e.payload.get("entries", 2 if name == "transfer" else 1)
+            self.recent.append(e)
+        event.update(counts)
+        return event
+
+    @property
+    def dropped(self):
+        return self._sub.dropped
@@ -1,6 +1,7 @@
 # core/security/identity.py
 import streamlit as st
 import uuid
+from core.security.ip_intel import get_ip_intel
 
 def device_fingerprint():
     if "device_id" not in st.session_state:
@@ -8,8 +9,13 @@ def device_fingerprint():
     return st.session_state.device_id
 
 def ip_risk_score(ip):
-    if ip.startswith("41."):
-        return "Low Risk"
-    if ip.startswith("102."):
-        return "Medium Risk"
-    return "Unknown Risk"
\ No newline at end of file
+    return get_ip_intel().risk(ip, default="Unknown Risk")
+
+def ip_risk_scores(ips):
+    """Bulk `ip_risk_score` for log backfills."""
+    return get_ip_intel().risk_many(ips, default="Unknown Risk")
+
+def ip_details(ip):
+    """{"network", "risk", "country"} of the most specific matching range, or None."""
+    info = get_ip_intel().lookup(ip)
+    return info.as_dict() if info else None
\ No newline at end of file
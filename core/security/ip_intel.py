@@ -0,0 +1,300 @@
+# core/security/ip_intel.py
+"""IP intelligence: risk level and country by longest-prefix CIDR match.
+
+Ranges come from CSV files with the columns cidr, risk and country. Lines
+starting with '#' are skipped. Every *.csv in data/ip_intel/ (or in the
+directory/file named by HUMAIN_IP_INTEL) is loaded in name order. Without
+files, the built-in DEFAULT_RANGES keep the historical 41/8 and 102/8
+classification.
+
+Loading flattens the CIDRs of each address family into disjoint integer
+ranges. Each range is labelled by the most specific CIDR covering it, so
+nested networks resolve to their longest prefix, and for a CIDR listed
+twice the later entry wins. A lookup is then one `bisect` over the sorted
+range starts, a few microseconds for IPv4 or IPv6. `lookup_many` does IPv4
+with one `np.searchsorted` over the distinct addresses, for log backfills.
+
+Tables are immutable. `reload()` builds a new table and swaps a single
+reference, so readers never take a lock and never see a half-built
+table. `start()` polls the source files' mtimes and reloads on change.
+"""
+
+import bisect
+import csv
+import glob
+import os
+import socket
+import threading
+
+import numpy as np
+
+IP_INTEL_PATH = os.environ.get("HUMAIN_IP_INTEL", "data/ip_intel")
+RELOAD_INTERVAL = 5.0   # seconds between mtime checks
+
+DEFAULT_RANGES = (
+    ("41.0.0.0/8", "Low Risk", ""),
+    ("102.0.0.0/8", "Medium Risk", ""),
+)
+
+
+class IPInfo:
+    __slots__ = ("network", "risk", "country")
+
+    def __init__(self, network, risk, country):
+        self.network = network
+        self.risk = risk
+        self.country = country
+
+    def as_dict(self):
+        return {"network": self.network, "risk": self.risk, "country": self.country}
+
+    def __repr__(self):
+        return f"IPInfo({self.network!r}, {self.risk!r}, {self.country!r})"
+
+
+_U64 = (1 << 64) - 1
+
+
+def _parse_address(text):
+    try:
+        return 4, int.from_bytes(socket.inet_pton(socket.AF_INET, text), "big")
+    except OSError:
+        pass
+    try:
+        return 6, int.from_bytes(socket.inet_pton(socket.AF_INET6, text.split("%", 1)[0]), "big")
+    except OSError:
+        return None
+
+
+def parse_ip(ip):
+    """'a.b.c.d' / IPv6 text -> (version, int); IPv4-mapped IPv6 counts as IPv4. None if invalid."""
+    parsed = _parse_address(str(ip).strip())
+    if parsed and parsed[0] == 6 and parsed[1] >> 32 == 0xFFFF:
+        return 4, parsed[1] & 0xFFFFFFFF
+    return parsed
+
+
+def parse_cidr(cidr):
+    """'addr/len' (or a bare address) -> (version, first, last, prefixlen); host bits are ignored.
+
+    inet_pton is several times faster than `ipaddress.ip_network`, which
+    dominates load time for large lists.
+    """
+    addr, _, length = str(cidr).strip().partition("/")
+    parsed = _parse_address(addr)
+    if parsed is None:
+        raise ValueError(f"invalid CIDR {cidr!r}")
+    version, value = parsed
+    bits = 32 if version == 4 else 128
+    prefix = int(length) if length else bits
+    if not 0 <= prefix <= bits:
+        raise ValueError(f"invalid prefix length in {cidr!r}")
+    host = (1 << (bits - prefix)) - 1
+    return version, value & ~host, (value & ~host) | host, prefix
+
+
+def format_network(version, first, prefix):
+    family, size = (socket.AF_INET, 4) if version == 4 else (socket.AF_INET6, 16)
+    return f"{socket.inet_ntop(family, first.to_bytes(size, 'big'))}/{prefix}"
+
+
+def _flatten(firsts, lasts, prefixes, ids):
+    """CIDR columns -> disjoint (starts, ends, ids), each range labelled by its longest-prefix CIDR."""
+    # Parents sort before their children; for duplicates the later entry ends up on top.
+    # The ordering runs in NumPy on 64-bit halves: list.sort would hold the GIL
+    # for the whole sort and stall every reader thread during a reload.
+    hi = np.array([f >> 64 for f in firsts], np.uint64)
+    lo = np.array([f & _U64 for f in firsts], np.uint64)
+    order = np.lexsort((np.array(prefixes, np.uint8), lo, hi)).tolist()
+    starts, ends, labels = [], [], []
+
+    def emit(start, end, label):
+        if start > end:
+            return
+        if ends and ends[-1] + 1 == start and labels[-1] == label:
+            ends[-1] = end
+        else:
+            starts.append(start)
+            ends.append(end)
+            labels.append(label)
+
+    open_ends, open_ids = [], []    # enclosing networks still open, innermost last
+    cursor = 0
+    for i in order:
+        start = firsts[i]
+        while open_ends and open_ends[-1] < start:
+            top_end, top_id = open_ends.pop(), open_ids.pop()
+            emit(cursor, top_end, top_id)
+            cursor = max(cursor, top_end + 1)
+        if open_ends:
+            emit(cursor, start - 1, open_ids[-1])
+        cursor = start
+        open_ends.append(lasts[i])
+        open_ids.append(ids[i])
+    while open_ends:
+        top_end, top_id = open_ends.pop(), open_ids.pop()
+        emit(cursor, top_end, top_id)
+        cursor = max(cursor, top_end + 1)
+    return starts, ends, labels
+
+
+class IPTable:
+    """Immutable longest-prefix-match table for IPv4 and IPv6.
+
+    Storage is columnar: lists of ints and strings, not one object per
+    CIDR. A reload therefore allocates few GC-tracked objects, and the
+    garbage-collection passes it triggers (which pause every thread) stay
+    short. `IPInfo` is built per lookup.
+    """
+
+    def __init__(self, ranges, sources=()):
+        self.networks, self.risks, self.countries = [], [], []
+        columns = {4: ([], [], [], []), 6: ([], [], [], [])}    # firsts, lasts, prefixes, ids
+        self.rejected = 0
+        for cidr, risk, country in ranges:
+            try:
+                version, first, last, prefix = parse_cidr(cidr)
+            except ValueError:
+                self.rejected += 1      # one bad line must not block a reload
+                continue
+            firsts, lasts, prefixes, ids = columns[version]
+            firsts.append(first)
+            lasts.append(last)
+            prefixes.append(prefix)
+            ids.append(len(self.networks))
+            self.networks.append(format_network(version, first, prefix))
+            self.risks.append(risk)
+            self.countries.append(country or "")
+        self.size = len(self.networks)
+        self.sources = tuple(sources)
+        self._tables = {version: _flatten(*cols) for version, cols in columns.items()}
+        starts, ends, labels = self._tables[4]
+        self._v4_starts = np.array(starts, np.uint32)
+        self._v4_ends = np.array(ends, np.uint32)
+        self._v4_labels = labels
+
+    def _info(self, label):
+        return IPInfo(self.networks[label], self.risks[label], self.countries[label])
+
+    def lookup_int(self, version, value):
+        starts, ends, labels = self._tables[version]
+        i = bisect.bisect_right(starts, value) - 1
+        if i >= 0 and value <= ends[i]:
+            return self._info(labels[i])
+        return None
+
+    def lookup(self, ip):
+        parsed = parse_ip(ip)
+        return self.lookup_int(*parsed) if parsed else None
+
+    def lookup_many(self, ips):
+        """[IPInfo or None] for a batch of address strings (duplicates are cheap)."""
+        uniq, inverse = np.unique(np.asarray(ips, dtype=str), return_inverse=True)
+        parsed = [parse_ip(ip) for ip in uniq.tolist()]
+        found = [None] * len(parsed)
+        v4 = [i for i, p in enumerate(parsed) if p and p[0] == 4]
+        if v4 and len(self._v4_starts):
+            values = np.array([parsed[i][1] for i in v4], np.uint32)
+            pos = np.searchsorted(self._v4_starts, values, side="right") - 1
+            hit = (pos >= 0) & (values <= self._v4_ends[np.maximum(pos, 0)])
+            infos = {}
+            for i, p, h in zip(v4, pos.tolist(), hit.tolist()):
+                if h:
+                    label = self._v4_labels[p]
+                    info = infos.get(label)
+                    if info is None:
+                        info = infos[label] = self._info(label)
+                    found[i] = info
+        for i, p in enumerate(parsed):
+            if p and p[0] == 6:
+                found[i] = self.lookup_int(6, p[1])
+        return [found[i] for i in inverse.tolist()]
+
+
+def read_ranges(path):
+    """(cidr, risk, country) rows from one CSV file."""
+    with open(path, newline="", encoding="utf-8") as fh:
+        rows = (line for line in fh if line.strip() and not line.lstrip().startswith("#"))
+        for row in csv.DictReader(rows):
+            yield row["cidr"], (row.get("risk") or "").strip(), (row.get("country") or "").strip().upper()
+
+
+def source_files(path=IP_INTEL_PATH):
+    if os.path.isdir(path):
+        return sorted(glob.glob(os.path.join(path, "*.csv")))
+    return [path] if os.path.isfile(path) else []
+
+
+class IPIntel:
+    def __init__(self, path=IP_INTEL_PATH, reload_interval=RELOAD_INTERVAL):
+        self.path = path
+        self.reload_interval = reload_interval
+        self.table = None
+        self._mtimes = None
+        self._reload_lock = threading.Lock()    # one rebuild at a time; readers never take it
+        self._stop = threading.Event()
+        self._thread = None
+        self.reload()
+
+    def _stat(self):
+        files = source_files(self.path)
+        return {f: os.stat(f).st_mtime_ns for f in files}
+
+    def reload(self):
+        """Rebuild from the source files and swap the table in; returns the new table."""
+        with self._reload_lock:
+            mtimes = self._stat()
+            ranges = (r for f in mtimes for r in read_ranges(f)) if mtimes else DEFAULT_RANGES
+            self.table = IPTable(ranges, sources=mtimes)
+            self._mtimes = mtimes
+            return self.table
+
+    def reload_if_changed(self):
+        if self._stat() != self._mtimes:
+            self.reload()
+            return True
+        return False
+
+    def lookup(self, ip):
+        return self.table.lookup(ip)
+
+    def lookup_many(self, ips):
+        return self.table.lookup_many(ips)
+
+    def risk(self, ip, default="Unknown Risk"):
+        info = self.table.lookup(ip)
+        return info.risk if info and info.risk else default
+
+    def risk_many(self, ips, default="Unknown Risk"):
+        return [info.risk if info and info.risk else default for info in self.table.lookup_many(ips)]
+
+    # -- hot reload ---------------------------------------------------
+
+    def _run(self):
+        while not self._stop.wait(self.reload_interval):
+            try:
+                self.reload_if_changed()
+            except Exception:
+                pass    # a half-written file: keep serving the current table, retry next tick
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="ip-intel-reload", daemon=True)
+            self._thread.start()
+        return self
+
+    def close(self):
+        self._stop.set()
+
+
+_intel = None
+_intel_lock = threading.Lock()
+
+
+def get_ip_intel():
+    global _intel
+    if _intel is None:
+        with _intel_lock:
+            if _intel is None:
+                _intel = IPIntel().start()
+    return _intel
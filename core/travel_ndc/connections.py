@@ -0,0 +1,196 @@
+# core/travel_ndc/connections.py
+"""Connection search: cheapest or fastest itineraries with up to two stops.
+
+The fare inventory is treated as a graph. Airports are nodes, and each fare
+is a timed edge departing at day*1440 + dep minutes and arriving
+`duration` minutes later. The search is label-setting, Dijkstra-like:
+
+- Partial itineraries are popped from a heap in objective order (total
+  price, or elapsed time since the first departure). The first `limit`
+  that reach the destination are therefore the best ones. It is a
+  k-best label setting with k = `limit`.
+- From an airport, only neighbours in the precomputed route adjacency are
+  tried.
+- A next leg must leave at least `min_connection` minutes after arrival
+  and no more than `max_layover` later.
+- Per neighbour and arrival time, at most `limit` feasible flights are
+  pushed: the cheapest ones. For a first leg under the duration objective
+  they are instead the latest departures, because elapsed time starts at
+  them. A label is dropped when `limit` other labels at the same airport
+  and arrival time are at least as good on cost and legs used. Keeping
+  only one would lose the second-best itinerary whenever it shares an
+  arrival with the best one.
+- A label that arrives earlier does not dominate a later one. The
+  max-layover window moves with the arrival, so the later label can still
+  catch flights the earlier one cannot.
+- Under the price objective a leg costs its stored fare, or with `costs`
+  (a pricing.LegCosts) its priced total in the shopper's currency.
+- The heap is ordered A*-style by cost plus a lower bound on the rest of
+  the trip. The bound comes from each route's cheapest fare or shortest
+  flight, and is infinite when the destination is out of reach in the legs
+  left. Branches whose bound exceeds the current `limit`-th best complete
+  itinerary are cut. Hopeless branches are never expanded, and the order
+  stays exact.
+"""
+
+import heapq
+import itertools
+
+import numpy as np
+
+from core.travel_ndc.inventory import day_ordinal, get_inventory
+
+MIN_CONNECTION = 60         # minutes
+MAX_LAYOVER = 24 * 60       # minutes
+MAX_STOPS = 2
+OBJECTIVES = ("price", "duration")
+
+
+def _front(inv, start, end, earliest, latest, min_seats, latest_departure=False, prices=None, k=1):
+    """(rows, arrivals, prices) for rows in [start, end) departing in [earliest, latest], up to
+    `k` per arrival time: the cheapest, or with `latest_departure` the last to leave (cheapest
+    among ties). `prices` are the slice's leg prices; the stored fare when None."""
+    dep = inv.dep_abs[start:end]
+    rows = np.flatnonzero((dep >= earliest) & (dep <= latest) & (inv.seats[start:end] >= min_seats))
+    if not len(rows):
+        return rows, rows, rows
+    arrival = inv.arr_abs[start:end][rows]
+    # Slices are sorted by stored fare, so row position is price order unless `prices` is given.
+    price_rank = rows if prices is None else prices[rows]
+    if latest_departure:
+        order = np.lexsort((price_rank, -dep[rows], arrival))
+    else:
+        order = np.lexsort((price_rank, arrival))
+    rows, arrival = rows[order], arrival[order]
+    # Rank of each row within its arrival time; keep the first k.
+    _, first, inverse = np.unique(arrival, return_index=True, return_inverse=True)
+    keep = np.arange(len(rows)) - first[inverse] < k
+    rows, arrival = rows[keep], arrival[keep]
+    leg_prices = inv.price[rows + start] if prices is None else prices[rows]
+    return rows + start, arrival, leg_prices
+
+
+def _lower_bounds(inv, dest, max_legs, objective, min_connection, costs=None):
+    """{legs_left: {airport: lower bound on reaching dest}} from per-route minima."""
+    if objective == "price":
+        best = inv.route_min_price if costs is None else costs.route_min
+    else:
+        best = inv.route_min_duration
+    # Elapsed time also pays at least one minimum connection per stop.
+    stop_cost = 0 if objective == "price" else min_connection
+    bounds = {0: {dest: 0.0}}
+    for legs in range(1, max_legs + 1):
+        prev = bounds[legs - 1]
+        current = {dest: 0.0}
+        for (a, b), cost in best.items():
+            rest = prev.get(b)
+            if rest is None:
+                continue
+            total = cost + rest + (stop_cost if b != dest else 0)
+            if total < current.get(a, float("inf")):
+                current[a] = total
+        bounds[legs] = current
+    return bounds
+
+
+def _candidates(inv, airport, earliest, latest, min_seats, visited, latest_departure=False,
+                costs=None, k=1):
+    days = range(earliest // 1440, latest // 1440 + 1)
+    for dest in inv.neighbors.get(airport, ()):
+        if dest in visited:
+            continue
+        for day in days:
+            span = inv.date_slices.get((airport, dest, day))
+            if span is None:
+                continue
+            prices = costs.slice(*span) if costs is not None else None
+            rows, arrivals, leg_prices = _front(inv, span[0], span[1], earliest, latest, min_seats,
+                                                latest_departure, prices, k)
+            yield from zip([dest] * len(rows), rows.tolist(), arrivals.tolist(), leg_prices.tolist())
+
+
+def _dominated(labels, cost, legs, k):
+    """True when `k` labels are at least as good on both cost and legs."""
+    better = 0
+    for c, n in labels:
+        if c <= cost and n <= legs:
+            better += 1
+            if better >= k:
+                return True
+    return False
+
+
+def find_itineraries(origin, dest, date, objective="price", max_stops=MAX_STOPS, limit=10,
+                     min_connection=MIN_CONNECTION, max_layover=MAX_LAYOVER, passengers=1,
+                     inventory=None, costs=None):
+    """Best itineraries origin -> dest departing on `date`, as dicts with legs.
+    With `costs` (pricing.LegCosts), the price objective ranks on priced totals."""
+    if objective not in OBJECTIVES:
+        raise ValueError(f"objective must be one of {OBJECTIVES}, got {objective!r}")
+    inv = inventory or get_inventory()
+    o = inv.airport_index.get(origin)
+    d = inv.airport_index.get(dest)
+    if o is None or d is None or o == d:
+        return []
+    day = day_ordinal(date)
+    max_legs = max_stops + 1
+    if objective != "price":
+        costs = None
+    bounds = _lower_bounds(inv, d, max_legs, objective, min_connection, costs)
+    counter = itertools.count()
+    heap = []
+    labels = {}         # (airport, arrival) -> [(cost, legs)], at most `limit` non-dominated
+    found = []          # max-heap (negated) of the best `limit` complete costs so far
+
+    def push(cost, arrival, airport, path, first_dep):
+        rest = bounds[max_legs - len(path)].get(airport)
+        if rest is None:
+            return      # destination out of reach in the legs left
+        if len(found) == limit and cost + rest > -found[0]:
+            return      # cannot make the top `limit` any more
+        seen = labels.setdefault((airport, arrival), [])
+        if _dominated(seen, cost, len(path), limit):
+            return
+        seen.append((cost, len(path)))
+        if airport == d:
+            heapq.heappush(found, -cost)
+            if len(found) > limit:
+                heapq.heappop(found)
+        heapq.heappush(heap, (cost + rest, next(counter), cost, arrival, airport, path, first_dep))
+
+    for nxt, row, arrival, price in _candidates(inv, o, day * 1440, day * 1440 + 1439, passengers, {o},
+                                                objective == "duration", costs, limit):
+        first_dep = int(inv.dep_abs[row])
+        cost = price if objective == "price" else arrival - first_dep
+        push(cost, arrival, nxt, (row,), first_dep)
+
+    results = []
+    while heap and len(results) < limit:
+        _, _, cost, arrival, airport, path, first_dep = heapq.heappop(heap)
+        if airport == d:
+            results.append(_itinerary(inv, path, first_dep, arrival))
+            continue
+        if len(path) > max_stops:
+            continue
+        visited = {int(inv.origin[r]) for r in path} | {airport}
+        for nxt, row, arr, price in _candidates(inv, airport, arrival + min_connection,
+                                                arrival + max_layover, passengers, visited,
+                                                costs=costs, k=limit):
+            new_cost = cost + price if objective == "price" else arr - first_dep
+            push(new_cost, arr, nxt, path + (row,), first_dep)
+    return results
+
+
+def _itinerary(inv, path, first_dep, arrival):
+    legs = [inv.record(r) for r in path]
+    return {
+        "from": legs[0]["from"],
+        "to": legs[-1]["to"],
+        "stops": len(legs) - 1,
+        "via": " ".join(leg["to"] for leg in legs[:-1]),
+        "departure": f"{legs[0]['date']} {legs[0]['departure']}",
+        "duration_min": arrival - first_dep,
+        "price": round(sum(leg["price"] for leg in legs), 2),
+        "airlines": "/".join(leg["airline"] for leg in legs),
+        "legs": legs,
+    }
@@ -0,0 +1,295 @@
+# core/travel_ndc/inventory.py
+"""Columnar fare/schedule inventory with route and route-date indexes.
+
+Every fare is one row in a set of parallel NumPy arrays: airports,
+carriers, fare families and booking buckets are interned as small integer
+codes, the date is a day ordinal, and departure and duration are minutes.
+The rows are sorted once by (origin, destination, date, price). A search
+for one route and date is then a dict lookup that yields a contiguous
+slice, already in price order. A route-only search is another contiguous
+slice. Filters are vectorized masks over that slice.
+
+Inventories can be generated (demo and benchmark data), built from
+records or CSV, and saved/loaded as a single .npz file.
+
+Every route carries a version number and every inventory a generation.
+`update_routes()` swaps in a copy where only the given routes' fares
+changed. Those routes get new versions and the rest keep theirs, so
+caches can drop exactly the results that went stale.
+"""
+
+import csv
+import datetime
+import itertools
+import os
+import threading
+
+import numpy as np
+
+from core.realtime.event_bus import publish
+
+INVENTORY_FILE = "data/fares.npz"
+DEMO_FARES = 200_000
+
+AIRPORTS = ("KRT", "DXB", "JED", "RUH", "CAI", "IST", "ADD", "NBO", "DOH", "LHR",
+            "AMM", "BAH", "MCT", "KWI", "FRA", "CDG", "PZU", "EBB", "SHJ", "MED")
+CARRIERS = ("HN", "SA", "GL", "NX", "EK", "QR", "TK", "MS", "ET", "SV")
+FARE_FAMILIES = ("Basic", "Flex", "Premium")
+BUCKETS = ("Y", "B", "M", "H", "Q", "J")
+
+_FIELDS = ("origin", "dest", "day", "dep", "duration", "carrier", "family", "bucket",
+           "seats", "price")
+_DTYPES = {"origin": np.int16, "dest": np.int16, "day": np.int32, "dep": np.int16,
+           "duration": np.int16, "carrier": np.int16, "family": np.int8, "bucket": np.int8,
+           "seats": np.int16, "price": np.float32}
+
+_versions = itertools.count(1)
+
+
+def day_ordinal(value):
+    """date / datetime / 'YYYY-MM-DD' / ordinal -> proleptic Gregorian ordinal."""
+    if value is None:
+        return None
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    if isinstance(value, str):
+        value = datetime.date.fromisoformat(value[:10])
+    if isinstance(value, datetime.datetime):
+        value = value.date()
+    return value.toordinal()
+
+
+class FareInventory:
+    def __init__(self, columns, airports, carriers, families=FARE_FAMILIES, buckets=BUCKETS,
+                 versions=None):
+        self.airports = list(airports)
+        self.carriers = list(carriers)
+        self.families = list(families)
+        self.buckets = list(buckets)
+        self.airport_index = {a: i for i, a in enumerate(self.airports)}
+        self.carrier_index = {c: i for i, c in enumerate(self.carriers)}
+        self.family_index = {f: i for i, f in enumerate(self.families)}
+
+        order = np.lexsort((columns["price"], columns["day"], columns["dest"], columns["origin"]))
+        for name in _FIELDS:
+            setattr(self, name, np.ascontiguousarray(np.asarray(columns[name], _DTYPES[name])[order]))
+        self._build_indexes()
+        # Routes carried over unchanged keep their version; new or replaced ones get a fresh one.
+        versions = versions or {}
+        self.generation = next(_versions)
+        self.route_versions = {route: versions.get(route) or next(_versions)
+                               for route in self.route_slices}
+
+    def __len__(self):
+        return len(self.price)
+
+    def _build_indexes(self):
+        # Sorted by (origin, dest, day): each route and each route-day is one run.
+        n = len(self)
+        self.route_slices = {}
+        self.date_slices = {}
+        self.neighbors = {}     # origin code -> [dest codes], for connection search
+        self.route_min_price = {}
+        self.route_min_duration = {}
+        self.dep_abs = self.day.astype(np.int64) * 1440 + self.dep    # minutes since day 0
+        self.arr_abs = self.dep_abs + self.duration
+        if not n:
+            return
+        key = ((self.origin.astype(np.int64) * 4096 + self.dest) << 32) | self.day.astype(np.int64)
+        bounds = np.flatnonzero(np.diff(key)) + 1
+        starts = np.concatenate(([0], bounds))
+        ends = np.concatenate((bounds, [n]))
+        for s, e in zip(starts.tolist(), ends.tolist()):
+            o, d, day = int(self.origin[s]), int(self.dest[s]), int(self.day[s])
+            self.date_slices[(o, d, day)] = (s, e)
+            route = self.route_slices.get((o, d))
+            self.route_slices[(o, d)] = (route[0], e) if route else (s, e)
+        for (o, d), (s, e) in self.route_slices.items():
+            self.neighbors.setdefault(o, []).append(d)
+            self.route_min_price[(o, d)] = float(self.price[s:e].min())
+            self.route_min_duration[(o, d)] = int(self.duration[s:e].min())
+
+    def routes(self):
+        """[(origin, dest)] airport-code pairs present in the inventory."""
+        return [(self.airports[o], self.airports[d]) for o, d in self.route_slices]
+
+    def route_version(self, origin, dest):
+        """Version of a route's fares; None when the route is not in the inventory."""
+        o = self.airport_index.get(origin)
+        d = self.airport_index.get(dest)
+        return self.route_versions.get((o, d))
+
+    def dates(self):
+        days = np.unique(self.day)
+        return [datetime.date.fromordinal(int(d)) for d in days]
+
+    def slice_for(self, origin, dest, date=None):
+        """(start, end, price_sorted) for a route, optionally one day; (0, 0, True) if absent."""
+        o = self.airport_index.get(origin)
+        d = self.airport_index.get(dest)
+        if o is None or d is None:
+            return 0, 0, True
+        if date is None:
+            s, e = self.route_slices.get((o, d), (0, 0))
+            return s, e, False
+        s, e = self.date_slices.get((o, d, day_ordinal(date)), (0, 0))
+        return s, e, True
+
+    def record(self, i):
+        """One fare as a plain dict (the shape offer pages display)."""
+        dep = int(self.dep[i])
+        return {
+            "from": self.airports[self.origin[i]],
+            "to": self.airports[self.dest[i]],
+            "date": datetime.date.fromordinal(int(self.day[i])).isoformat(),
+            "departure": f"{dep // 60:02d}:{dep % 60:02d}",
+            "duration_min": int(self.duration[i]),
+            "airline": self.carriers[self.carrier[i]],
+            "fare": self.families[self.family[i]],
+            "bucket": self.buckets[self.bucket[i]],
+            "seats": int(self.seats[i]),
+            "price": round(float(self.price[i]), 2),
+        }
+
+    # -- persistence --------------------------------------------------
+
+    def save(self, path=INVENTORY_FILE):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        np.savez(path, airports=np.array(self.airports), carriers=np.array(self.carriers),
+                 families=np.array(self.families), buckets=np.array(self.buckets),
+                 **{name: getattr(self, name) for name in _FIELDS})
+
+    @classmethod
+    def load(cls, path=INVENTORY_FILE):
+        with np.load(path) as data:
+            columns = {name: data[name] for name in _FIELDS}
+            return cls(columns, data["airports"].tolist(), data["carriers"].tolist(),
+                       data["families"].tolist(), data["buckets"].tolist())
+
+    @classmethod
+    def from_records(cls, records):
+        """Build from dicts with from, to, date, departure ('HH:MM'), duration_min,
+        airline, fare, bucket, seats, price."""
+        tables = ({}, {}, {f: i for i, f in enumerate(FARE_FAMILIES)}, {b: i for i, b in enumerate(BUCKETS)})
+        cols = _encode(records, *tables)
+        return cls(cols, *(list(t) for t in tables))
+
+    def replace_routes(self, records):
+        """Copy of this inventory where every route present in `records` has
+        exactly those fares; returns (inventory, touched route code pairs)."""
+        tables = (dict(self.airport_index), dict(self.carrier_index), dict(self.family_index),
+                  {b: i for i, b in enumerate(self.buckets)})
+        new = _encode(records, *tables)
+        touched = set(zip(new["origin"], new["dest"]))
+        keep = np.ones(len(self), bool)
+        for route in touched:
+            s, e = self.route_slices.get(route, (0, 0))
+            keep[s:e] = False
+        cols = {name: np.concatenate((getattr(self, name)[keep], np.asarray(new[name], _DTYPES[name])))
+                for name in _FIELDS}
+        versions = {r: v for r, v in self.route_versions.items() if r not in touched}
+        return type(self)(cols, *(list(t) for t in tables), versions=versions), touched
+
+    @classmethod
+    def from_csv(cls, path):
+        with open(path, newline="", encoding="utf-8") as fh:
+            return cls.from_records(csv.DictReader(fh))
+
+
+def _encode(records, airports, carriers, families, buckets):
+    """Record dicts -> column lists, interning codes into the given {value: code} tables."""
+    cols = {name: [] for name in _FIELDS}
+
+    def code(table, value):
+        return table.setdefault(value, len(table))
+
+    for r in records:
+        hh, mm = str(r.get("departure", "00:00")).split(":")[:2]
+        cols["origin"].append(code(airports, r["from"]))
+        cols["dest"].append(code(airports, r["to"]))
+        cols["day"].append(day_ordinal(r["date"]))
+        cols["dep"].append(int(hh) * 60 + int(mm))
+        cols["duration"].append(int(r.get("duration_min", 0)))
+        cols["carrier"].append(code(carriers, r["airline"]))
+        cols["family"].append(code(families, r.get("fare", "Basic")))
+        cols["bucket"].append(code(buckets, r.get("bucket", "Y")))
+        cols["seats"].append(int(r.get("seats", 9)))
+        cols["price"].append(float(r["price"]))
+    return cols
+
+
+def generate_inventory(n=DEMO_FARES, days=30, start=None, seed=7,
+                       airports=AIRPORTS, carriers=CARRIERS, routes_per_airport=8):
+    """Synthetic inventory: a fixed route network, several daily flights per route."""
+    rng = np.random.default_rng(seed)
+    start = day_ordinal(start or datetime.date.today())
+    n_airports = len(airports)
+
+    # Each airport serves a handful of destinations; KRT is well connected.
+    pairs = set()
+    for o in range(n_airports):
+        k = n_airports - 1 if airports[o] == "KRT" else routes_per_airport
+        for d in rng.choice([x for x in range(n_airports) if x != o], size=min(k, n_airports - 1),
+                            replace=False):
+            pairs.add((o, int(d)))
+            pairs.add((int(d), o))
+    pairs = np.array(sorted(pairs), dtype=np.int16)
+    # Stable per-route distance drives duration and base price.
+    base_minutes = rng.integers(60, 420, size=len(pairs))
+
+    route = rng.integers(0, len(pairs), size=n)
+    family = rng.integers(0, len(FARE_FAMILIES), size=n)
+    duration = base_minutes[route] + rng.integers(0, 45, size=n)
+    price = (duration * rng.uniform(0.9, 1.6, size=n) * (1 + 0.45 * family)
+             + rng.normal(0, 25, size=n)).clip(49)
+    columns = {
+        "origin": pairs[route, 0],
+        "dest": pairs[route, 1],
+        "day": start + rng.integers(0, days, size=n),
+        "dep": rng.integers(0, 24 * 12, size=n) * 5,
+        "duration": duration,
+        "carrier": rng.integers(0, len(carriers), size=n),
+        "family": family,
+        "bucket": rng.integers(0, len(BUCKETS), size=n),
+        "seats": rng.integers(0, 10, size=n),
+        "price": np.round(price, 2),
+    }
+    return FareInventory(columns, airports, carriers)
+
+
+_inventory = None
+_inventory_lock = threading.Lock()
+
+
+def get_inventory():
+    """Process-wide inventory: data/fares.npz when present, demo data otherwise."""
+    global _inventory
+    if _inventory is None:
+        with _inventory_lock:
+            if _inventory is None:
+                if os.path.exists(INVENTORY_FILE):
+                    _inventory = FareInventory.load(INVENTORY_FILE)
+                else:
+                    _inventory = generate_inventory()
+    return _inventory
+
+
+def set_inventory(inventory):
+    global _inventory
+    with _inventory_lock:
+        _inventory = inventory
+    publish("travel.inventory", routes=None)
+
+
+def update_routes(records):
+    """Replace the fares of every route in `records`; returns the touched "AAA-BBB" routes."""
+    global _inventory
+    get_inventory()
+    with _inventory_lock:
+        _inventory, touched = _inventory.replace_routes(records)
+        airports = _inventory.airports
+    routes = sorted(f"{airports[o]}-{airports[d]}" for o, d in touched)
+    publish("travel.inventory", routes=routes)
+    return routes
@@ -1,14 +1,72 @@
 # core/travel_ndc/offer_builder.py
-import random
+from core.realtime.event_bus import publish
+from core.travel_ndc.connections import find_itineraries
+from core.travel_ndc.inventory import get_inventory
+from core.travel_ndc.pricing import BASE_CURRENCY, annotate, get_pricing_engine
+from core.travel_ndc.search import search_offers
+from core.travel_ndc.shopping_cache import get_shopping_cache, shopping_key
+
+DEFAULT_OFFERS = 5
+
+def _priced_search(origin, dest, inv, currency, query):
+    # Rank and filter on what the shopper pays: priced totals in their currency.
+    engine = get_pricing_engine()
+    result = search_offers(origin, dest, inventory=inv,
+                           price_of=lambda rows: engine.price_rows(inv, rows, currency)["total"], **query)
+    quote = engine.price_rows(inv, result.rows, currency)
+    result.offers = annotate(result.offers, quote, currency)
+    return result
+
+def _price_itineraries(itineraries, currency):
+    # All legs of all itineraries go through the pricing stage as one batch.
+    priced = iter(get_pricing_engine().price_offers([leg for it in itineraries for leg in it["legs"]],
+                                                    currency))
+    for it in itineraries:
+        it["legs"] = [next(priced) for _ in it["legs"]]
+        it["total"] = round(sum(leg["total"] for leg in it["legs"]), 2)
+        it["currency"] = currency
+    return itineraries
 
 def generate_flight_offers(query):
-    return [
-        {
-            "from": query.get("from", "KRT"),
-            "to": query.get("to", "DXB"),
-            "price": random.randint(200, 800),
-            "fare": random.choice(["Basic", "Flex", "Premium"]),
-            "airline": random.choice(["HN", "SA", "GL", "NX"]),
-        }
-        for _ in range(5)
-    ]
\ No newline at end of file
+    """Priced offers for a {"from", "to", "date"?, "passengers"?, "currency"?, "sort"?,
+    "limit"?, "offset"?, ...filters} query, served from the shopping cache when still valid."""
+    query = dict(query)
+    origin = query.pop("from", "KRT").strip().upper()
+    dest = query.pop("to", "DXB").strip().upper()
+    query.setdefault("limit", DEFAULT_OFFERS)
+    if query.get("passengers"):
+        query["min_seats"] = query.pop("passengers")
+    currency = query.pop("currency", BASE_CURRENCY)
+    inv = get_inventory()
+    cache = get_shopping_cache()
+    result, cached = cache.get_or_compute(
+        shopping_key("offers", origin, dest, {**query, "currency": currency}), (origin, dest),
+        inv.route_version(origin, dest), lambda: _priced_search(origin, dest, inv, currency, query),
+        cache.ttl_for(origin, dest, query.get("date")),
+    )
+    publish("travel.search", origin=origin, destination=dest, offers=len(result.offers),
+            total=result.total, cached=cached)
+    return result.offers
+
+def build_itineraries(query):
+    """Priced direct and connecting itineraries for a {"from", "to", "date", "objective"?,
+    "max_stops"?, "limit"?, "passengers"?, "currency"?} query, best first."""
+    query = dict(query)
+    origin = query.pop("from", "KRT").strip().upper()
+    dest = query.pop("to", "DXB").strip().upper()
+    date = query.pop("date")
+    currency = query.pop("currency", BASE_CURRENCY)
+    inv = get_inventory()
+    cache = get_shopping_cache()
+    # Any route's fares can change a connection, so key on the whole inventory.
+    itineraries, cached = cache.get_or_compute(
+        shopping_key("itineraries", origin, dest, {"date": date, "currency": currency, **query}),
+        (origin, dest), inv.generation,
+        lambda: _price_itineraries(find_itineraries(
+            origin, dest, date, inventory=inv, costs=get_pricing_engine().leg_costs(inv, currency), **query,
+        ), currency),
+        cache.ttl_for(origin, dest, date),
+    )
+    publish("travel.search", origin=origin, destination=dest, offers=len(itineraries),
+            connections=True, cached=cached)
+    return itineraries
@@ -0,0 +1,276 @@
+# core/travel_ndc/pricing.py
+"""Dynamic pricing stage for shopping results.
+
+The inventory stores the carrier's filed fare. The price a customer sees
+is built from that fare in this order:
+
+    fare  = base * family markup * demand * noise
+    total = (fare * (1 + tax rate) + airport tax) * exchange rate
+
+- demand combines a load-factor curve (fewer seats left, higher price)
+  with an advance-purchase curve (the price rises as departure nears).
+- noise is a small deterministic jitter. It is derived from a hash of the
+  seed and the flight (route, day, departure, carrier, family), not from
+  its position in the batch. The same flight therefore prices the same on
+  every page, batch and run under one seed.
+
+`price_arrays` applies all of this to whole NumPy columns at once.
+`price_rows` feeds it straight from inventory rows. `price_offers` feeds
+it from offer dicts, such as itinerary legs. `price_offer` is the same
+formula per dict in plain Python; it is the reference implementation and
+the baseline in tools/bench_pricing.py.
+
+Shopping ranks and filters on the priced total, not the stored fare.
+`leg_costs()` gives the connection search priced totals per route-day
+slice, plus per-route lower bounds on them for its A* pruning.
+"""
+
+import datetime
+import math
+import os
+import threading
+import zlib
+
+import numpy as np
+
+BASE_CURRENCY = "USD"
+FAMILIES = ("Basic", "Flex", "Premium")
+FAMILY_MARKUP = {"Basic": 1.04, "Flex": 1.06, "Premium": 1.08}
+SEAT_CAP = 9                    # seats a bucket shows when empty
+LOAD_ELASTICITY = 0.35          # +35% when the last seat sells
+ADVANCE_PREMIUM = 0.30          # +30% on the day of departure ...
+ADVANCE_DECAY = 7.0             # ... fading with this many days' time constant
+NOISE = 0.03                    # +/-3%
+TAX_RATE = 0.05
+AIRPORT_TAX = {                 # USD per departing passenger
+    "KRT": 45.0, "PZU": 30.0, "DXB": 38.0, "SHJ": 30.0, "JED": 40.0, "RUH": 40.0, "MED": 35.0,
+    "CAI": 33.0, "LHR": 95.0, "FRA": 70.0, "CDG": 75.0, "IST": 42.0, "DOH": 36.0,
+}
+DEFAULT_AIRPORT_TAX = 30.0
+EXCHANGE_RATES = {              # units per USD
+    "USD": 1.0, "EUR": 0.92, "GBP": 0.79, "AED": 3.6725, "SAR": 3.75, "EGP": 48.5, "SDG": 601.0,
+}
+
+LEG_COST_CACHE = 8              # (inventory, currency, day) combinations kept priced
+
+_MASK = (1 << 64) - 1
+_K = (0x9E3779B97F4A7C15, 0xBF58476D1CE4E5B9, 0x94D049BB133111EB, 0xD6E8FEB86659FD93,
+      0xA0761D6478BD642F)
+
+
+def _crc(text):
+    return zlib.crc32(str(text).encode("utf-8"))
+
+
+def _flight_hash(seed, origin, dest, day, dep, carrier, family):
+    """splitmix64 over the flight identity -> uniform [0, 1). NumPy uint64 arrays wrap like & _MASK."""
+    u64 = np.uint64
+    x = (u64(seed & _MASK) + origin.astype(u64) * u64(_K[0]) + dest.astype(u64) * u64(_K[1])
+         + day.astype(u64) * u64(_K[2]) + dep.astype(u64) * u64(_K[3])
+         + carrier.astype(u64) * u64(_K[4]) + family.astype(u64))
+    x = (x ^ (x >> u64(30))) * u64(_K[1])
+    x = (x ^ (x >> u64(27))) * u64(_K[2])
+    x = x ^ (x >> u64(31))
+    return (x >> u64(11)).astype(np.float64) * 2.0 ** -53
+
+
+def _flight_hash_one(seed, origin, dest, day, dep, carrier, family):
+    x = ((seed & _MASK) + origin * _K[0] + dest * _K[1] + day * _K[2] + dep * _K[3]
+         + carrier * _K[4] + family) & _MASK
+    x = ((x ^ (x >> 30)) * _K[1]) & _MASK
+    x = ((x ^ (x >> 27)) * _K[2]) & _MASK
+    x = x ^ (x >> 31)
+    return (x >> 11) * 2.0 ** -53
+
+
+def _crcs(names, index=None):
+    codes = np.array([_crc(n) for n in names], np.int64)
+    return codes if index is None else codes[index]
+
+
+def _family_code(family):
+    return FAMILIES.index(family) if family in FAMILIES else len(FAMILIES)
+
+
+def _family_codes(families):
+    return np.array([_family_code(f) for f in families], np.int64)
+
+
+def _minutes(hhmm):
+    hh, mm = str(hhmm).split(":")[:2]
+    return int(hh) * 60 + int(mm)
+
+
+class PricingEngine:
+    def __init__(self, seed=0, family_markup=FAMILY_MARKUP, airport_tax=AIRPORT_TAX,
+                 exchange_rates=EXCHANGE_RATES, tax_rate=TAX_RATE):
+        self.seed = seed
+        self.family_markup = dict(family_markup)
+        self.airport_tax = dict(airport_tax)
+        self.exchange_rates = dict(exchange_rates)
+        self.tax_rate = tax_rate
+        self._leg_costs = {}
+        self._leg_costs_lock = threading.Lock()
+
+    def rate(self, currency):
+        try:
+            return self.exchange_rates[currency]
+        except KeyError:
+            raise ValueError(f"unknown currency {currency!r}") from None
+
+    # -- batched ------------------------------------------------------
+
+    def price_arrays(self, base, family, seats, days_out, origin, dest, day, dep, carrier,
+                     currency=BASE_CURRENCY):
+        """Vectorized pricing. `family`, `origin`, `dest` and `carrier` are
+        arrays of names; the rest are numeric arrays of equal length.
+        Returns {"fare", "taxes", "total"} float64 arrays in `currency`."""
+        # Names repeat heavily, so per-name work runs once per distinct value.
+        family_names, family_idx = np.unique(family, return_inverse=True)
+        origin_names, origin_idx = np.unique(origin, return_inverse=True)
+        return self._price(
+            np.asarray(base, np.float64),
+            self._markups(family_names)[family_idx], np.asarray(seats), np.asarray(days_out),
+            _crcs(origin_names)[origin_idx], _crcs(*np.unique(dest, return_inverse=True)),
+            np.asarray(day, np.int64), np.asarray(dep, np.int64),
+            _crcs(*np.unique(carrier, return_inverse=True)), _family_codes(family_names)[family_idx],
+            self._airport_taxes(origin_names)[origin_idx], self.rate(currency),
+        )
+
+    def _markups(self, families):
+        return np.array([self.family_markup.get(f, 1.0) for f in families])
+
+    def _airport_taxes(self, airports):
+        return np.array([self.airport_tax.get(a, DEFAULT_AIRPORT_TAX) for a in airports])
+
+    def _price(self, base, markup, seats, days_out, origin, dest, day, dep, carrier, family,
+               airport_tax, rate):
+        load = 1.0 - np.clip(seats, 0, SEAT_CAP) / SEAT_CAP
+        days = np.maximum(days_out, 0)
+        demand = 1.0 + LOAD_ELASTICITY * load * load + ADVANCE_PREMIUM * np.exp(-days / ADVANCE_DECAY)
+        noise = 1.0 + NOISE * (2.0 * _flight_hash(self.seed, origin, dest, day, dep, carrier, family) - 1.0)
+        fare = base * markup * demand * noise
+        taxes = fare * self.tax_rate + airport_tax
+        return {"fare": np.round(fare * rate, 2), "taxes": np.round(taxes * rate, 2),
+                "total": np.round((fare + taxes) * rate, 2)}
+
+    def price_rows(self, inv, rows, currency=BASE_CURRENCY, today=None):
+        """Price inventory rows without materializing them as dicts."""
+        rows = np.asarray(rows, np.int64)
+        today = (today or datetime.date.today()).toordinal()
+        # Inventory columns are already interned codes: look per-code values up by index.
+        airport_crc = _crcs(inv.airports)
+        family = inv.family[rows]
+        origin = inv.origin[rows]
+        day = inv.day[rows].astype(np.int64)
+        # Fares are stored as float32; round to cents like `record()` so both paths agree.
+        base = np.round(inv.price[rows].astype(np.float64), 2)
+        return self._price(base, self._markups(inv.families)[family],
+                           inv.seats[rows], day - today, airport_crc[origin], airport_crc[inv.dest[rows]],
+                           day, inv.dep[rows].astype(np.int64), _crcs(inv.carriers)[inv.carrier[rows]],
+                           _family_codes(inv.families)[family], self._airport_taxes(inv.airports)[origin],
+                           self.rate(currency))
+
+    def price_offers(self, offers, currency=BASE_CURRENCY, today=None):
+        """Price a batch of offer dicts (inventory `record()` shape); returns new dicts."""
+        if not offers:
+            return []
+        today = (today or datetime.date.today()).toordinal()
+        # Dates and times repeat across offers: parse each distinct string once.
+        dates, date_idx = np.unique([o["date"] for o in offers], return_inverse=True)
+        day = np.array([datetime.date.fromisoformat(d).toordinal() for d in dates], np.int64)[date_idx]
+        times, time_idx = np.unique([o.get("departure", "00:00") for o in offers], return_inverse=True)
+        dep = np.array([_minutes(t) for t in times], np.int64)[time_idx]
+        quote = self.price_arrays(
+            np.array([o["price"] for o in offers], np.float64),
+            np.array([o.get("fare", "Basic") for o in offers]),
+            np.array([o.get("seats", SEAT_CAP) for o in offers]),
+            day - today,
+            np.array([o["from"] for o in offers]), np.array([o["to"] for o in offers]),
+            day, dep, np.array([o["airline"] for o in offers]), currency,
+        )
+        return annotate(offers, quote, currency)
+
+    def leg_costs(self, inv, currency=BASE_CURRENCY, today=None):
+        """Shared LegCosts for this inventory, currency and day (slices stay priced across searches)."""
+        today = today or datetime.date.today()
+        key = (inv.generation, currency, today)
+        with self._leg_costs_lock:
+            costs = self._leg_costs.get(key)
+            if costs is None or costs.inv is not inv:
+                costs = LegCosts(self, inv, currency, today)
+                if len(self._leg_costs) >= LEG_COST_CACHE:
+                    self._leg_costs.pop(next(iter(self._leg_costs)))
+                self._leg_costs[key] = costs
+        return costs
+
+    # -- reference ----------------------------------------------------
+
+    def price_offer(self, offer, currency=BASE_CURRENCY, today=None):
+        """One offer dict in plain Python; same result as the batched path."""
+        today = (today or datetime.date.today()).toordinal()
+        rate = self.rate(currency)
+        family = offer.get("fare", "Basic")
+        day = datetime.date.fromisoformat(offer["date"]).toordinal()
+        load = 1.0 - min(max(offer.get("seats", SEAT_CAP), 0), SEAT_CAP) / SEAT_CAP
+        demand = (1.0 + LOAD_ELASTICITY * load * load
+                  + ADVANCE_PREMIUM * math.exp(-max(day - today, 0) / ADVANCE_DECAY))
+        h = _flight_hash_one(self.seed, _crc(offer["from"]), _crc(offer["to"]), day,
+                             _minutes(offer.get("departure", "00:00")), _crc(offer["airline"]),
+                             _family_code(family))
+        fare = offer["price"] * self.family_markup.get(family, 1.0) * demand * (1.0 + NOISE * (2.0 * h - 1.0))
+        taxes = fare * self.tax_rate + self.airport_tax.get(offer["from"], DEFAULT_AIRPORT_TAX)
+        return {**offer, "fare_price": round(fare * rate, 2), "taxes": round(taxes * rate, 2),
+                "total": round((fare + taxes) * rate, 2), "currency": currency}
+
+
+class LegCosts:
+    """Priced totals of inventory rows for one (inventory, currency, day), computed per
+    route-day slice on first use, plus `route_min`: a lower bound on any total per route."""
+
+    def __init__(self, engine, inv, currency, today):
+        self.engine = engine
+        self.inv = inv
+        self.currency = currency
+        self.today = today
+        self._slices = {}
+        # total >= base * min markup * (1 - NOISE) * (1 + tax) + airport tax, demand >= 1;
+        # the half cent off the base and the cent off the total cover rounding.
+        rate = engine.rate(currency)
+        markup = min(engine.family_markup.get(f, 1.0) for f in inv.families)
+        factor = markup * (1.0 - NOISE) * (1.0 + engine.tax_rate)
+        self.route_min = {
+            (o, d): ((base - 0.005) * factor + engine.airport_tax.get(inv.airports[o], DEFAULT_AIRPORT_TAX)) * rate
+            * (1 - 1e-6) - 0.01
+            for (o, d), base in inv.route_min_price.items()
+        }
+
+    def rows(self, rows):
+        return self.engine.price_rows(self.inv, rows, self.currency, self.today)["total"]
+
+    def slice(self, start, end):
+        costs = self._slices.get(start)
+        if costs is None:
+            costs = self._slices[start] = self.rows(np.arange(start, end))
+        return costs
+
+
+def annotate(offers, quote, currency):
+    """Offer dicts with fare_price / taxes / total / currency from a `price_*` quote."""
+    return [{**o, "fare_price": f, "taxes": t, "total": p, "currency": currency}
+            for o, f, t, p in zip(offers, quote["fare"].tolist(), quote["taxes"].tolist(),
+                                  quote["total"].tolist())]
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_pricing_engine():
+    """Process-wide engine; HUMAIN_PRICING_SEED fixes the jitter seed (default 0)."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = PricingEngine(seed=int(os.environ.get("HUMAIN_PRICING_SEED", "0")))
+    return _engine
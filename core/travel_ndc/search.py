@@ -0,0 +1,110 @@
+# core/travel_ndc/search.py
+"""Offer search over the fare inventory.
+
+A search touches only the route (or route-day) slice of the inventory.
+Filters become one vectorized mask over that slice. Price order inside a
+route-day slice comes for free from the index. Other orders, and price
+across several days, pick the requested page with `np.argpartition` and
+sort just those k rows, instead of sorting every match.
+
+With `price_of`, the price sort and the `max_price` filter use the prices
+it returns (e.g. priced totals in the shopper's currency) instead of the
+stored fare.
+"""
+
+import numpy as np
+
+from core.travel_ndc.inventory import get_inventory
+
+SORT_KEYS = ("price", "duration", "departure")
+PAGE_SIZE = 20
+
+
+class SearchResult:
+    __slots__ = ("offers", "total", "offset", "limit", "rows")
+
+    def __init__(self, offers, total, offset, limit, rows=None):
+        self.offers = offers
+        self.rows = rows            # inventory row numbers behind `offers`
+        self.total = total
+        self.offset = offset
+        self.limit = limit
+
+    @property
+    def has_more(self):
+        return self.offset + len(self.offers) < self.total
+
+
+def _codes(index, values):
+    return [index[v] for v in values if v in index]
+
+
+def match_indices(inv, origin, dest, date=None, carriers=None, fare_families=None,
+                  max_price=None, max_duration=None, min_seats=1,
+                  depart_after=None, depart_before=None):
+    """Absolute inventory row numbers matching the filters (unordered unless date given)."""
+    start, end, _ = inv.slice_for(origin, dest, date)
+    if start == end:
+        return np.zeros(0, np.int64)
+    mask = np.ones(end - start, bool)
+    if carriers:
+        mask &= np.isin(inv.carrier[start:end], _codes(inv.carrier_index, carriers))
+    if fare_families:
+        mask &= np.isin(inv.family[start:end], _codes(inv.family_index, fare_families))
+    if max_price is not None:
+        mask &= inv.price[start:end] <= max_price
+    if max_duration is not None:
+        mask &= inv.duration[start:end] <= max_duration
+    if min_seats:
+        mask &= inv.seats[start:end] >= min_seats
+    if depart_after is not None:
+        mask &= inv.dep[start:end] >= depart_after
+    if depart_before is not None:
+        mask &= inv.dep[start:end] <= depart_before
+    return np.flatnonzero(mask) + start
+
+
+def _sort_values(inv, rows, sort):
+    if sort == "duration":
+        return inv.duration[rows]
+    if sort == "departure":
+        return inv.day[rows].astype(np.int64) * 1440 + inv.dep[rows]
+    return inv.price[rows]
+
+
+def top_k(inv, rows, k, sort="price", presorted=False, values=None):
+    """The `k` best rows by `sort` (or by `values`, aligned with rows), in order,
+    without sorting the rest."""
+    if presorted or k <= 0:
+        return rows[:max(k, 0)]
+    if values is None:
+        values = _sort_values(inv, rows, sort)
+    if k < len(rows):
+        part = np.argpartition(values, k - 1)[:k]
+        return rows[part[np.argsort(values[part], kind="stable")]]
+    return rows[np.argsort(values, kind="stable")]
+
+
+def search_offers(origin, dest, date=None, sort="price", limit=PAGE_SIZE, offset=0,
+                  inventory=None, price_of=None, **filters):
+    """One page of offers for origin -> dest. Filters: carriers, fare_families,
+    max_price, max_duration, min_seats, depart_after/depart_before (minutes).
+    `price_of(rows) -> prices` replaces the stored fare for sorting and max_price."""
+    if sort not in SORT_KEYS:
+        raise ValueError(f"sort must be one of {SORT_KEYS}, got {sort!r}")
+    inv = inventory or get_inventory()
+    if price_of is None:
+        rows = match_indices(inv, origin, dest, date, **filters)
+        presorted = sort == "price" and date is not None
+        page = top_k(inv, rows, offset + limit, sort, presorted)[offset:offset + limit]
+        return SearchResult([inv.record(i) for i in page], len(rows), offset, limit, page)
+
+    max_price = filters.pop("max_price", None)
+    rows = match_indices(inv, origin, dest, date, **filters)
+    prices = price_of(rows)
+    if max_price is not None:
+        keep = prices <= max_price
+        rows, prices = rows[keep], prices[keep]
+    values = prices if sort == "price" else None
+    page = top_k(inv, rows, offset + limit, sort, values=values)[offset:offset + limit]
+    return SearchResult([inv.record(i) for i in page], len(rows), offset, limit, page)
@@ -0,0 +1,193 @@
+# core/travel_ndc/shopping_cache.py
+"""In-memory cache for shopping results (offer searches and itineraries).
+
+Queries are normalized before keying:
+- Airport codes are upper-cased and dates become day ordinals.
+- Passengers, cabin/fare families and filter lists are canonical.
+- Cosmetic differences ("krt " vs "KRT", list order) share one entry.
+
+Entries live in an LRU bounded by `max_entries`.
+
+The TTL is chosen per market: a route override, then an origin-airport
+override, then the default. It is capped shorter for departures within
+NEAR_DEPARTURE_DAYS, because fares change fastest there.
+
+Each entry records the inventory version it was computed from:
+- Direct offers record their route's version.
+- Itineraries record the inventory generation, since a cheaper leg on
+  any route can change them.
+- A lookup whose version no longer matches the current inventory is a
+  miss, so `update_routes()` invalidates exactly the affected routes
+  without scanning the cache.
+- `invalidate_route()` drops a route's entries eagerly.
+
+Concurrent misses for the same key share one computation. `metrics()`
+reports the hit rate and the compute time that hits saved.
+"""
+
+import datetime
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from core.ai_batching import SingleFlight
+from core.ai_cache import CacheStats
+from core.travel_ndc.inventory import day_ordinal
+
+MAX_ENTRIES = 2000
+DEFAULT_TTL = 5 * 60            # seconds
+NEAR_DEPARTURE_TTL = 60
+NEAR_DEPARTURE_DAYS = 3
+MARKET_TTL = {                  # "AAA-BBB" route or "AAA" origin -> seconds
+    "KRT-DXB": 2 * 60,
+    "KRT-JED": 2 * 60,
+    "KRT-CAI": 3 * 60,
+    "PZU": 15 * 60,
+    "EBB": 15 * 60,
+}
+
+_MISS = object()
+
+
+class _Entry:
+    __slots__ = ("value", "route", "version", "expires_at", "compute_seconds")
+
+    def __init__(self, value, route, version, expires_at, compute_seconds):
+        self.value = value
+        self.route = route
+        self.version = version
+        self.expires_at = expires_at
+        self.compute_seconds = compute_seconds
+
+
+def _canonical(value):
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return day_ordinal(value)
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return tuple(sorted(_canonical(v) for v in value)) or None
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+
+def _canonical_field(key, value):
+    if key == "date" and value not in (None, ""):
+        return day_ordinal(value)       # "2026-10-17", date and datetime share one key
+    return _canonical(value)
+
+
+def shopping_key(kind, origin, dest, query):
+    """Normalized, hashable key for a `kind` ("offers"/"itineraries") query."""
+    items = tuple(sorted((k, _canonical_field(k, v)) for k, v in query.items()
+                         if _canonical_field(k, v) not in (None, "")))
+    return (kind, origin.strip().upper(), dest.strip().upper(), items)
+
+
+class ShoppingCache:
+    def __init__(self, max_entries=MAX_ENTRIES, default_ttl=DEFAULT_TTL, market_ttl=MARKET_TTL):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.market_ttl = dict(market_ttl)
+        self.stats = CacheStats()
+        self.route_hits = Counter()
+        self._data = OrderedDict()      # key -> _Entry, least recently used first
+        self._routes = {}               # (origin, dest) -> {keys}
+        self._lock = threading.Lock()
+        self._inflight = SingleFlight()
+
+    def ttl_for(self, origin, dest, date=None):
+        ttl = self.market_ttl.get(f"{origin}-{dest}", self.market_ttl.get(origin, self.default_ttl))
+        if date is not None and day_ordinal(date) - datetime.date.today().toordinal() < NEAR_DEPARTURE_DAYS:
+            ttl = min(ttl, NEAR_DEPARTURE_TTL)
+        return ttl
+
+    def _drop(self, key):
+        entry = self._data.pop(key)
+        keys = self._routes.get(entry.route)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._routes[entry.route]
+
+    def _lookup(self, key, version):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.stats.incr("misses")
+                return _MISS
+            if entry.version != version or entry.expires_at <= time.time():
+                self._drop(key)
+                self.stats.incr("stale" if entry.version != version else "expired")
+                self.stats.incr("misses")
+                return _MISS
+            self._data.move_to_end(key)
+            self.route_hits[entry.route] += 1
+        self.stats.incr("hits")
+        self.stats.incr("saved_seconds", entry.compute_seconds)
+        return entry.value
+
+    def _store(self, key, route, version, value, ttl, compute_seconds):
+        with self._lock:
+            if key in self._data:
+                self._drop(key)
+            self._data[key] = _Entry(value, route, version, time.time() + ttl, compute_seconds)
+            self._routes.setdefault(route, set()).add(key)
+            while len(self._data) > self.max_entries:
+                self._drop(next(iter(self._data)))
+                self.stats.incr("evictions")
+
+    def get_or_compute(self, key, route, version, compute, ttl=None):
+        """(value, cached): the entry for `key` if still valid at `version`, else compute() and store it.
+
+        Cached values are shared between callers and must be treated as read-only.
+        """
+        value = self._lookup(key, version)
+        if value is not _MISS:
+            return value, True
+
+        def fill():
+            start = time.perf_counter()
+            value = compute()
+            elapsed = time.perf_counter() - start
+            self.stats.incr("compute_seconds", elapsed)
+            self._store(key, route, version, value, ttl or self.default_ttl, elapsed)
+            return value
+
+        return self._inflight.do((key, version), fill), False
+
+    def invalidate_route(self, origin, dest):
+        """Drop every entry for origin -> dest; returns how many."""
+        with self._lock:
+            keys = list(self._routes.get((origin, dest), ()))
+            for key in keys:
+                self._drop(key)
+        self.stats.incr("invalidations", len(keys))
+        return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._routes.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def metrics(self, top=5):
+        data = self.stats.snapshot()
+        data["entries"] = len(self)
+        with self._lock:
+            data["top_routes"] = [(f"{o}-{d}", n) for (o, d), n in self.route_hits.most_common(top)]
+        return data
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_shopping_cache():
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ShoppingCache()
+    return _cache
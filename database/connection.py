@@ -0,0 +1,186 @@
+# database/connection.py
+"""Shared SQLite access layer.
+
+Each database file gets one `Database` object per process. Connections are
+pooled per thread (Streamlit runs every session on its own script thread),
+opened once with WAL journaling and tuned pragmas, and reused for the life
+of the thread. sqlite3's statement cache keeps prepared statements hot for
+the repeated queries the app issues.
+
+Streamlit runs every rerun on a fresh thread, so a connection is closed
+when its thread dies. A finalizer on the thread closes it, and `_open`
+also sweeps connections whose thread is no longer alive. The registry
+holds threads only weakly.
+
+Writes that belong together go through `transaction()`:
+
+    with get_db(DB).transaction() as conn:
+        conn.execute(...)
+        conn.execute(...)
+"""
+
+import os
+import sqlite3
+import itertools
+import threading
+import weakref
+from contextlib import contextmanager
+
+STATEMENT_CACHE_SIZE = 256
+
+PRAGMAS = (
+    ("journal_mode", "WAL"),
+    ("synchronous", "NORMAL"),      # durable at checkpoints; no fsync per commit in WAL
+    ("cache_size", -32000),         # ~32 MB page cache per connection
+    ("mmap_size", 268435456),       # 256 MB memory-mapped reads
+    ("busy_timeout", 5000),         # ms to wait on a locked database
+    ("temp_store", "MEMORY"),
+    ("foreign_keys", "ON"),
+)
+
+
+class Database:
+    """Per-thread pooled connections to one SQLite file."""
+
+    def __init__(self, path, pragmas=PRAGMAS):
+        self.path = path
+        self.pragmas = pragmas
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = {}      # key -> (weakref to owning thread, connection)
+        self._keys = itertools.count()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _open(self):
+        # isolation_level=None: autocommit unless inside transaction(), so
+        # single statements never leave an implicit transaction open.
+        conn = sqlite3.connect(
+            self.path,
+            isolation_level=None,
+            check_same_thread=False,
+            cached_statements=STATEMENT_CACHE_SIZE,
+        )
+        for name, value in self.pragmas:
+            conn.execute(f"PRAGMA {name}={value}")
+        thread = threading.current_thread()
+        key = next(self._keys)
+        with self._lock:
+            self._connections[key] = (weakref.ref(thread), conn)
+        weakref.finalize(thread, self._release, key)
+        self._prune()
+        return conn
+
+    def _release(self, key):
+        with self._lock:
+            entry = self._connections.pop(key, None)
+        if entry is not None:
+            _close(entry[1])
+
+    def _prune(self):
+        """Close connections whose owning thread has exited."""
+        # The calling thread is skipped: during interpreter shutdown the main
+        # thread reports not alive while atexit hooks still use its connection.
+        current = threading.current_thread()
+        with self._lock:
+            dead = [key for key, (ref, _) in self._connections.items()
+                    if ref() is None or (ref() is not current and not ref().is_alive())]
+        for key in dead:
+            self._release(key)
+
+    def open_connections(self):
+        with self._lock:
+            return len(self._connections)
+
+    @property
+    def conn(self):
+        """This thread's connection, opened on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._open()
+            self._local.depth = 0
+        return conn
+
+    @contextmanager
+    def transaction(self, immediate=True):
+        """Commit on success, roll back on error. Nests via savepoints.
+
+        `immediate=True` takes the write lock up front (BEGIN IMMEDIATE), so
+        read-modify-write sequences cannot interleave with other writers.
+        """
+        conn = self.conn
+        depth = self._local.depth
+        if depth == 0:
+            conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+        else:
+            conn.execute(f"SAVEPOINT sp{depth}")
+        self._local.depth = depth + 1
+        try:
+            yield conn
+        except BaseException:
+            if depth == 0:
+                conn.execute("ROLLBACK")
+            else:
+                conn.execute(f"ROLLBACK TO sp{depth}")
+                conn.execute(f"RELEASE sp{depth}")
+            raise
+        else:
+            if depth == 0:
+                conn.execute("COMMIT")
+            else:
+                conn.execute(f"RELEASE sp{depth}")
+        finally:
+            self._local.depth = depth
+
+    def execute(self, sql, params=()):
+        return self.conn.execute(sql, params)
+
+    def executemany(self, sql, rows):
+        return self.conn.executemany(sql, rows)
+
+    def executescript(self, script):
+        return self.conn.executescript(script)
+
+    def query(self, sql, params=()):
+        return self.conn.execute(sql, params).fetchall()
+
+    def query_one(self, sql, params=()):
+        return self.conn.execute(sql, params).fetchone()
+
+    def close_all(self):
+        with self._lock:
+            entries, self._connections = self._connections, {}
+        for _, conn in entries.values():
+            _close(conn)
+        self._local = threading.local()
+
+
+def _close(conn):
+    try:
+        conn.close()
+    except sqlite3.Error:
+        pass
+
+
+_databases = {}
+_registry_lock = threading.Lock()
+
+
+def get_db(path):
+    """The process-wide Database for `path`."""
+    db = _databases.get(path)
+    if db is None:
+        with _registry_lock:
+            db = _databases.get(path)
+            if db is None:
+                db = _databases[path] = Database(path)
+    return db
+
+
+def close_all():
+    with _registry_lock:
+        dbs = list(_databases.values())
+        _databases.clear()
+    for db in dbs:
+        db.close_all()
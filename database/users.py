@@ -1,13 +1,10 @@
 # database/users.py
-import sqlite3
-import os
+from database.connection import get_db
 
 DB_PATH = "users.db"
 
 def init_users():
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("""
+    get_db(DB_PATH).execute("""
         CREATE TABLE IF NOT EXISTS users (
             email TEXT PRIMARY KEY,
             role TEXT,
@@ -16,21 +13,16 @@ def init_users():
             lang TEXT
         )
     """)
-    conn.commit()
-    conn.close()
 
 def add_user(email, role, country, ip, lang):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("INSERT OR REPLACE INTO users VALUES (?, ?, ?, ?, ?)",
-              (email, role, country, ip, lang))
-    conn.commit()
-    conn.close()
+    get_db(DB_PATH).execute("INSERT OR REPLACE INTO users VALUES (?, ?, ?, ?, ?)",
+                            (email, role, country, ip, lang))
+
+def get_user_by_email(email):
+    """(email, role, country, ip, lang) or None."""
+    init_users()
+    return get_db(DB_PATH).query_one("SELECT email, role, country, ip, lang FROM users WHERE email=?",
+                                     ((email or "").strip(),))
 
 def get_all_users():
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("SELECT email, role, country, ip, lang FROM users")
-    data = c.fetchall()
-    conn.close()
-    return data
\ No newline at end of file
+    return get_db(DB_PATH).query("SELECT email, role, country, ip, lang FROM users")
@@ -1,6 +1,7 @@
 import streamlit as st
 from core.app_controller import init_app, navbar
 from database.users import get_user_by_email
+from core.realtime.event_bus import publish
 
 init_app()
 navbar()
@@ -13,15 +14,17 @@ password = st.text_input("Password", type="password", key="login_pass")
 if st.button("Login", use_container_width=True):
     user = get_user_by_email(email)
 
+    publish("auth.login", email=email, success=bool(user))
+
     if not user:
         st.error("❌ User not found.")
     else:
         st.session_state["logged_in"] = True
         st.session_state["email"] = email
-        st.session_state["role"] = user[2]  # "staff" or "customer"
+        st.session_state["role"] = user[1]  # "staff" or "customer"
 
         # 🔥 توجيه حسب نوع الحساب
-        if user[2] == "staff":
+        if user[1] == "staff":
             st.success("Welcome Staff! Redirecting…")
             st.switch_page("pages/04_Staff_Dashboard.py")
         else:
@@ -1,6 +1,8 @@
 import streamlit as st
 from core.app_controller import init_app, navbar, protect_page
 from database.users import get_all_users
+from core.agents.dispatcher import iter_agents
+from core.pipelines.sessionizer import get_sessionizer, FEATURE_NAMES
 
 init_app()
 protect_page("staff")
@@ -14,3 +16,41 @@ if not users:
 else:
     st.subheader("👥 Registered Users")
     st.table(users)
+
+st.subheader("📈 Behavior Analytics")
+behavior = get_sessionizer()
+summary = behavior.summary()
+cols = st.columns(4)
+cols[0].metric("Tracked Users", summary["users"])
+cols[1].metric("Sessions", summary["sessions"])
+cols[2].metric("Events", summary["events"])
+cols[3].metric("Events / Session", f"{summary['events_per_session']:.1f}")
+
+for name, steps in behavior.funnel_report().items():
+    st.caption(f"Funnel: {name}")
+    st.table([{"step": step, "sessions": n, "conversion": f"{rate:.0%}"} for step, n, rate in steps])
+
+dwell = behavior.dwell_report()
+if dwell:
+    st.caption("Average dwell per event")
+    st.table([{"event": e, "avg_seconds": round(s, 1), "samples": n} for e, s, n in dwell])
+
+with st.expander("Per-user feature vectors"):
+    st.table([
+        {"user": user, **dict(zip(FEATURE_NAMES, (round(v, 1) for v in behavior.feature_vector(user))))}
+        for user in list(behavior.users)[:100]
+    ])
+
+st.subheader("🤖 AI Agent Insights")
+if st.button("Run Fraud + CRM + Travel Agents"):
+    calls = {
+        "Fraud": ("fraud", f"Registered users: {users}"),
+        "CRM": ("crm", f"Registered users: {users}"),
+        "Travel": ("travel", "Popular routes from KRT"),
+    }
+    for result in iter_agents(calls):
+        with st.expander(f"{result.key} ({result.elapsed:.1f}s)", expanded=True):
+            if result.ok:
+                st.write(result.value)
+            else:
+                st.error(f"{type(result.error).__name__}: {result.error}")
@@ -1,6 +1,6 @@
 import streamlit as st
 from core.app_controller import init_app, navbar
-from core.ai_engine import ai_insights
+from core.ai_engine import ai_insights_stream
 
 init_app()
 navbar()
@@ -9,4 +9,4 @@ st.title("📊 AI Business Reports")
 
 query = st.text_area("Enter your business question:", key="06_AI_REPORTS_ENTER_YOUR_BUSINESS__0caec0")
 if st.button("Generate AI Report"):
-    st.write(ai_insights(query))
\ No newline at end of file
+    st.write_stream(ai_insights_stream(query))
\ No newline at end of file
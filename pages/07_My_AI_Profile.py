@@ -1,8 +1,10 @@
 import streamlit as st
 from core.app_controller import init_app, navbar, protect_page
 from database.users import get_all_users
-from core.pipelines.user_profile_pipeline import generate_ai_profile
-from core.pipelines.behavior_tracker import track
+from core.pipelines.user_profile_pipeline import (
+    stream_ai_profile, stored_ai_profile, save_ai_profile, profile_input
+)
+from core.pipelines.behavior_tracker import current_user, track
 
 init_app()
 protect_page("customer")
@@ -12,11 +14,16 @@ track("open_ai_profile")
 
 st.title("🧠 My AI Profile")
 
-user_email = st.session_state.get("user_email", "unknown@example.com")
+user_email = current_user()
 
-profile = generate_ai_profile(f"User email: {user_email}")
-st.write(profile)
+logs = st.session_state.get("behavior_log", [])
+
+profile = stored_ai_profile(user_email, logs)
+if profile is None:
+    profile = st.write_stream(stream_ai_profile(profile_input(user_email, logs)))
+    save_ai_profile(user_email, logs, profile)
+else:
+    st.write(profile)
 
 st.subheader("📈 Activity Log")
-logs = st.session_state.get("behavior_log", [])
 st.json(logs)
\ No newline at end of file
@@ -1,13 +1,48 @@
+import pandas as pd
 import streamlit as st
-from core.app_controller import init_app, navbar
-from core.realtime.stream_engine import generate_realtime_events
+from core.app_controller import init_app, navbar, protect_page
+from core.realtime.metrics import get_live_metrics, recent_events, summarize_event
+from core.realtime.stream_engine import SIMULATED_FIELDS, BUS_FIELDS
 
 init_app()
+protect_page("staff")
 navbar()
 
 st.title("📊 Live Analytics Dashboard")
 
-ph = st.empty()
+metrics = get_live_metrics()
 
-for event in generate_realtime_events():
-    ph.write(event)
\ No newline at end of file
+# Re-runs only this fragment every second; it reads a snapshot of the shared
+# buffer instead of holding a server thread in a loop.
+@st.fragment(run_every=1)
+def live_panel():
+    snap = metrics.snapshot()
+    latest = snap["latest"]
+    if latest is None:
+        st.info("Waiting for the first events…")
+        return
+
+    for fields in (SIMULATED_FIELDS, tuple(BUS_FIELDS.values())):
+        for col, field in zip(st.columns(len(fields)), fields):
+            minute = snap["windows"][60][field]
+            col.metric(field.replace("_", " ").title(), latest[field],
+                       f"{minute['rate'] * 60:.0f}/min")
+
+    rows = []
+    for seconds, stats in snap["windows"].items():
+        for field, s in stats.items():
+            rows.append({"window": f"{seconds}s", "metric": field, "sum": s["sum"],
+                         "rate/s": round(s["rate"], 2), "p50": s["p50"],
+                         "p95": s["p95"], "p99": s["p99"]})
+    st.dataframe(pd.DataFrame(rows), hide_index=True)
+
+    times, series = metrics.series(300)
+    if len(times):
+        st.line_chart(pd.DataFrame(series, index=pd.to_datetime(times, unit="s")))
+
+    events = recent_events()
+    if events:
+        st.subheader("Recent Events")
+        st.dataframe(pd.DataFrame([summarize_event(e) for e in events[:20]]), hide_index=True)
+
+live_panel()
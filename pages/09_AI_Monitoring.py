@@ -1,6 +1,6 @@
 import streamlit as st
 from core.app_controller import init_app, navbar
-from core.monitoring.ai_monitor import ai_healthcheck, ai_usage_summary
+from core.monitoring.ai_monitor import ai_healthcheck, ai_usage_summary, ai_cache_stats
 
 init_app()
 navbar()
@@ -12,4 +12,7 @@ st.write(ai_healthcheck())
 
 st.subheader("AI Usage Summary")
 logs = ["login", "profile", "fraud_check"]
-st.write(ai_usage_summary(logs))
\ No newline at end of file
+st.write(ai_usage_summary(logs))
+
+st.subheader("AI Response Cache")
+st.json(ai_cache_stats())
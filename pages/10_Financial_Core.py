@@ -1,6 +1,8 @@
 import streamlit as st
 from core.app_controller import init_app, navbar
-from core.finance.ledger import init_ledger, add_transaction, get_transactions
+from core.finance.ledger import init_ledger, add_transaction, get_transactions_page, get_user_totals
+from core.finance.analytics import get_ledger_columns
+from datetime import datetime, timezone
 
 init_app()
 navbar()
@@ -14,7 +16,64 @@ type = st.selectbox("Type", ["credit", "debit"], key="10_FINANCIAL_CORE_TYPE_291
 
 if st.button("Submit Transaction"):
     add_transaction(user, amount, type)
+    st.session_state.ledger_cursors = [None]
     st.success("Transaction added!")
 
 st.subheader("📄 Ledger")
-st.table(get_transactions())
\ No newline at end of file
+
+col1, col2 = st.columns(2)
+with col1:
+    filter_user = st.text_input("Filter by user", key="10_FINANCIAL_CORE_FILTER_BY_USER_4996e9")
+with col2:
+    filter_type = st.selectbox("Filter by type", ["all", "credit", "debit"], key="10_FINANCIAL_CORE_FILTER_BY_TYPE_6973fc")
+
+if filter_user:
+    totals = get_user_totals(filter_user)
+    b, c, d = st.columns(3)
+    b.metric("Balance", f"{totals['balance']:,.2f}")
+    c.metric("Credits", f"{totals['credits']:,.2f}")
+    d.metric("Debits", f"{totals['debits']:,.2f}")
+
+# Stack of page-start cursors; resets whenever the filters change.
+filters = {"user": filter_user or None, "type": None if filter_type == "all" else filter_type}
+if st.session_state.get("ledger_filters") != filters:
+    st.session_state.ledger_filters = filters
+    st.session_state.ledger_cursors = [None]
+cursors = st.session_state.setdefault("ledger_cursors", [None])
+
+rows, next_cursor = get_transactions_page(cursor=cursors[-1], **filters)
+st.table(rows)
+
+prev_col, page_col, next_col = st.columns([1, 2, 1])
+with prev_col:
+    if st.button("◀ Newer", disabled=len(cursors) == 1):
+        cursors.pop()
+        st.rerun()
+with page_col:
+    st.caption(f"Page {len(cursors)}")
+with next_col:
+    if st.button("Older ▶", disabled=next_cursor is None):
+        cursors.append(next_cursor)
+        st.rerun()
+
+
+st.subheader("📊 Ledger Analytics")
+cols = get_ledger_columns()
+if not len(cols):
+    st.info("No ledger entries yet.")
+else:
+    p = cols.percentiles((50, 90, 99))
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("Entries", f"{len(cols):,}")
+    m2.metric("Median amount", f"{p[50]:,.2f}")
+    m3.metric("p90 amount", f"{p[90]:,.2f}")
+    m4.metric("p99 amount", f"{p[99]:,.2f}")
+
+    st.table([{"type": t, "total": total, "entries": n} for t, (total, n) in cols.sum_by_type().items()])
+
+    starts, sums, counts = cols.time_buckets(86400)
+    st.bar_chart(
+        [{"day": datetime.fromtimestamp(int(s), timezone.utc).strftime("%Y-%m-%d"), "volume": v}
+         for s, v in zip(starts[-60:], sums[-60:])],
+        x="day", y="volume",
+    )
@@ -1,14 +1,46 @@
+import uuid
 import streamlit as st
 from core.app_controller import init_app, navbar
-from core.payments.hub import process_payment, SUPPORTED_METHODS
+from core.payments.hub import enqueue_payment, payment_status, SUPPORTED_METHODS, init_payments
+from core.payments.queue import QueueFull
+from core.pipelines.behavior_tracker import track
 
 init_app()
 navbar()
+init_payments()
 
 st.title("💳 Payment Hub")
 
 method = st.selectbox("Payment Method", SUPPORTED_METHODS, key="11_PAYMENT_HUB_PAYMENT_METHOD_2d17cd")
 amount = st.number_input("Amount", step=1.0, key="11_PAYMENT_HUB_AMOUNT_73bd2a")
 
+# One idempotency key per payment attempt: reruns and double clicks reuse it,
+# so the same payment is never charged twice.
+if "payment_idempotency_key" not in st.session_state:
+    st.session_state.payment_idempotency_key = uuid.uuid4().hex
+if "payment_references" not in st.session_state:
+    st.session_state.payment_references = []
+
 if st.button("Process Payment"):
-    st.write(process_payment(method, amount))
\ No newline at end of file
+    try:
+        reference = enqueue_payment(method, amount, user=st.session_state.get("email"),
+                                    idempotency_key=st.session_state.payment_idempotency_key)
+    except QueueFull:
+        st.warning("Payment queue is busy, please try again in a moment.")
+    except ValueError as e:
+        st.error(str(e))
+    else:
+        st.success(f"Payment queued: {reference}")
+        track("process_payment", method)
+        if reference not in st.session_state.payment_references:
+            st.session_state.payment_references.insert(0, reference)
+        st.session_state.payment_idempotency_key = uuid.uuid4().hex
+
+if st.session_state.payment_references:
+    st.subheader("Recent Payments")
+    st.button("Refresh Status")
+    rows = [payment_status(ref) for ref in st.session_state.payment_references[:10]]
+    st.table([
+        {k: p[k] for k in ("reference", "method", "amount", "status", "attempts", "detail")}
+        for p in rows if p
+    ])
@@ -1,15 +1,90 @@
+import datetime
 import streamlit as st
 from core.app_controller import init_app, navbar
-from core.travel_ndc.offer_builder import generate_flight_offers
+from core.travel_ndc.offer_builder import generate_flight_offers, build_itineraries
+from core.travel_ndc.search import SORT_KEYS
+from core.travel_ndc.connections import OBJECTIVES
+from core.travel_ndc.shopping_cache import get_shopping_cache
+from core.travel_ndc.pricing import EXCHANGE_RATES
+from core.pipelines.behavior_tracker import track
 
 init_app()
 navbar()
 
 st.title("✈️ Travel Simulation")
 
-frm = st.text_input("From", "KRT", key="12_TRAVEL_SIMULATION_FROM_9ac461")
-to = st.text_input("To", "DXB", key="12_TRAVEL_SIMULATION_TO_4888c4")
+col1, col2, col3, col4 = st.columns(4)
+frm = col1.text_input("From", "KRT", key="12_TRAVEL_SIMULATION_FROM_9ac461")
+to = col2.text_input("To", "DXB", key="12_TRAVEL_SIMULATION_TO_4888c4")
+date = col3.date_input("Date", datetime.date.today(), key="12_TRAVEL_SIMULATION_DATE_bd3e44")
+currency = col4.selectbox("Currency", list(EXCHANGE_RATES), key="12_TRAVEL_SIMULATION_CURRENCY_1f0e31")
+
+col1, col2, col3, col4 = st.columns(4)
+sort = col1.selectbox("Sort by", SORT_KEYS, key="12_TRAVEL_SIMULATION_SORT_BY_1008b7")
+families = col2.multiselect("Fare families", ["Basic", "Flex", "Premium"],
+                            key="12_TRAVEL_SIMULATION_FARE_FAMILIES_f23189")
+max_price = col3.number_input("Max price", min_value=0.0, value=0.0, step=50.0,
+                              help="Total including taxes, in the selected currency",
+                              key="12_TRAVEL_SIMULATION_MAX_PRICE_ce2657")
+any_date = col4.checkbox("Any date", key="12_TRAVEL_SIMULATION_ANY_DATE_b1a8aa")
+
+col1, col2, col3, col4 = st.columns(4)
+connections = col1.checkbox("Include connections", key="12_TRAVEL_SIMULATION_INCLUDE_CONNECTIONS_1a3452")
+objective = col2.selectbox("Optimize for", OBJECTIVES, key="12_TRAVEL_SIMULATION_OPTIMIZE_FOR_a28dee")
+max_stops = col3.slider("Max stops", 0, 2, 1, key="12_TRAVEL_SIMULATION_MAX_STOPS_198923")
+passengers = col4.number_input("Passengers", min_value=1, max_value=9, value=1,
+                               key="12_TRAVEL_SIMULATION_PASSENGERS_a336d6")
+
+if "travel_offset" not in st.session_state:
+    st.session_state.travel_offset = 0
 
 if st.button("Search Flights"):
-    offers = generate_flight_offers({"from": frm, "to": to})
-    st.table(offers)
\ No newline at end of file
+    st.session_state.travel_offset = 0
+    st.session_state.travel_search = True
+    track("search_flights", f"{frm}-{to}")
+
+if st.session_state.get("travel_search") and connections:
+    itineraries = build_itineraries({
+        "from": frm.strip().upper(), "to": to.strip().upper(), "date": date,
+        "objective": objective, "max_stops": max_stops, "limit": 10, "passengers": passengers,
+        "currency": currency,
+    })
+    if not itineraries:
+        st.info("No itineraries found for this date.")
+    for it in itineraries:
+        label = "Direct" if not it["stops"] else f"{it['stops']} stop(s) via {it['via']}"
+        with st.expander(f"{label} — {it['total']:,.2f} {it['currency']} — {it['duration_min'] // 60}h{it['duration_min'] % 60:02d}m "
+                         f"— departs {it['departure']}"):
+            st.table(it["legs"])
+
+elif st.session_state.get("travel_search"):
+    query = {
+        "from": frm.strip().upper(),
+        "to": to.strip().upper(),
+        "date": None if any_date else date,
+        "sort": sort,
+        "fare_families": families or None,
+        "max_price": max_price or None,
+        "passengers": passengers,
+        "currency": currency,
+        "limit": 20,
+        "offset": st.session_state.travel_offset,
+    }
+    offers = generate_flight_offers(query)
+    if offers:
+        st.table(offers)
+    else:
+        st.info("No offers found for this search.")
+
+    prev_col, next_col = st.columns(2)
+    if prev_col.button("◀ Previous", disabled=st.session_state.travel_offset == 0):
+        st.session_state.travel_offset = max(0, st.session_state.travel_offset - 20)
+        st.rerun()
+    if next_col.button("Next ▶", disabled=len(offers) < 20):
+        st.session_state.travel_offset += 20
+        st.rerun()
+
+if st.session_state.get("travel_search"):
+    m = get_shopping_cache().metrics()
+    st.caption(f"Shopping cache: {m['entries']} entries, hit rate {m['hit_rate']:.0%}, "
+               f"{m.get('saved_seconds', 0.0) * 1000:.0f} ms of search compute saved")
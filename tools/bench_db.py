@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""Benchmark: connect-per-call SQLite vs the pooled access layer.
+
+Simulates concurrent Streamlit sessions (one thread each) doing a mix of
+ledger inserts and reads, and reports ops/sec for both approaches.
+
+Usage: python tools/bench_db.py [--threads 8] [--ops 2000] [--write-ratio 0.3]
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from database.connection import Database
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS ledger (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user TEXT,
+        amount REAL,
+        type TEXT,
+        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+INSERT = "INSERT INTO ledger (user, amount, type) VALUES (?, ?, ?)"
+SELECT = "SELECT * FROM ledger WHERE user=? ORDER BY id DESC LIMIT 20"
+
+
+def naive_op(path, write, user):
+    conn = sqlite3.connect(path, timeout=30)
+    c = conn.cursor()
+    if write:
+        c.execute(INSERT, (user, 10.0, "credit"))
+        conn.commit()
+    else:
+        c.execute(SELECT, (user,))
+        c.fetchall()
+    conn.close()
+
+
+def pooled_op(db, write, user):
+    if write:
+        db.execute(INSERT, (user, 10.0, "credit"))
+    else:
+        db.query(SELECT, (user,))
+
+
+def run(label, op, threads, ops, write_ratio):
+    def worker(seed):
+        rnd = random.Random(seed)
+        for _ in range(ops):
+            op(rnd.random() < write_ratio, f"user{rnd.randrange(100)}")
+
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    started = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - started
+    total = threads * ops
+    print(f"{label:<10} {total:>8} ops  {elapsed:8.2f}s  {total / elapsed:>10,.0f} ops/sec")
+    return total / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--ops", type=int, default=2000)
+    parser.add_argument("--write-ratio", type=float, default=0.3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        naive_path = os.path.join(tmp, "naive.db")
+        conn = sqlite3.connect(naive_path)
+        conn.execute(SCHEMA)
+        conn.commit()
+        conn.close()
+        before = run("naive", lambda w, u: naive_op(naive_path, w, u),
+                     args.threads, args.ops, args.write_ratio)
+
+        db = Database(os.path.join(tmp, "pooled.db"))
+        db.execute(SCHEMA)
+        after = run("pooled", lambda w, u: pooled_op(db, w, u),
+                    args.threads, args.ops, args.write_ratio)
+        db.close_all()
+
+    print(f"speedup    {after / before:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Benchmark the in-process event bus: publish throughput and fan-out latency.
+
+Publishes events to a set of thread subscribers (and optionally one asyncio
+subscriber), then reports events/sec, end-to-end latency percentiles from
+publish to consumer, and how many events the bounded queues dropped.
+
+Usage: python tools/bench_event_bus.py [--events 200000] [--subscribers 4]
+                                       [--maxsize 1000] [--async-subscriber]
+"""
+
+import argparse
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.realtime.event_bus import EventBus
+
+
+def percentile(values, q):
+    values = sorted(values)
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=200_000)
+    parser.add_argument("--subscribers", type=int, default=4)
+    parser.add_argument("--maxsize", type=int, default=1000)
+    parser.add_argument("--async-subscriber", action="store_true")
+    args = parser.parse_args()
+
+    bus = EventBus()
+    latencies = [[] for _ in range(args.subscribers)]
+    subs = []
+    for i in range(args.subscribers):
+        pattern = "payments.*" if i % 2 else "*"
+        sink = latencies[i]
+        subs.append(bus.subscribe(pattern, maxsize=args.maxsize,
+                                  handler=lambda e, sink=sink: sink.append(time.perf_counter() - e.payload["t"])))
+    bus.subscribe("travel.*", maxsize=args.maxsize)   # never read: exercises drop-oldest
+
+    async_latency = []
+    loop_thread = None
+    if args.async_subscriber:
+        asub = bus.subscribe("*", maxsize=args.maxsize)
+        subs.append(asub)
+
+        async def consume():
+            async for event in asub:
+                async_latency.append(time.perf_counter() - event.payload["t"])
+
+        loop_thread = threading.Thread(target=asyncio.run, args=(consume(),), daemon=True)
+        loop_thread.start()
+        time.sleep(0.1)
+
+    topics = ("payments.approved", "ledger.entry", "travel.search", "auth.login")
+    started = time.perf_counter()
+    for i in range(args.events):
+        bus.publish(topics[i & 3], {"t": time.perf_counter(), "i": i})
+    publish_elapsed = time.perf_counter() - started
+
+    deadline = time.time() + 10
+    while time.time() < deadline and any(len(s) for s in subs):
+        time.sleep(0.01)
+    time.sleep(0.05)
+
+    print(f"published {args.events:,} events in {publish_elapsed:.2f}s "
+          f"-> {args.events / publish_elapsed:,.0f} events/s")
+    for stats in bus.stats()["subscribers"]:
+        print(f"  {stats['pattern']:<11} delivered {stats['delivered']:>8,}  dropped {stats['dropped']:>8,}")
+    all_lat = [x for sink in latencies for x in sink] + async_latency
+    print(f"fan-out latency  p50 {percentile(all_lat, 50) * 1e6:8.1f}us  "
+          f"p99 {percentile(all_lat, 99) * 1e6:8.1f}us  ({len(all_lat):,} deliveries consumed)")
+    for s in subs:
+        s.close()
+
+
+if __name__ == "__main__":
+    main()
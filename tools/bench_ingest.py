@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""Benchmark: row-at-a-time ledger inserts vs bulk ingestion and file import.
+
+Usage: python tools/bench_ingest.py [--rows 200000] [--single 5000]
+"""
+
+import argparse
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.finance import ledger
+from core.finance.ingest import add_transactions, import_file
+
+
+def make_rows(n, seed=7):
+    rnd = random.Random(seed)
+    base = 1_700_000_000
+    for i in range(n):
+        ts = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(base + i))
+        yield (f"user{rnd.randrange(5000)}", round(rnd.uniform(1, 500), 2),
+               rnd.choice(("credit", "debit")), ts)
+
+
+def report(label, rows, elapsed):
+    print(f"{label:<22} {rows:>9} rows  {elapsed:7.2f}s  {rows / elapsed:>12,.0f} rows/sec")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--single", type=int, default=5_000,
+                        help="rows for the one-transaction-per-row baseline")
+    args = parser.parse_args()
+
+    rows = list(make_rows(args.rows))  # generated up front, outside the timings
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, "single.db")
+        ledger.init_ledger(db)
+        ledger.DB, saved = db, ledger.DB
+        started = time.perf_counter()
+        for user, amount, type, _ in rows[:args.single]:
+            ledger.add_transaction(user, amount, type)
+        report("add_transaction", args.single, time.perf_counter() - started)
+        ledger.DB = saved
+
+        db = os.path.join(tmp, "bulk.db")
+        started = time.perf_counter()
+        add_transactions(rows, path=db)
+        report("add_transactions", args.rows, time.perf_counter() - started)
+
+        db = os.path.join(tmp, "deferred.db")
+        started = time.perf_counter()
+        add_transactions(rows, path=db, defer_indexes=True)
+        report("add_transactions/defer", args.rows, time.perf_counter() - started)
+
+        csv_path = os.path.join(tmp, "settlement.csv")
+        with open(csv_path, "w", newline="") as fh:
+            writer = csv.writer(fh)
+            writer.writerow(["user", "amount", "type", "timestamp"])
+            writer.writerows(rows)
+        result = import_file(csv_path, path=os.path.join(tmp, "import.db"))
+        report("import_file (csv)", result.inserted, result.elapsed)
+
+        problems = ledger.verify_projections(os.path.join(tmp, "import.db"))
+        print(f"projection mismatches after import: {len(problems)}")
+
+
+if __name__ == "__main__":
+    main()
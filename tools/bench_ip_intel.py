@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Benchmark IP intelligence lookups over generated CIDR lists.
+
+Writes a random mix of IPv4 and IPv6 CIDRs to a temporary CSV. A share of
+them are nested inside others, so longest-prefix match matters. The file
+is loaded through IPIntel and the benchmark times:
+- the table build;
+- single lookups;
+- bulk lookups (the log backfill path).
+
+The lookup stream repeats addresses the way access logs do: --distinct
+addresses spread over --lookups entries.
+
+It then reloads the table repeatedly while a reader thread keeps looking
+up addresses, and reports the reader's worst lookup latency during the
+reloads.
+
+Usage: python tools/bench_ip_intel.py [--cidrs 200000] [--lookups 200000] [--distinct 20000] [--reloads 5]
+"""
+
+import argparse
+import ipaddress
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.security.ip_intel import IPIntel
+
+RISKS = ("Low Risk", "Medium Risk", "High Risk")
+COUNTRIES = ("SD", "EG", "SA", "AE", "ET", "KE", "GB", "DE", "TR", "QA")
+
+
+def random_cidrs(n, rnd):
+    cidrs = []
+    for _ in range(n):
+        if cidrs and rnd.random() < 0.2:
+            parent = ipaddress.ip_network(rnd.choice(cidrs))
+            new_prefix = min(parent.max_prefixlen, parent.prefixlen + rnd.randint(1, 8))
+            step = 1 << (parent.max_prefixlen - new_prefix)
+            offset = rnd.randrange(parent.num_addresses // step) * step
+            cidrs.append(f"{parent.network_address + offset}/{new_prefix}")
+        elif rnd.random() < 0.8:
+            cidrs.append(str(ipaddress.ip_network((rnd.getrandbits(32), rnd.randint(12, 28)), strict=False)))
+        else:
+            addr = (0x2000 << 112) | rnd.getrandbits(115)
+            cidrs.append(str(ipaddress.ip_network((addr, rnd.randint(24, 64)), strict=False)))
+    return cidrs
+
+
+def random_ips(cidrs, n, rnd):
+    ips = []
+    for _ in range(n):
+        if rnd.random() < 0.7:
+            net = ipaddress.ip_network(rnd.choice(cidrs))
+            ips.append(str(net.network_address + rnd.randrange(net.num_addresses)))
+        else:
+            ips.append(str(ipaddress.IPv4Address(rnd.getrandbits(32))))
+    return ips
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cidrs", type=int, default=200_000)
+    parser.add_argument("--lookups", type=int, default=200_000)
+    parser.add_argument("--distinct", type=int, default=20_000)
+    parser.add_argument("--reloads", type=int, default=5)
+    args = parser.parse_args()
+
+    rnd = random.Random(1)
+    cidrs = random_cidrs(args.cidrs, rnd)
+    pool = random_ips(cidrs, args.distinct, rnd)
+    ips = [rnd.choice(pool) for _ in range(args.lookups)]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "ranges.csv")
+        with open(path, "w", encoding="utf-8") as fh:
+            fh.write("cidr,risk,country\n")
+            for cidr in cidrs:
+                fh.write(f"{cidr},{rnd.choice(RISKS)},{rnd.choice(COUNTRIES)}\n")
+
+        started = time.perf_counter()
+        intel = IPIntel(path)
+        print(f"loaded {intel.table.size:,} CIDRs in {time.perf_counter() - started:.2f}s")
+
+        started = time.perf_counter()
+        hits = sum(1 for ip in ips if intel.lookup(ip))
+        elapsed = time.perf_counter() - started
+        print(f"single: {len(ips):,} lookups in {elapsed:.2f}s -> {elapsed / len(ips) * 1e6:.2f}us/lookup "
+              f"({hits / len(ips):.0%} matched)")
+
+        started = time.perf_counter()
+        bulk = intel.lookup_many(ips)
+        elapsed = time.perf_counter() - started
+        print(f"bulk:   {len(ips):,} lookups in {elapsed:.2f}s -> {len(ips) / elapsed:,.0f} lookups/s")
+        assert sum(1 for info in bulk if info) == hits
+
+        worst = [0.0]
+        stop = threading.Event()
+
+        def reader():
+            i = 0
+            while not stop.is_set():
+                s = time.perf_counter()
+                intel.lookup(ips[i % len(ips)])
+                worst[0] = max(worst[0], time.perf_counter() - s)
+                i += 1
+
+        thread = threading.Thread(target=reader)
+        thread.start()
+        started = time.perf_counter()
+        for _ in range(args.reloads):
+            intel.reload()
+        elapsed = time.perf_counter() - started
+        stop.set()
+        thread.join()
+        print(f"reload: {elapsed / max(args.reloads, 1):.2f}s each; worst reader lookup meanwhile "
+              f"{worst[0] * 1e3:.2f}ms (GIL switches, no lock)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""Benchmark: inline payment processing vs batched worker-pool processing.
+
+Reports throughput and p50/p99 submit-to-final latency, with a share of
+retried submits (same idempotency key) to exercise deduplication.
+
+With --queue, payments go through the background PaymentQueue against the
+PSP simulator instead, so failures are retried with backoff; the report adds
+the PSP call and retry counts.
+
+Usage: python tools/bench_payments.py [--payments 5000] [--batch 200] [--workers 8]
+                                      [--auth-latency 0.002] [--retry-ratio 0.1]
+       python tools/bench_payments.py --queue [--failure-rate 0.05] [--max-depth 500]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.payments import processor
+from core.payments.psp_simulator import PSPSimulator
+from core.payments.queue import PaymentQueue
+from database.connection import get_db
+
+
+def percentile(values, q):
+    values = sorted(values)
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))]
+
+
+def latencies(path):
+    rows = get_db(path).query(
+        "SELECT updated_at - created_at FROM payments WHERE status IN (?, ?, ?)",
+        processor.FINAL_STATES,
+    )
+    return [r[0] * 1000 for r in rows]
+
+
+def make_requests(n, retry_ratio, seed=3):
+    rnd = random.Random(seed)
+    keys = []
+    for i in range(n):
+        if keys and rnd.random() < retry_ratio:
+            yield rnd.choice(keys)
+            continue
+        key = f"k{i}"
+        keys.append(key)
+        yield key
+
+
+def run(label, path, requests, drain):
+    processor.init_payments(path)
+    started = time.perf_counter()
+    unique = drain(path, requests)
+    elapsed = time.perf_counter() - started
+    lat = latencies(path)
+    print(f"{label:<8} {unique:>6} payments  {elapsed:6.2f}s  {unique / elapsed:>9,.0f}/s  "
+          f"p50 {percentile(lat, 50):7.1f}ms  p99 {percentile(lat, 99):7.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--payments", type=int, default=5000)
+    parser.add_argument("--batch", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--auth-latency", type=float, default=0.002,
+                        help="simulated authorization time per payment (seconds)")
+    parser.add_argument("--retry-ratio", type=float, default=0.1)
+    parser.add_argument("--queue", action="store_true",
+                        help="benchmark the background queue against the PSP simulator")
+    parser.add_argument("--failure-rate", type=float, default=0.05)
+    parser.add_argument("--max-depth", type=int, default=500)
+    args = parser.parse_args()
+
+    if args.queue:
+        return bench_queue(args)
+
+    def authorizer(payment):
+        time.sleep(args.auth_latency)
+        return processor.APPROVED, None
+
+    requests = list(make_requests(args.payments, args.retry_ratio))
+
+    def inline(path, keys):
+        created = 0
+        for key in keys:
+            payment, new = processor.submit_payment("Card", 25.0, "bench", key, path=path)
+            processor.process_payment_now(payment, authorizer, path=path)
+            created += new
+        return created
+
+    def batched(path, keys):
+        created = 0
+        for key in keys:
+            created += processor.submit_payment("Card", 25.0, "bench", key, path=path)[1]
+        while processor.process_pending(args.batch, args.workers, authorizer, path=path):
+            pass
+        return created
+
+    with tempfile.TemporaryDirectory() as tmp:
+        run("inline", os.path.join(tmp, "inline.db"), requests, inline)
+        run("batched", os.path.join(tmp, "batched.db"), requests, batched)
+
+
+def bench_queue(args):
+    psp = PSPSimulator(latency=args.auth_latency, jitter=args.auth_latency / 2,
+                       failure_rate=args.failure_rate, decline_rate=0.02, seed=7)
+    requests = list(make_requests(args.payments, args.retry_ratio))
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "queue.db")
+        queue = PaymentQueue(path, workers=args.workers, max_depth=args.max_depth,
+                             authorizer=psp.charge, base_delay=0.01, max_delay=0.2,
+                             poll_interval=0.01).start()
+        started = time.perf_counter()
+        refs = {queue.enqueue("Card", 25.0, "bench", key, block=True) for key in requests}
+        for ref in refs:
+            queue.wait(ref)
+        elapsed = time.perf_counter() - started
+        queue.stop()
+        lat = latencies(path)
+        stats = queue.stats()
+    print(f"queue    {len(refs):>6} payments  {elapsed:6.2f}s  {len(refs) / elapsed:>9,.0f}/s  "
+          f"p50 {percentile(lat, 50):7.1f}ms  p99 {percentile(lat, 99):7.1f}ms")
+    print(f"         psp {psp.stats()}  retries {stats['retries']}  "
+          f"final {{{', '.join(f'{k}: {v}' for k, v in stats.items() if k != 'retries')}}}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Benchmark: per-offer Python pricing vs batched NumPy pricing.
+
+Draws a random batch of offers from a generated fare inventory and prices it
+three ways:
+- price_offer, one dict at a time in plain Python;
+- price_offers, one NumPy batch built from the same dicts;
+- price_rows, straight from the inventory columns.
+
+Reports offers/sec for each and checks that every path gives identical
+totals.
+
+Usage: python tools/bench_pricing.py [--offers 100000] [--fares 1000000] [--currency SAR] [--seed 0]
+"""
+
+import argparse
+import datetime
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.travel_ndc.inventory import generate_inventory
+from core.travel_ndc.pricing import PricingEngine
+
+
+def timed(label, n, fn):
+    started = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<28} {elapsed * 1e3:9.1f}ms  {n / elapsed:>12,.0f} offers/s")
+    return result, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--offers", type=int, default=100_000)
+    parser.add_argument("--fares", type=int, default=1_000_000)
+    parser.add_argument("--currency", default="SAR")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    inv = generate_inventory(args.fares)
+    rows = np.random.default_rng(args.seed).integers(0, len(inv), size=args.offers)
+    offers = [inv.record(i) for i in rows.tolist()]
+    engine = PricingEngine(seed=args.seed)
+    today = datetime.date.today()
+    print(f"{args.offers:,} offers from {len(inv):,} fares, currency {args.currency}")
+
+    python, t_python = timed("per-offer (python)", args.offers,
+                             lambda: [engine.price_offer(o, args.currency, today) for o in offers])
+    batched, t_batched = timed("batched (offer dicts)", args.offers,
+                               lambda: engine.price_offers(offers, args.currency, today))
+    columnar, t_rows = timed("batched (inventory rows)", args.offers,
+                             lambda: engine.price_rows(inv, rows, args.currency, today))
+
+    totals = [o["total"] for o in python]
+    mismatches = (sum(a != o["total"] for a, o in zip(totals, batched))
+                  + sum(a != b for a, b in zip(totals, columnar["total"].tolist())))
+    print(f"speedup: {t_python / t_batched:.1f}x (dicts), {t_python / t_rows:.1f}x (rows); "
+          f"mismatched totals: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Benchmark offer search over a generated fare inventory.
+
+Builds an inventory (default one million fares), then runs random searches
+mixing route-day and route-only lookups, filters and sort orders. Reports
+searches/sec and latency percentiles. With --connections N, also times N
+cheapest and N fastest 0-2 stop itinerary searches.
+
+Usage: python tools/bench_travel_search.py [--fares 1000000] [--searches 20000] [--save data/fares.npz]
+                                           [--connections 100]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.travel_ndc.inventory import generate_inventory
+from core.travel_ndc.connections import find_itineraries, OBJECTIVES
+from core.travel_ndc.search import search_offers, SORT_KEYS
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fares", type=int, default=1_000_000)
+    parser.add_argument("--searches", type=int, default=20_000)
+    parser.add_argument("--save", help="also write the generated inventory to this .npz path")
+    parser.add_argument("--connections", type=int, default=0,
+                        help="number of connection searches per objective")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    inv = generate_inventory(args.fares)
+    print(f"inventory: {len(inv):,} fares, {len(inv.route_slices)} routes, "
+          f"{len(inv.date_slices):,} route-days built in {time.perf_counter() - started:.2f}s")
+    if args.save:
+        inv.save(args.save)
+
+    rnd = random.Random(1)
+    routes = inv.routes()
+    dates = inv.dates()
+    queries = []
+    for _ in range(args.searches):
+        origin, dest = rnd.choice(routes)
+        q = {"date": rnd.choice(dates) if rnd.random() < 0.8 else None,
+             "sort": rnd.choice(SORT_KEYS), "limit": 20, "offset": rnd.choice((0, 0, 20))}
+        if rnd.random() < 0.5:
+            q["max_price"] = rnd.uniform(200, 900)
+        if rnd.random() < 0.3:
+            q["carriers"] = rnd.sample(inv.carriers, 3)
+        if rnd.random() < 0.3:
+            q["fare_families"] = ["Flex", "Premium"]
+        queries.append((origin, dest, q))
+
+    latencies = []
+    matched = 0
+    t0 = time.perf_counter()
+    for origin, dest, q in queries:
+        s = time.perf_counter()
+        result = search_offers(origin, dest, inventory=inv, **q)
+        latencies.append(time.perf_counter() - s)
+        matched += result.total
+    elapsed = time.perf_counter() - t0
+    print(f"{args.searches:,} searches in {elapsed:.2f}s -> {args.searches / elapsed:,.0f} searches/s  "
+          f"p50 {percentile(latencies, 50) * 1e3:.2f}ms  p99 {percentile(latencies, 99) * 1e3:.2f}ms  "
+          f"(avg {matched / args.searches:,.0f} matches/search)")
+
+    for objective in OBJECTIVES if args.connections else ():
+        latencies = []
+        for _ in range(args.connections):
+            origin, dest = rnd.sample(inv.airports, 2)
+            s = time.perf_counter()
+            find_itineraries(origin, dest, rnd.choice(dates), objective=objective, inventory=inv)
+            latencies.append(time.perf_counter() - s)
+        print(f"connections/{objective:<8} {args.connections} searches  "
+              f"p50 {percentile(latencies, 50) * 1e3:.1f}ms  p99 {percentile(latencies, 99) * 1e3:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
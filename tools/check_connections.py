@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""Check the connection search against a brute-force enumeration.
+
+Regression check for core/travel_ndc/connections.py. It runs in two parts:
+- A hand-built case where the second-best itinerary shares its arrival
+  time with the best one. A search keeping one label per arrival lost it.
+- Random origin/destination pairs on a small generated inventory. Every
+  feasible itinerary is enumerated, and the `limit` best costs are compared
+  with find_itineraries for both objectives.
+
+Prints each mismatch and exits non-zero if there is any.
+
+Usage: python tools/check_connections.py [--runs 40] [--limit 5] [--max-stops 1] [--fares 30000] [--seed 2]
+"""
+
+import argparse
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.travel_ndc.connections import MAX_LAYOVER, MIN_CONNECTION, find_itineraries
+from core.travel_ndc.inventory import FareInventory, generate_inventory
+
+
+def _fare(origin, dest, date, departure, duration, price):
+    return {"from": origin, "to": dest, "date": date, "departure": departure,
+            "duration_min": duration, "airline": "HN", "price": price}
+
+
+def shared_arrival_case():
+    """A->B and A->C both land at 09:00, B->D and C->D both land at 13:00."""
+    date = "2026-11-01"
+    inv = FareInventory.from_records([
+        _fare("AAA", "BBB", date, "07:00", 120, 100), _fare("AAA", "CCC", date, "08:00", 60, 150),
+        _fare("BBB", "DDD", date, "11:00", 120, 100), _fare("CCC", "DDD", date, "12:00", 60, 100),
+        _fare("AAA", "DDD", date, "08:00", 300, 400),
+    ])
+    got = [it["price"] for it in find_itineraries("AAA", "DDD", date, limit=5, inventory=inv)]
+    return got, [200.0, 250.0, 400.0]
+
+
+def brute_force(inv, origin, dest, day, objective, max_stops, passengers=1):
+    """Sorted costs of every feasible itinerary origin -> dest departing on ordinal `day`."""
+    o, d = inv.airport_index[origin], inv.airport_index[dest]
+    costs = []
+
+    def departures(airport, earliest, latest):
+        for nxt in inv.neighbors.get(airport, ()):
+            start, end = inv.route_slices[(airport, nxt)]
+            for row in range(start, end):
+                if earliest <= inv.dep_abs[row] <= latest and inv.seats[row] >= passengers:
+                    yield row
+
+    def extend(path, airport, visited):
+        if airport == d:
+            if objective == "price":
+                costs.append(sum(round(float(inv.price[r]), 2) for r in path))
+            else:
+                costs.append(int(inv.arr_abs[path[-1]]) - int(inv.dep_abs[path[0]]))
+            return
+        if len(path) > max_stops:
+            return
+        arrival = int(inv.arr_abs[path[-1]])
+        for row in departures(airport, arrival + MIN_CONNECTION, arrival + MAX_LAYOVER):
+            nxt = int(inv.dest[row])
+            if nxt not in visited:
+                extend(path + [row], nxt, visited | {nxt})
+
+    for row in departures(o, day * 1440, day * 1440 + 1439):
+        nxt = int(inv.dest[row])
+        extend([row], nxt, {o, nxt})
+    return sorted(costs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=40)
+    parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument("--max-stops", type=int, default=1)
+    parser.add_argument("--fares", type=int, default=30_000)
+    parser.add_argument("--seed", type=int, default=2)
+    args = parser.parse_args()
+
+    failures = 0
+    got, want = shared_arrival_case()
+    if got != want:
+        failures += 1
+        print(f"shared arrival case: got {got}, want {want}")
+
+    inv = generate_inventory(args.fares, days=3, seed=11)
+    day = inv.dates()[0].toordinal()
+    rnd = random.Random(args.seed)
+    for _ in range(args.runs):
+        origin, dest = rnd.sample(inv.airports, 2)
+        for objective in ("price", "duration"):
+            found = find_itineraries(origin, dest, day, objective=objective, max_stops=args.max_stops,
+                                     limit=args.limit, inventory=inv)
+            got = [it["price"] if objective == "price" else it["duration_min"] for it in found]
+            want = brute_force(inv, origin, dest, day, objective, args.max_stops)[:args.limit]
+            if len(got) != len(want) or any(abs(a - b) > 0.01 for a, b in zip(got, want)):
+                failures += 1
+                print(f"{origin}->{dest} {objective}: got {got}, want {want}")
+    print(f"{failures} mismatches in {1 + 2 * args.runs} checks")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
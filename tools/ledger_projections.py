@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""Verify or rebuild ledger projections from the raw ledger rows.
+
+Covers the finance ledger's per-user balance/daily rollup tables and the
+bank core's accounts table.
+
+Usage:
+    python tools/ledger_projections.py verify
+    python tools/ledger_projections.py rebuild
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.finance import ledger, transfers
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("command", choices=["verify", "rebuild"])
+    parser.add_argument("--finance-db", default=ledger.DB)
+    parser.add_argument("--bank-db", default=transfers.BANK_DB)
+    args = parser.parse_args()
+
+    ledger.init_ledger(args.finance_db)
+    transfers.init_bank_schema(args.bank_db)
+
+    if args.command == "rebuild":
+        users, days = ledger.rebuild_projections(args.finance_db)
+        print(f"finance: rebuilt {users} balances, {days} daily rollups")
+        accounts = transfers.rebuild_accounts(args.bank_db)
+        print(f"bank:    rebuilt {accounts} accounts")
+        return 0
+
+    problems = ledger.verify_projections(args.finance_db)
+    for kind, key, want, have in problems[:20]:
+        print(f"finance {kind} {key}: ledger={want} stored={have}")
+    drift = transfers.verify_accounts(args.bank_db)
+    for user, want, have in drift[:20]:
+        print(f"bank account {user}: ledger={want} stored={have}")
+    print(f"{len(problems)} finance mismatches, {len(drift)} bank mismatches")
+    return 1 if problems or drift else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())